@@ -1,10 +1,13 @@
 from groq import Groq
 from typing import TypedDict, List, Any, Dict
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import json
 import re
 import logging
 import os
+import time
 
 # Try to import langgraph, fall back to simple state management if not available
 try:
@@ -14,8 +17,16 @@ except ImportError:
     LANGGRAPH_AVAILABLE = False
     logging.warning("LangGraph not available, using simple state management")
 
-from app.agent.tools import check_availability, book_appointment, get_current_time
-from app.agent.prompts import BOOKING_AGENT_PROMPT, CONFIRMATION_PROMPT
+from app.agent.tools import (
+    check_availability, book_appointment, check_recurring_availability, book_recurring_appointment,
+    get_current_time, prefetch_free_busy
+)
+from app.agent.prompts import intent_messages, response_messages, render_history
+from app.agent.history import HistoryWindow
+from app.agent.intent import JSON_RESPONSE_FORMAT, IntentParseError, parse_intent
+from app.metrics import LatencyWindow, metrics
+from app import cancellation
+from app.cancellation import CancelToken, TurnCancelled
 
 # Import settings with fallback
 try:
@@ -23,6 +34,23 @@ try:
 except ImportError:
     class Settings:
         GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+        HISTORY_TOKEN_CAP = int(os.getenv('HISTORY_TOKEN_CAP', 400))
+        HISTORY_SUMMARY_TOKENS = int(os.getenv('HISTORY_SUMMARY_TOKENS', 100))
+        CALENDAR_PREFETCH_DAYS = int(os.getenv('CALENDAR_PREFETCH_DAYS', 7))
+        CALENDAR_PREFETCH_WORKERS = int(os.getenv('CALENDAR_PREFETCH_WORKERS', 8))
+        CALENDAR_PREFETCH_WAIT = float(os.getenv('CALENDAR_PREFETCH_WAIT', 10.0))
+        INTENT_MODEL = os.getenv('INTENT_MODEL', 'llama-3.1-8b-instant')
+        RESPONSE_MODEL = os.getenv('RESPONSE_MODEL', 'llama3-70b-8192')
+        FALLBACK_MODEL = os.getenv('FALLBACK_MODEL', 'llama-3.3-70b-versatile')
+        LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 15.0))
+        LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 1))
+        TENANT_MODEL_OVERRIDES = json.loads(os.getenv('TENANT_MODEL_OVERRIDES', '{}'))
+        CHAT_DEADLINE = float(os.getenv('CHAT_DEADLINE', 20.0))
+        RESPONSE_MIN_BUDGET = float(os.getenv('RESPONSE_MIN_BUDGET', 2.0))
+        INTENT_HEDGE = os.getenv('INTENT_HEDGE', 'false').lower() == 'true'
+        INTENT_HEDGE_DELAY = float(os.getenv('INTENT_HEDGE_DELAY', 1.0))
+        INTENT_HEDGE_MIN_SAMPLES = int(os.getenv('INTENT_HEDGE_MIN_SAMPLES', 20))
+        INTENT_HEDGE_WORKERS = int(os.getenv('INTENT_HEDGE_WORKERS', 16))
     settings = Settings()
 
 class BookingState(TypedDict):
@@ -38,12 +66,25 @@ class BookingState(TypedDict):
 class GroqLLMWrapper:
     """Wrapper to make Groq API compatible with LangChain-style interfaces"""
     
-    def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "llama3-70b-8192", fallback_model: str = None,
+                 timeout: float = None, max_retries: int = 2):
+        self.client = Groq(api_key=api_key, max_retries=max_retries)
         self.model = model
+        self.fallback_model = fallback_model
+        self.timeout = timeout
     
-    def invoke(self, messages):
-        """Convert LangChain-style messages to Groq format and get response"""
+    def invoke(self, messages, response_format: Dict[str, Any] = None, model: str = None,
+               deadline: float = None):
+        """Convert LangChain-style messages to Groq format and get response
+        
+        ``response_format`` is passed through to the API, e.g. JSON mode.
+        ``model`` overrides the default model for this call; if the call
+        fails or times out it is retried once on ``fallback_model``.
+        ``deadline`` (a ``time.monotonic()`` value) caps the timeout of
+        every attempt, and no attempt is started once it has passed.
+        Raises ``TurnCancelled`` instead of starting an attempt for a
+        cancelled turn.
+        """
         # Convert messages to Groq format
         groq_messages = []
         
@@ -60,36 +101,96 @@ class GroqLLMWrapper:
             else:
                 groq_messages.append({"role": "user", "content": str(msg)})
         
-        try:
-            response = self.client.chat.completions.create(
-                messages=groq_messages,
-                model=self.model,
-                temperature=0.1,
-                max_tokens=1000
-            )
+        options = {"response_format": response_format} if response_format else {}
+        
+        models = [model or self.model]
+        if self.fallback_model and self.fallback_model not in models:
+            models.append(self.fallback_model)
+        
+        error = None
+        for attempt, model_name in enumerate(models):
+            cancellation.check("llm")
+            timeout = self.timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.incr("llm.deadline_skips")
+                    error = error or TimeoutError("request deadline reached")
+                    break
+                timeout = min(timeout, remaining) if timeout else remaining
+            if timeout:
+                options["timeout"] = timeout
             
-            # Return object with content attribute to match LangChain interface
-            class Response:
-                def __init__(self, content):
-                    self.content = content
+            started = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    messages=groq_messages,
+                    model=model_name,
+                    temperature=0.1,
+                    max_tokens=1000,
+                    **options
+                )
+                metrics.incr(f"llm.calls.{model_name}")
+                metrics.incr(f"llm.latency_seconds.{model_name}", time.perf_counter() - started)
+                
+                # Return object with content attribute to match LangChain interface
+                class Response:
+                    def __init__(self, content):
+                        self.content = content
+                
+                return Response(response.choices[0].message.content)
             
-            return Response(response.choices[0].message.content)
+            except Exception as e:
+                metrics.incr(f"llm.errors.{model_name}")
+                error = e
+                if attempt + 1 < len(models):
+                    metrics.incr("llm.fallbacks")
+                    logging.warning(f"Groq call on {model_name} failed, falling back to {models[attempt + 1]}: {e}")
         
-        except Exception as e:
-            logging.error(f"Groq API call failed: {e}")
-            class ErrorResponse:
-                def __init__(self, error_msg):
-                    self.content = f"I'm having trouble processing that request. Error: {error_msg}"
-            return ErrorResponse(str(e))
+        logging.error(f"Groq API call failed: {error}")
+        class ErrorResponse:
+            failed = True
+            
+            def __init__(self, error_msg):
+                self.content = f"I'm having trouble processing that request. Error: {error_msg}"
+        return ErrorResponse(str(error))
 
 class BookingAgent:
     def __init__(self):
-        # Initialize Groq LLM instead of OpenAI
+        # Initialize Groq LLM instead of OpenAI; failed calls retry on the fallback model
         self.llm = GroqLLMWrapper(
             api_key=settings.GROQ_API_KEY,
-            model="llama3-70b-8192"  # You can change this to other models
+            model=settings.RESPONSE_MODEL,
+            fallback_model=settings.FALLBACK_MODEL or None,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=settings.LLM_MAX_RETRIES
+        )
+        # Classification runs on a small fast model, replies on the large one
+        self.node_models = {"intent": settings.INTENT_MODEL, "respond": settings.RESPONSE_MODEL}
+        self.tenant_models = settings.TENANT_MODEL_OVERRIDES
+        self.tools = [check_availability, book_appointment, check_recurring_availability,
+                      book_recurring_appointment, get_current_time]
+        self.history_window = HistoryWindow(
+            max_tokens=settings.HISTORY_TOKEN_CAP,
+            summary_tokens=settings.HISTORY_SUMMARY_TOKENS
         )
-        self.tools = [check_availability, book_appointment, get_current_time]
+        
+        # Speculative free/busy fetches that overlap with intent extraction
+        self.prefetch_executor = None
+        if settings.CALENDAR_PREFETCH_DAYS > 0:
+            self.prefetch_executor = ThreadPoolExecutor(
+                max_workers=settings.CALENDAR_PREFETCH_WORKERS,
+                thread_name_prefix="calendar-prefetch"
+            )
+        
+        # Hedged intent calls: a duplicate request goes out once the first is slower than p95
+        self.intent_latency = LatencyWindow()
+        self.hedge_executor = None
+        if settings.INTENT_HEDGE:
+            self.hedge_executor = ThreadPoolExecutor(
+                max_workers=settings.INTENT_HEDGE_WORKERS,
+                thread_name_prefix="intent-hedge"
+            )
         
         if LANGGRAPH_AVAILABLE:
             self.graph = self._build_graph()
@@ -103,15 +204,13 @@ class BookingAgent:
             
         workflow = StateGraph(BookingState)
         
-        # Add nodes
-        workflow.add_node("understand_intent", self._understand_intent)
-        workflow.add_node("check_calendar", self._check_calendar)
-        workflow.add_node("confirm_booking", self._confirm_booking)
-        workflow.add_node("complete_booking", self._complete_booking)
-        workflow.add_node("respond", self._respond)
+        # Add nodes; each checks for cancellation before it runs
+        for name, node in self._nodes():
+            workflow.add_node(name, self._cancellable(name, node))
         
         # Add edges
-        workflow.set_entry_point("understand_intent")
+        workflow.set_entry_point("prefetch_calendar")
+        workflow.add_edge("prefetch_calendar", "understand_intent")
         workflow.add_edge("understand_intent", "check_calendar")
         workflow.add_edge("check_calendar", "confirm_booking")
         workflow.add_edge("confirm_booking", "complete_booking")
@@ -120,60 +219,154 @@ class BookingAgent:
         
         return workflow.compile()
     
-    def _understand_intent(self, state: BookingState) -> BookingState:
-        """Understand user intent and extract booking details"""
-        user_message = state["user_input"]
+    def _nodes(self):
+        """The turn's steps, in order"""
+        return [
+            ("prefetch_calendar", self._prefetch_calendar),
+            ("understand_intent", self._understand_intent),
+            ("check_calendar", self._check_calendar),
+            ("confirm_booking", self._confirm_booking),
+            ("complete_booking", self._complete_booking),
+            ("respond", self._respond),
+        ]
+    
+    @staticmethod
+    def _cancellable(name: str, node):
+        def run(state: BookingState) -> BookingState:
+            cancellation.check(name)
+            return node(state)
+        return run
+    
+    def _prefetch_calendar(self, state: BookingState) -> BookingState:
+        """Start fetching the default availability window in the background
         
-        # Enhanced prompt for better Groq performance
-        prompt = f"""
-        You are a professional appointment booking assistant. Analyze the user's message and extract booking information.
+        Most booking turns end up checking the next few days, so the fetch
+        runs while the intent LLM call is in flight and _check_calendar
+        reuses it when the requested dates fall inside the window.
+        """
+        if self.prefetch_executor:
+            today = datetime.now()
+            window = (
+                today.strftime('%Y-%m-%d'),
+                (today + timedelta(days=settings.CALENDAR_PREFETCH_DAYS)).strftime('%Y-%m-%d')
+            )
+            # Run in a copy of this context so per-turn context (e.g. cassette recording) follows
+            future = self.prefetch_executor.submit(
+                contextvars.copy_context().run,
+                prefetch_free_busy, *window, state["session_data"].get("tenant_id")
+            )
+            state["session_data"]["prefetch"] = (window, future)
+            metrics.incr("prefetch.started")
+        return state
+    
+    def _settle_prefetch(self, state: BookingState, start_date: str = None, end_date: str = None):
+        """Wait for the prefetch if it covers the dates needed, otherwise discard it"""
+        prefetch = state["session_data"].pop("prefetch", None)
+        if not prefetch:
+            return
         
-        User message: "{user_message}"
+        (window_start, window_end), future = prefetch
+        # YYYY-MM-DD strings order like the dates they name
+        if start_date and end_date and window_start <= start_date and end_date <= window_end:
+            try:
+                # Never wait past the turn's deadline for it
+                future.result(timeout=max(0.0, min(settings.CALENDAR_PREFETCH_WAIT, self._remaining(state))))
+                metrics.incr("prefetch.reused")
+            except Exception as e:
+                logging.warning(f"Calendar prefetch failed: {e}")
+        else:
+            # Not needed: drop it if it has not started, otherwise let it warm the cache
+            future.cancel()
+            metrics.incr("prefetch.discarded")
+    
+    def _model_for(self, node: str, state: BookingState) -> str:
+        """Model for a graph node, honouring per-tenant overrides"""
+        overrides = self.tenant_models.get(state["session_data"].get("tenant_id") or "", {})
+        return overrides.get(node) or self.node_models[node]
+    
+    def _remaining(self, state: BookingState) -> float:
+        """Seconds left in the turn's time budget (infinite without a deadline)"""
+        deadline = state["session_data"].get("deadline")
+        return float("inf") if deadline is None else deadline - time.monotonic()
+    
+    def _timed_invoke(self, messages, **kwargs):
+        started = time.monotonic()
+        response = self.llm.invoke(messages, **kwargs)
+        if not getattr(response, "failed", False):
+            self.intent_latency.add(time.monotonic() - started)
+        return response
+    
+    def _hedge_delay(self) -> float:
+        if len(self.intent_latency) < settings.INTENT_HEDGE_MIN_SAMPLES:
+            return settings.INTENT_HEDGE_DELAY
+        return self.intent_latency.percentile(0.95)
+    
+    def _invoke_intent(self, messages, **kwargs):
+        """Intent call, hedged with a second identical request if the first is slow
         
-        Extract the following information and respond ONLY with a valid JSON object:
-        - intent: one of [book_appointment, check_availability, confirm_booking, general_inquiry]
-        - details: object containing:
-          - date: date in YYYY-MM-DD format if mentioned (null if not specified)
-          - time: time in HH:MM format if mentioned (null if not specified)
-          - duration: duration in minutes (default 60 if not specified)
-          - title: purpose/title of meeting (default "Meeting" if not specified)
-          - needs_clarification: array of missing information needed
-
-        Examples:
-        - "Book a meeting tomorrow at 2 PM" → {{"intent": "book_appointment", "details": {{"date": "2024-XX-XX", "time": "14:00", "duration": 60, "title": "Meeting", "needs_clarification": []}}}}
-        - "Do you have time Friday?" → {{"intent": "check_availability", "details": {{"date": null, "time": null, "duration": 60, "title": "Meeting", "needs_clarification": ["specific_date", "preferred_time"]}}}}
-
-        JSON Response:
+        The first successful answer wins; the slower call is left to finish
+        in the background since an in-flight HTTP request cannot be cancelled.
         """
+        if not self.hedge_executor:
+            return self._timed_invoke(messages, **kwargs)
         
+        primary = self.hedge_executor.submit(contextvars.copy_context().run, self._timed_invoke, messages, **kwargs)
+        done, _ = cancellation.wait_first([primary], self._hedge_delay(), "intent_hedge")
+        if done:
+            return primary.result()
+        
+        metrics.incr("intent.hedges")
+        hedge = self.hedge_executor.submit(contextvars.copy_context().run, self._timed_invoke, messages, **kwargs)
+        pending, response = {primary, hedge}, None
+        while pending:
+            done, pending = cancellation.wait_first(pending, where="intent_hedge")
+            for future in done:
+                response = future.result()
+                if not getattr(response, "failed", False):
+                    if future is hedge:
+                        metrics.incr("intent.hedge_wins")
+                    return response
+        return response
+    
+    def _understand_intent(self, state: BookingState) -> BookingState:
+        """Understand user intent and extract booking details"""
+        user_message = state["user_input"]
+        
+        messages = intent_messages(
+            user_message,
+            today=datetime.now().strftime('%Y-%m-%d (%A)'),
+            history=state["session_data"].get("history", "")
+        )
+        
+        metrics.incr("intent.requests")
+        result = None
         try:
-            # Create message in the format expected by the wrapper
-            class SystemMessage:
-                def __init__(self, content):
-                    self.content = content
-            
-            response = self.llm.invoke([SystemMessage(content=prompt)])
-            
-            # Clean the response to extract JSON
-            content = response.content.strip()
-            
-            # Try to find JSON in the response
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = content[json_start:json_end]
-                result = json.loads(json_str)
+            # JSON mode: the provider guarantees a single JSON object
+            response = self._invoke_intent(
+                messages,
+                response_format=JSON_RESPONSE_FORMAT,
+                model=self._model_for("intent", state),
+                deadline=state["session_data"].get("deadline")
+            )
+            if getattr(response, "failed", False):
+                metrics.incr("intent.llm_errors")
             else:
-                # Fallback if no proper JSON found
-                result = json.loads(content)
-            
-            state["intent"] = result.get("intent", "general_inquiry")
-            state["booking_details"] = result.get("details", {})
-            
+                result = parse_intent(response.content)
+        
+        except TurnCancelled:
+            raise
+        except IntentParseError as e:
+            metrics.incr("intent.parse_failures")
+            logging.warning(f"Intent extraction returned invalid JSON: {e}")
         except Exception as e:
-            # Enhanced fallback parsing
+            metrics.incr("intent.llm_errors")
             logging.warning(f"Intent extraction failed: {e}")
+        
+        if result:
+            state["intent"] = result.intent
+            state["booking_details"] = result.details.model_dump()
+        else:
+            # Enhanced fallback parsing
             state["intent"] = "general_inquiry"
             state["booking_details"] = self._parse_basic_intent(user_message)
         
@@ -239,36 +432,47 @@ class BookingAgent:
     def _check_calendar(self, state: BookingState) -> BookingState:
         """Check calendar availability with better error handling"""
         details = state["booking_details"]
+        tenant_id = state["session_data"].get("tenant_id") or ""
         
-        if state["intent"] in ["book_appointment", "check_availability"]:
+        if state["intent"] not in ["book_appointment", "check_availability"]:
+            self._settle_prefetch(state)
+        else:
             try:
                 if details.get("date"):
                     # Check availability for the specified date
                     start_date = details["date"]
                     end_date = details["date"]
                     duration = details.get("duration", 60)
+                    self._settle_prefetch(state, start_date, end_date)
                     
                     result = check_availability.invoke({
                         "start_date": start_date,
                         "end_date": end_date,
-                        "duration_minutes": duration
+                        "duration_minutes": duration,
+                        "limit": 10,
+                        "preferred_time": details.get("time"),
+                        "tenant_id": tenant_id
                     })
                     
-                    state["available_slots"] = result if isinstance(result, list) else []
+                    self._store_slots(state, result)
                 else:
                     # Check next few days if no specific date
                     today = datetime.now()
                     end_date = today + timedelta(days=7)
+                    self._settle_prefetch(state, today.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
                     
                     result = check_availability.invoke({
                         "start_date": today.strftime('%Y-%m-%d'),
                         "end_date": end_date.strftime('%Y-%m-%d'),
-                        "duration_minutes": details.get("duration", 60)
+                        "duration_minutes": details.get("duration", 60),
+                        "limit": 5,  # Top 5 slots for better UX; stops the search early
+                        "tenant_id": tenant_id
                     })
                     
-                    # Limit to top 5 slots for better UX
-                    state["available_slots"] = (result[:5] if isinstance(result, list) else [])
+                    self._store_slots(state, result)
                     
+            except TurnCancelled:
+                raise
             except Exception as e:
                 logging.error(f"Calendar check failed: {e}")
                 state["available_slots"] = []
@@ -276,6 +480,17 @@ class BookingAgent:
         
         return state
     
+    def _store_slots(self, state: BookingState, result: Any):
+        """Keep the slots check_availability found, or record that it could not check"""
+        slots = result if isinstance(result, list) else []
+        if slots and "error" in slots[0]:
+            # An unreadable calendar must not look like a fully booked (or free) one
+            logging.error(slots[0]["error"])
+            state["available_slots"] = []
+            state["booking_details"]["error"] = "Could not check calendar availability"
+        else:
+            state["available_slots"] = slots
+    
     def _confirm_booking(self, state: BookingState) -> BookingState:
         """Handle booking confirmation with better intent detection"""
         user_input_lower = state["user_input"].lower()
@@ -307,7 +522,8 @@ class BookingAgent:
                     "title": title,
                     "start_time": slot["start"],
                     "end_time": slot["end"],
-                    "description": f"Booked via TailorTalk assistant"
+                    "description": f"Booked via TailorTalk assistant",
+                    "tenant_id": state["session_data"].get("tenant_id") or ""
                 })
                 
                 state["booking_details"]["booking_result"] = result
@@ -318,8 +534,25 @@ class BookingAgent:
         
         return state
     
+    def _template_reply(self, state: BookingState) -> str:
+        """Reply built without the LLM, from the slots and details found so far"""
+        slots = state.get("available_slots", [])
+        if slots:
+            slot_text = "\n".join([f"• {slot.get('formatted', slot.get('time', 'Available slot'))}" for slot in slots[:3]])
+            return f"I found these available times:\n{slot_text}\n\nWhich one works best for you?"
+        elif state["booking_details"].get("error"):
+            return "I couldn't reach the calendar just now. Please try again in a moment."
+        else:
+            return "I'm here to help you book appointments. What would you like to schedule?"
+    
     def _respond(self, state: BookingState) -> BookingState:
         """Generate appropriate response using Groq"""
+        if self._remaining(state) < settings.RESPONSE_MIN_BUDGET:
+            # Not enough of the turn's budget left for an LLM reply
+            metrics.incr("deadline.template_replies")
+            state["messages"] = [{"role": "assistant", "content": self._template_reply(state)}]
+            return state
+        
         intent = state["intent"]
         details = state["booking_details"]
         slots = state.get("available_slots", [])
@@ -328,52 +561,38 @@ class BookingAgent:
         context = {
             "intent": intent,
             "details": details,
-            "available_slots": slots[:3],  # Limit for better response
+            # Only the display times; ISO bounds just cost prompt tokens
+            "available_slots": [slot.get("time", slot.get("formatted")) for slot in slots[:3]],
             "confirmation_pending": state.get("confirmation_pending", False),
             "booking_confirmed": state.get("booking_confirmed", False)
         }
         
         try:
-            response_prompt = f"""
-            You are a friendly, professional appointment booking assistant. Generate a natural response based on this context.
-
-            Context: {json.dumps(context, default=str, indent=2)}
-            User input: "{state['user_input']}"
-
-            Guidelines:
-            - Be conversational and helpful
-            - If showing available slots, present them clearly with times
-            - If booking is confirmed, be enthusiastic and provide details
-            - If information is missing, ask specific questions
-            - Keep responses concise but complete
-            - Use a friendly, professional tone
-
-            Response:
-            """
-            
-            class SystemMessage:
-                def __init__(self, content):
-                    self.content = content
-            
-            response = self.llm.invoke([SystemMessage(content=response_prompt)])
+            messages = response_messages(
+                state["user_input"],
+                context=json.dumps(context, default=str, separators=(',', ':')),
+                history=state["session_data"].get("history", "")
+            )
+            response = self.llm.invoke(
+                messages,
+                model=self._model_for("respond", state),
+                deadline=state["session_data"].get("deadline")
+            )
+            if getattr(response, "failed", False):
+                raise RuntimeError(response.content)
             state["messages"] = [{"role": "assistant", "content": response.content}]
             
+        except TurnCancelled:
+            raise
         except Exception as e:
             logging.error(f"Response generation failed: {e}")
             # Fallback response based on context
-            if slots:
-                slot_text = "\n".join([f"• {slot.get('formatted', slot.get('time', 'Available slot'))}" for slot in slots[:3]])
-                fallback_response = f"I found these available times:\n{slot_text}\n\nWhich one works best for you?"
-            else:
-                fallback_response = "I'm here to help you book appointments. What would you like to schedule?"
-            
-            state["messages"] = [{"role": "assistant", "content": fallback_response}]
+            state["messages"] = [{"role": "assistant", "content": self._template_reply(state)}]
         
         return state
     
-    def _process_without_langgraph(self, message: str, session_id: str = None) -> dict:
-        """Process message without LangGraph (fallback method)"""
-        state = BookingState(
+    def _initial_state(self, message: str, session_data: Dict[str, Any]) -> BookingState:
+        return BookingState(
             messages=[],
             user_input=message,
             intent="",
@@ -381,16 +600,10 @@ class BookingAgent:
             available_slots=[],
             confirmation_pending=False,
             booking_confirmed=False,
-            session_data={}
+            session_data=session_data
         )
-        
-        # Process through each step manually
-        state = self._understand_intent(state)
-        state = self._check_calendar(state)
-        state = self._confirm_booking(state)
-        state = self._complete_booking(state)
-        state = self._respond(state)
-        
+    
+    def _build_result(self, state: BookingState, session_id: str = None) -> dict:
         return {
             "response": state["messages"][-1]["content"] if state["messages"] else "I'm here to help you book appointments. What would you like to schedule?",
             "session_id": session_id or "default",
@@ -405,8 +618,31 @@ class BookingAgent:
             ]
         }
     
-    def process_message(self, message: str, session_id: str = None) -> dict:
-        """Process a user message and return response"""
+    def _process_without_langgraph(self, state: BookingState) -> BookingState:
+        """Process message without LangGraph (fallback method)"""
+        # Process through each step manually
+        for name, node in self._nodes():
+            state = self._cancellable(name, node)(state)
+        return state
+    
+    def process_message(self, message: str, session_id: str = None,
+                        history: List[Dict[str, Any]] = None,
+                        summary: Dict[str, Any] = None, tenant_id: str = None,
+                        deadline: float = None, cancel: CancelToken = None) -> dict:
+        """Process a user message and return response
+        
+        ``history`` is the earlier conversation (oldest first) and ``summary``
+        the rolling summary state returned by the previous turn; the updated
+        summary comes back under the ``summary`` key. ``tenant_id`` selects
+        whose calendar is used (the default calendar if omitted).
+        ``deadline`` is the ``time.monotonic()`` by which the reply is due;
+        it defaults to CHAT_DEADLINE seconds from now. Once ``cancel`` is
+        cancelled the turn stops at its next checkpoint and the result has
+        ``cancelled`` set.
+        """
+        if deadline is None and settings.CHAT_DEADLINE > 0:
+            deadline = time.monotonic() + settings.CHAT_DEADLINE
+        
         if not message or not message.strip():
             return {
                 "response": "Hi! I'm your appointment booking assistant. I can help you schedule meetings, check availability, and manage your calendar. What would you like to schedule?",
@@ -415,37 +651,36 @@ class BookingAgent:
                 "suggested_slots": []
             }
         
+        handle = cancellation.bind(cancel)
         try:
+            recent, summary = self.history_window.build(history or [], summary)
+            state = self._initial_state(message, {
+                "history": render_history(recent, summary["text"]),
+                "tenant_id": tenant_id,
+                "deadline": deadline
+            })
+            
             if LANGGRAPH_AVAILABLE and self.graph:
-                initial_state = BookingState(
-                    messages=[],
-                    user_input=message,
-                    intent="",
-                    booking_details={},
-                    available_slots=[],
-                    confirmation_pending=False,
-                    booking_confirmed=False,
-                    session_data={}
-                )
-                
-                final_state = self.graph.invoke(initial_state)
-                
-                return {
-                    "response": final_state["messages"][-1]["content"] if final_state["messages"] else "I'm here to help you book appointments. What would you like to schedule?",
-                    "session_id": session_id or "default",
-                    "booking_confirmed": final_state.get("booking_confirmed", False),
-                    "suggested_slots": [
-                        {
-                            "start": slot.get("start", ""),
-                            "end": slot.get("end", ""),
-                            "time": slot.get("formatted", slot.get("time", ""))
-                        } 
-                        for slot in final_state.get("available_slots", [])[:3]
-                    ]
-                }
+                final_state = self.graph.invoke(state)
             else:
-                return self._process_without_langgraph(message, session_id)
-                
+                final_state = self._process_without_langgraph(state)
+            if deadline is not None and time.monotonic() > deadline:
+                metrics.incr("deadline.exceeded")
+            
+            result = self._build_result(final_state, session_id)
+            result["summary"] = summary
+            return result
+        
+        except TurnCancelled as e:
+            metrics.incr("cancel.turns")
+            logging.info(str(e))
+            return {
+                "response": "",
+                "session_id": session_id or "default",
+                "booking_confirmed": False,
+                "suggested_slots": [],
+                "cancelled": True
+            }
         except Exception as e:
             logging.error(f"Message processing failed: {e}")
             return {
@@ -454,8 +689,11 @@ class BookingAgent:
                 "booking_confirmed": False,
                 "suggested_slots": []
             }
+        finally:
+            cancellation.unbind(handle)
     
-    def confirm_booking(self, slot_data: dict, session_id: str = None) -> dict:
+    def confirm_booking(self, slot_data: dict, session_id: str = None, booking_id: str = None,
+                        tenant_id: str = None) -> dict:
         """Confirm a specific booking slot"""
         try:
             title = slot_data.get("title", "Meeting")
@@ -464,7 +702,9 @@ class BookingAgent:
                 "title": title,
                 "start_time": slot_data["start"],
                 "end_time": slot_data["end"],
-                "description": f"Booked via TailorTalk assistant"
+                "description": f"Booked via TailorTalk assistant",
+                "booking_id": booking_id or "",
+                "tenant_id": tenant_id or ""
             })
             
             if result.get("success", False):
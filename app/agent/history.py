@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+class HistoryWindow:
+    """Sliding window over conversation history with a rolling summary.
+
+    The most recent turns are kept verbatim while they fit in ``max_tokens``
+    minus the ``summary_tokens`` reserved for the summary.
+    Turns that slide out are folded into a short summary exactly once; the
+    summary state (``{"upto": int, "text": str}``) is returned to the caller
+    and handed back on the next turn, so each turn only does work for the
+    messages that left the window since the previous one.
+    """
+
+    def __init__(self, max_tokens: int = 400, summary_tokens: int = 100, snippet_chars: int = 80):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.snippet_chars = snippet_chars
+
+    def _line(self, message: Dict[str, Any]) -> str:
+        role = "User" if message.get("role") == "user" else "Assistant"
+        return f"{role}: {message.get('content', '')}"
+
+    def _snippet(self, message: Dict[str, Any]) -> str:
+        content = " ".join(str(message.get("content", "")).split())
+        if len(content) > self.snippet_chars:
+            content = content[:self.snippet_chars - 3] + "..."
+        role = "user" if message.get("role") == "user" else "assistant"
+        return f"{role}: {content}"
+
+    def build(self, messages: List[Dict[str, Any]],
+              summary: Optional[Dict[str, Any]] = None) -> Tuple[List[str], Dict[str, Any]]:
+        """Return (recent lines within the token cap, updated summary state)"""
+        summary = dict(summary or {"upto": 0, "text": ""})
+        upto = min(summary.get("upto", 0), len(messages))
+
+        # Take turns newest-first until the budget left after the summary is spent
+        budget = self.max_tokens - self.summary_tokens
+        recent: List[str] = []
+        first_kept = len(messages)
+        for index in range(len(messages) - 1, upto - 1, -1):
+            line = self._line(messages[index])
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            recent.append(line)
+            budget -= cost
+            first_kept = index
+        recent.reverse()
+
+        # Fold everything that slid out of the window into the summary
+        if first_kept > upto:
+            folded = [self._snippet(m) for m in messages[upto:first_kept]]
+            text = "; ".join(filter(None, [summary.get("text", "")] + folded))
+            max_chars = self.summary_tokens * 4
+            if len(text) > max_chars:
+                # Oldest context goes first
+                text = "..." + text[-(max_chars - 3):]
+            summary = {"upto": first_kept, "text": text}
+
+        return recent, summary
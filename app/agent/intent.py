@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# Provider-side JSON mode: the model must return a single JSON object
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+class IntentDetails(BaseModel):
+    """Booking details extracted from a user message"""
+    date: Optional[str] = None
+    time: Optional[str] = None
+    duration: int = 60
+    title: str = "Meeting"
+    needs_clarification: List[str] = Field(default_factory=list)
+
+    @field_validator("date", mode="before")
+    @classmethod
+    def _iso_date(cls, value):
+        # Anything but YYYY-MM-DD (e.g. "<tomorrow>") means no usable date
+        if not value:
+            return None
+        try:
+            datetime.strptime(str(value), '%Y-%m-%d')
+        except ValueError:
+            return None
+        return str(value)
+
+    @field_validator("duration", mode="before")
+    @classmethod
+    def _default_duration(cls, value):
+        return 60 if value in (None, "") else value
+
+    @field_validator("title", mode="before")
+    @classmethod
+    def _default_title(cls, value):
+        return value or "Meeting"
+
+    @field_validator("needs_clarification", mode="before")
+    @classmethod
+    def _list_or_empty(cls, value):
+        return value or []
+
+
+class IntentExtraction(BaseModel):
+    """The intent classifier's output"""
+    intent: Literal["book_appointment", "check_availability", "confirm_booking", "general_inquiry"]
+    details: IntentDetails = Field(default_factory=IntentDetails)
+
+
+class IntentParseError(ValueError):
+    """The model's reply is not a valid intent object"""
+
+
+def parse_intent(content: str) -> IntentExtraction:
+    """Parse and validate the classifier's JSON reply in one pass"""
+    if not content:
+        raise IntentParseError("empty reply")
+    try:
+        # pydantic-core parses the JSON and validates it without an intermediate dict
+        return IntentExtraction.model_validate_json(content)
+    except ValidationError as e:
+        raise IntentParseError(str(e)) from e
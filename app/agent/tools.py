@@ -1,19 +1,96 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain.tools import tool
-from ..calendar_service import GoogleCalendarService
+from ..calendar_service import CalendarUnavailableError, GoogleCalendarService, event_id_for_booking
+from ..cancellation import TurnCancelled
+from ..calendar_pool import CalendarServicePool
+from ..rate_limiter import CalendarRateLimiter, SPECULATIVE
+from ..recurrence import book_recurring, check_recurring
 from ..config import settings
 import pytz
 
+# One quota guard for the whole Google Cloud project, shared by every tenant
+calendar_rate_limiter = CalendarRateLimiter(
+    project_rate=settings.CALENDAR_PROJECT_QPS,
+    project_burst=settings.CALENDAR_PROJECT_BURST,
+    calendar_rate=settings.CALENDAR_PER_CALENDAR_QPS,
+    calendar_burst=settings.CALENDAR_PER_CALENDAR_BURST,
+    reserve=settings.CALENDAR_BOOKING_RESERVE,
+    max_wait=settings.CALENDAR_RATE_LIMIT_MAX_WAIT
+)
+
 # Initialize calendar service
 calendar_service = GoogleCalendarService(
     credentials_file=settings.GOOGLE_CALENDAR_CREDENTIALS_FILE,
     token_file=settings.GOOGLE_CALENDAR_TOKEN_FILE,
-    calendar_id=settings.CALENDAR_ID
+    calendar_id=settings.CALENDAR_ID,
+    cache_ttl=settings.FREEBUSY_CACHE_TTL,
+    refresh_margin=settings.GOOGLE_TOKEN_REFRESH_MARGIN,
+    rate_limiter=calendar_rate_limiter,
+    quota_retries=settings.CALENDAR_QUOTA_RETRIES,
+    coalesce=settings.FREEBUSY_COALESCE
+)
+
+# Per-tenant calendar clients; requests without a tenant use calendar_service
+calendar_pool = CalendarServicePool(
+    tenants_dir=settings.TENANT_CREDENTIALS_DIR,
+    default=calendar_service,
+    credentials_file=settings.GOOGLE_CALENDAR_CREDENTIALS_FILE,
+    max_size=settings.TENANT_POOL_SIZE,
+    idle_timeout=settings.TENANT_IDLE_TIMEOUT,
+    cache_ttl=settings.FREEBUSY_CACHE_TTL,
+    refresh_margin=settings.GOOGLE_TOKEN_REFRESH_MARGIN,
+    rate_limiter=calendar_rate_limiter,
+    quota_retries=settings.CALENDAR_QUOTA_RETRIES,
+    coalesce=settings.FREEBUSY_COALESCE
 )
 
+# Calendar standing in for every tenant's during one turn (the warm-up turn's stub)
+_turn_calendar: ContextVar[Optional[GoogleCalendarService]] = ContextVar("turn_calendar", default=None)
+
+@contextmanager
+def turn_calendar(calendar: GoogleCalendarService):
+    """Send the tools' calendar calls made in this context (and prefetches it starts) to ``calendar``"""
+    handle = _turn_calendar.set(calendar)
+    try:
+        yield calendar
+    finally:
+        _turn_calendar.reset(handle)
+
+def _calendar_for(tenant_id: Optional[str]) -> GoogleCalendarService:
+    return _turn_calendar.get() or calendar_pool.get(tenant_id)
+
+def _date_range(start_date: str, end_date: str):
+    """Timezone-aware bounds covering whole days from start_date through end_date"""
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    
+    # Make timezone aware (assuming local timezone)
+    local_tz = pytz.timezone('UTC')  # You can change this to user's timezone
+    return local_tz.localize(start_dt), local_tz.localize(end_dt)
+
+def _parse_start(start_time: str, timezone: str = "") -> datetime:
+    """ISO start time in ``timezone`` (converted if it has an offset); naive values without one are UTC"""
+    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    tz = pytz.timezone(timezone) if timezone else pytz.utc
+    if start_dt.tzinfo is None:
+        return tz.localize(start_dt)
+    return start_dt.astimezone(tz) if timezone else start_dt
+
+def prefetch_free_busy(start_date: str, end_date: str, tenant_id: Optional[str] = None) -> int:
+    """Warm the free/busy cache for the days check_availability would query
+    
+    Runs at speculative priority: it is skipped rather than queued when quota is short.
+    """
+    start_dt, end_dt = _date_range(start_date, end_date)
+    return len(_calendar_for(tenant_id).get_free_busy(start_dt, end_dt, SPECULATIVE))
+
 @tool
-def check_availability(start_date: str, end_date: str, duration_minutes: int = 60) -> List[Dict[str, Any]]:
+def check_availability(start_date: str, end_date: str, duration_minutes: int = 60,
+                       limit: int = 10, preferred_time: Optional[str] = None,
+                       tenant_id: str = "") -> List[Dict[str, Any]]:
     """
     Check calendar availability for a given date range.
     
@@ -21,33 +98,41 @@ def check_availability(start_date: str, end_date: str, duration_minutes: int = 6
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format  
         duration_minutes: Duration of the meeting in minutes (default 60)
+        limit: Maximum number of slots to return (default 10)
+        preferred_time: Optional HH:MM time on start_date; returns the slots closest to it
+        tenant_id: Optional tenant whose calendar is checked (default calendar if empty)
     
     Returns:
         List of available time slots
     """
     try:
         # Parse dates
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        start_dt, end_dt = _date_range(start_date, end_date)
+        local_tz = start_dt.tzinfo
         
-        # Make timezone aware (assuming local timezone)
-        local_tz = pytz.timezone('UTC')  # You can change this to user's timezone
-        start_dt = local_tz.localize(start_dt)
-        end_dt = local_tz.localize(end_dt)
+        preferred_dt = None
+        if preferred_time:
+            try:
+                preferred_dt = local_tz.localize(datetime.strptime(f"{start_date} {preferred_time}", '%Y-%m-%d %H:%M'))
+            except ValueError:
+                preferred_dt = None  # Unparseable times just fall back to chronological order
         
-        # Get available slots
-        slots = calendar_service.find_available_slots(
-            start_dt, end_dt, duration_minutes
+        # Get available slots; the search stops once `limit` slots are found
+        slots = _calendar_for(tenant_id).find_available_slots(
+            start_dt, end_dt, duration_minutes, limit=limit, preferred_time=preferred_dt
         )
         
         return [{"time": slot["formatted"], "start": slot["start"].isoformat(), "end": slot["end"].isoformat()} 
-                for slot in slots[:10]]  # Limit to 10 slots
+                for slot in slots]
     
+    except TurnCancelled:
+        raise
     except Exception as e:
         return [{"error": f"Error checking availability: {str(e)}"}]
 
 @tool  
-def book_appointment(title: str, start_time: str, end_time: str, description: str = "") -> Dict[str, Any]:
+def book_appointment(title: str, start_time: str, end_time: str, description: str = "",
+                     booking_id: str = "", tenant_id: str = "") -> Dict[str, Any]:
     """
     Book an appointment in the calendar.
     
@@ -56,9 +141,11 @@ def book_appointment(title: str, start_time: str, end_time: str, description: st
         start_time: Start time in ISO format
         end_time: End time in ISO format
         description: Optional description
+        booking_id: Optional booking ID; makes retries of the same booking idempotent
+        tenant_id: Optional tenant whose calendar is booked (default calendar if empty)
     
     Returns:
-        Booking confirmation details
+        Booking confirmation details; failures worth retrying carry ``retryable``
     """
     try:
         # Parse datetime strings
@@ -66,7 +153,10 @@ def book_appointment(title: str, start_time: str, end_time: str, description: st
         end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
         
         # Create the event
-        event_id = calendar_service.create_event(title, start_dt, end_dt, description)
+        event_id = _calendar_for(tenant_id).create_event(
+            title, start_dt, end_dt, description,
+            event_id=event_id_for_booking(booking_id) if booking_id else None
+        )
         
         if event_id:
             return {
@@ -77,9 +167,64 @@ def book_appointment(title: str, start_time: str, end_time: str, description: st
         else:
             return {"success": False, "message": "Failed to create calendar event"}
     
+    except (CalendarUnavailableError, OSError) as e:
+        # Rate limited, a Calendar server error or a dropped connection: the same booking may succeed later
+        return {"success": False, "retryable": True, "retry_after": getattr(e, "retry_after", None),
+                "message": f"Error booking appointment: {str(e)}"}
     except Exception as e:
         return {"success": False, "message": f"Error booking appointment: {str(e)}"}
 
+@tool
+def check_recurring_availability(start_time: str, rrule: str, duration_minutes: int = 60,
+                                 timezone: str = "", tenant_id: str = "") -> Dict[str, Any]:
+    """
+    Check every occurrence of a recurring appointment with one calendar query.
+    
+    Args:
+        start_time: First occurrence in ISO format
+        rrule: Recurrence rule, e.g. "FREQ=WEEKLY;BYDAY=TU;COUNT=12" for 12 Tuesdays
+        duration_minutes: Duration of each occurrence in minutes (default 60)
+        timezone: IANA timezone the series repeats in, e.g. "Asia/Kolkata"; needed when start_time has a UTC offset
+        tenant_id: Optional tenant whose calendar is checked (default calendar if empty)
+    
+    Returns:
+        Occurrence counts and the conflicting occurrences with nearby free alternatives
+    """
+    try:
+        return check_recurring(_calendar_for(tenant_id), _parse_start(start_time, timezone), rrule, duration_minutes)
+    except Exception as e:
+        return {"error": f"Error checking recurring availability: {str(e)}"}
+
+@tool
+def book_recurring_appointment(title: str, start_time: str, rrule: str, duration_minutes: int = 60,
+                               timezone: str = "", description: str = "", skip_conflicts: bool = False,
+                               booking_id: str = "", tenant_id: str = "") -> Dict[str, Any]:
+    """
+    Book a recurring appointment as a single recurring calendar event.
+    
+    Args:
+        title: Title of the appointment
+        start_time: First occurrence in ISO format
+        rrule: Recurrence rule, e.g. "FREQ=WEEKLY;BYDAY=TU;COUNT=12"
+        duration_minutes: Duration of each occurrence in minutes (default 60)
+        timezone: IANA timezone the series repeats in, e.g. "Asia/Kolkata"; needed when start_time has a UTC offset
+        description: Optional description
+        skip_conflicts: Book the free occurrences and leave out conflicting ones
+        booking_id: Optional booking ID; makes retries of the same booking idempotent
+        tenant_id: Optional tenant whose calendar is booked (default calendar if empty)
+    
+    Returns:
+        Booking result, including any conflicting occurrences
+    """
+    try:
+        return book_recurring(
+            _calendar_for(tenant_id), title, _parse_start(start_time, timezone), rrule, duration_minutes,
+            description, skip_conflicts,
+            event_id=event_id_for_booking(booking_id) if booking_id else None
+        )
+    except Exception as e:
+        return {"success": False, "message": f"Error booking recurring appointment: {str(e)}"}
+
 @tool
 def get_current_time() -> str:
     """Get the current date and time."""
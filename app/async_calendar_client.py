@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+from google.auth.transport.requests import Request
+
+CALENDAR_API_BASE = "https://www.googleapis.com/calendar/v3"
+
+# One connection pool for every calendar client in the process
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def aclose_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class CalendarAPIError(Exception):
+    """Error response from the Calendar API"""
+
+    def __init__(self, status_code: int, reason: str, message: str = "",
+                 retry_after: Optional[float] = None):
+        super().__init__(f"{status_code} {reason}: {message}")
+        self.status_code = status_code
+        self.reason = reason
+        self.message = message
+        self.retry_after = retry_after
+
+
+class AsyncCalendarClient:
+    """Async client for the Calendar v3 endpoints the booking flow uses.
+
+    Requests are built by hand against the REST API, so there is no discovery
+    document to load, and all clients share one pooled ``httpx.AsyncClient``.
+    """
+
+    def __init__(self, credentials, calendar_id: str = 'primary',
+                 http_client: Optional[httpx.AsyncClient] = None):
+        self.credentials = credentials
+        self.calendar_id = calendar_id
+        self._http_client = http_client
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    def _events_path(self, event_id: Optional[str] = None) -> str:
+        path = f"/calendars/{quote(self.calendar_id, safe='')}/events"
+        if event_id:
+            path += f"/{quote(event_id, safe='')}"
+        return path
+
+    async def _authorization(self) -> str:
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+        return f"Bearer {self.credentials.token}"
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None,
+                       body: Optional[dict] = None) -> Dict[str, Any]:
+        headers = {"Authorization": await self._authorization()}
+        response = await self.http.request(
+            method, CALENDAR_API_BASE + path, params=params, json=body, headers=headers
+        )
+        if response.status_code >= 400:
+            reason, message = response.reason_phrase, response.text
+            try:
+                error = response.json().get("error", {})
+                message = error.get("message", message)
+                reason = (error.get("errors") or [{}])[0].get("reason", reason)
+            except ValueError:
+                pass
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                retry_after = None
+            raise CalendarAPIError(response.status_code, reason, message, retry_after)
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    async def free_busy(self, start_time: datetime, end_time: datetime,
+                        calendar_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Raw freebusy.query response for one or more calendars"""
+        body = {
+            'timeMin': start_time.isoformat(),
+            'timeMax': end_time.isoformat(),
+            'items': [{'id': cal_id} for cal_id in (calendar_ids or [self.calendar_id])],
+        }
+        return await self._request("POST", "/freeBusy", body=body)
+
+    async def get_free_busy(self, start_time: datetime, end_time: datetime) -> List[dict]:
+        response = await self.free_busy(start_time, end_time)
+        return response.get('calendars', {}).get(self.calendar_id, {}).get('busy', [])
+
+    async def insert_event(self, event: Dict[str, Any], **params) -> Dict[str, Any]:
+        return await self._request("POST", self._events_path(), params=params or None, body=event)
+
+    async def patch_event(self, event_id: str, changes: Dict[str, Any], **params) -> Dict[str, Any]:
+        return await self._request("PATCH", self._events_path(event_id), params=params or None, body=changes)
+
+    async def delete_event(self, event_id: str, **params):
+        await self._request("DELETE", self._events_path(event_id), params=params or None)
+
+    async def list_events(self, time_min: Optional[datetime] = None, time_max: Optional[datetime] = None,
+                          page_token: Optional[str] = None, **params) -> Dict[str, Any]:
+        """One page of events.list; pass the returned nextPageToken to continue"""
+        if time_min:
+            params['timeMin'] = time_min.isoformat()
+        if time_max:
+            params['timeMax'] = time_max.isoformat()
+        if page_token:
+            params['pageToken'] = page_token
+        return await self._request("GET", self._events_path(), params=params)
@@ -0,0 +1,116 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class DayFreeIntervals:
+    """Sorted, non-overlapping free intervals for one calendar day.
+
+    Interval bounds are epoch seconds kept in two parallel arrays so lookups
+    are a bisect away: ``starts[i] < ends[i] <= starts[i + 1]``.
+    """
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, starts: array, ends: array):
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_busy(cls, day_start: float, day_end: float,
+                  busy_periods: List[Tuple[float, float]]) -> 'DayFreeIntervals':
+        """Build the free intervals of ``[day_start, day_end)`` minus busy periods"""
+        intervals = cls(array('d', [day_start]), array('d', [day_end]))
+        for busy_start, busy_end in busy_periods:
+            if busy_start < day_end and busy_end > day_start:
+                intervals.book(busy_start, busy_end)
+        return intervals
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self.starts, self.ends)
+
+    def is_free(self, start: float, end: float) -> bool:
+        """Whether ``[start, end)`` lies entirely inside one free interval"""
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and self.ends[i] >= end
+
+    def next_free(self, after: float, duration: float) -> Optional[float]:
+        """Earliest start >= ``after`` with ``duration`` seconds free, or None"""
+        i = max(bisect_right(self.starts, after) - 1, 0)
+        for j in range(i, len(self.starts)):
+            candidate = max(after, self.starts[j])
+            if self.ends[j] - candidate >= duration:
+                return candidate
+        return None
+
+    def book(self, start: float, end: float):
+        """Remove ``[start, end)`` from the free intervals, splitting as needed"""
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end)
+        if lo >= hi:
+            return
+
+        pieces_start = array('d')
+        pieces_end = array('d')
+        if self.starts[lo] < start:
+            pieces_start.append(self.starts[lo])
+            pieces_end.append(start)
+        if self.ends[hi - 1] > end:
+            pieces_start.append(end)
+            pieces_end.append(self.ends[hi - 1])
+
+        self.starts[lo:hi] = pieces_start
+        self.ends[lo:hi] = pieces_end
+
+
+class FreeSlotIndex:
+    """In-process index of free intervals per calendar per day.
+
+    Days are keyed by calendar, date and window (working hours plus timezone).
+    Entries are built from free/busy data on first use, split in place when a
+    booking succeeds and dropped on expiry or calendar change notifications.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._days: Dict[Tuple[str, date, tuple], Tuple[DayFreeIntervals, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, calendar_id: str, day: date, window: tuple) -> Optional[DayFreeIntervals]:
+        key = (calendar_id, day, window)
+        with self._lock:
+            entry = self._days.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._days[key]
+                return None
+            return entry[0]
+
+    def put(self, calendar_id: str, day: date, window: tuple, intervals: DayFreeIntervals):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._days[(calendar_id, day, window)] = (intervals, time.monotonic() + self.ttl_seconds)
+
+    def apply_booking(self, calendar_id: str, start_time: datetime, end_time: datetime):
+        """Split the indexed days of a calendar around a new booking"""
+        start, end = start_time.timestamp(), end_time.timestamp()
+        with self._lock:
+            for (cal_id, _, _), (intervals, _) in self._days.items():
+                if cal_id == calendar_id:
+                    intervals.book(start, end)
+
+    def invalidate(self, calendar_id: Optional[str] = None):
+        with self._lock:
+            if calendar_id is None:
+                self._days.clear()
+            else:
+                for key in [k for k in self._days if k[0] == calendar_id]:
+                    del self._days[key]
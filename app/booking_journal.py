@@ -0,0 +1,132 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTENT = "intent"
+OUTCOME = "outcome"
+
+
+class BookingJournal:
+    """Append-only SQLite (WAL) journal of booking intents and outcomes.
+
+    An intent is made durable before the calendar is called, and an outcome
+    is appended once the booking settles; a booking with an intent but no
+    outcome was interrupted and is reconciled at startup. Appends from all
+    threads go through one writer thread that commits them in batches
+    (group commit), so concurrent confirmations share a single fsync.
+    """
+
+    def __init__(self, path: str = "bookings.db", commit_interval: float = 0.005,
+                 max_batch: int = 256):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " booking_id TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS journal_booking ON journal (booking_id, kind)")
+        self._conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: every commit fsyncs the WAL, which is the durability we need
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._writer, name="booking-journal", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        if self._thread and self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self._conn.close()
+
+    def append(self, booking_id: str, kind: str, payload: Dict[str, Any]) -> Future:
+        """Queue a record; the returned future resolves once it is durable"""
+        future: Future = Future()
+        self._pending.put((booking_id, kind, json.dumps(payload, default=str), time.time(), future))
+        return future
+
+    def record_intent(self, booking_id: str, session_id: Optional[str], slot: Dict[str, Any],
+                      tenant_id: Optional[str] = None) -> Future:
+        return self.append(booking_id, INTENT, {"session_id": session_id, "slot": slot, "tenant_id": tenant_id})
+
+    def record_outcome(self, booking_id: str, status: str, result: Optional[Dict[str, Any]] = None) -> Future:
+        return self.append(booking_id, OUTCOME, {"status": status, "result": result or {}})
+
+    def _writer(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # Gather whatever else arrives within the commit interval
+            deadline = time.monotonic() + self.commit_interval
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[tuple]):
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO journal (booking_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                    [record[:4] for record in batch]
+                )
+        except Exception as e:
+            logger.error(f"Booking journal commit failed: {e}")
+            for record in batch:
+                record[4].set_exception(e)
+            return
+        for record in batch:
+            record[4].set_result(True)
+
+    def unresolved(self) -> List[Dict[str, Any]]:
+        """Intents with no recorded outcome, oldest first"""
+        rows = self._conn.execute(
+            "SELECT i.booking_id, i.payload, i.created_at FROM journal i"
+            " WHERE i.kind = ? AND NOT EXISTS ("
+            "  SELECT 1 FROM journal o WHERE o.booking_id = i.booking_id AND o.kind = ?)"
+            " ORDER BY i.seq",
+            (INTENT, OUTCOME)
+        ).fetchall()
+        intents = []
+        for booking_id, payload, created_at in rows:
+            record = json.loads(payload)
+            record.update(booking_id=booking_id, created_at=created_at)
+            intents.append(record)
+        return intents
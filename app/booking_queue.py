@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+RETRYING = "retrying"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+class BookingJob:
+    """A booking confirmation waiting for, or done with, a worker"""
+
+    def __init__(self, slot: Dict[str, Any], session_id: Optional[str] = None,
+                 booking_id: Optional[str] = None, tenant_id: Optional[str] = None):
+        self.booking_id = booking_id or f"booking_{uuid.uuid4().hex}"
+        self.session_id = session_id
+        self.tenant_id = tenant_id
+        self.slot = slot
+        self.status = PENDING
+        self.attempts = 0
+        self.message: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    @property
+    def done(self) -> bool:
+        return self.status in (CONFIRMED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "booking_id": self.booking_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "message": self.message,
+            "booking_confirmed": self.status == CONFIRMED,
+            "booking_details": self.result.get("booking_result"),
+        }
+
+
+class BookingQueue:
+    """Runs booking confirmations on a pool of async workers.
+
+    ``handler(slot, session_id, booking_id, tenant_id)`` is the blocking booking call (it
+    runs in a thread) and returns the agent's confirm_booking result. Transient
+    failures (a ``retryable`` booking result, or the handler raising) are retried
+    with exponential backoff and jitter, waiting at least the result's
+    ``retry_after``; any other failure is final. ``on_complete(job)`` is called
+    once a job is confirmed or has failed.
+    """
+
+    def __init__(self, handler: Callable[..., Dict[str, Any]], workers: int = 4,
+                 max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 on_complete: Optional[Callable[[BookingJob], None]] = None,
+                 retention_seconds: int = 3600):
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_complete = on_complete
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, BookingJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._retries = set()
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, slot: Dict[str, Any], session_id: Optional[str] = None,
+               booking_id: Optional[str] = None, tenant_id: Optional[str] = None) -> BookingJob:
+        """Enqueue a booking and return immediately"""
+        self._prune()
+        job = BookingJob(slot, session_id, booking_id, tenant_id)
+        self.jobs[job.booking_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, booking_id: str) -> Optional[BookingJob]:
+        return self.jobs.get(booking_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for booking_id in [b for b, j in self.jobs.items() if j.done and j.updated_at < cutoff]:
+            del self.jobs[booking_id]
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _requeue_later(self, job: BookingJob, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(job)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: BookingJob):
+        job.status = PROCESSING
+        job.attempts += 1
+        job.updated_at = time.time()
+
+        try:
+            result = await asyncio.to_thread(self.handler, job.slot, job.session_id, job.booking_id, job.tenant_id)
+            succeeded = bool(result.get("booking_confirmed"))
+            error = result.get("error") or result.get("booking_result") or result.get("response")
+            outcome = result.get("booking_result") or {}
+            transient, retry_after = bool(outcome.get("retryable")), outcome.get("retry_after")
+        except Exception as e:
+            result, succeeded, error = {}, False, str(e)
+            transient, retry_after = True, None
+
+        job.result = result
+        job.message = result.get("response", job.message)
+        job.updated_at = time.time()
+
+        if succeeded:
+            job.status = CONFIRMED
+        elif transient and job.attempts < self.max_attempts:
+            delay = max(self._backoff(job.attempts), retry_after or 0)
+            logger.warning(f"Booking {job.booking_id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+            job.status = RETRYING
+            retry = asyncio.create_task(self._requeue_later(job, delay))
+            self._retries.add(retry)
+            retry.add_done_callback(self._retries.discard)
+            return
+        elif transient:
+            logger.error(f"Booking {job.booking_id} failed after {job.attempts} attempts: {error}")
+            job.status = FAILED
+        else:
+            logger.error(f"Booking {job.booking_id} failed: {error}")
+            job.status = FAILED
+
+        if self.on_complete:
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                logger.error(f"Booking completion callback failed: {e}")
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .calendar_service import GoogleCalendarService
+from .credentials import CredentialsRequiredError
+from .rate_limiter import CalendarRateLimiter
+
+logger = logging.getLogger(__name__)
+
+_TENANT_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+
+class UnknownTenantError(KeyError):
+    """No onboarded credentials exist for the requested tenant"""
+
+
+class CalendarServicePool:
+    """Calendar clients for many tenants, built on first use.
+
+    Each tenant has a directory under ``tenants_dir`` holding its OAuth
+    ``token.json`` (created during onboarding), optionally its own
+    ``credentials.json`` and a ``tenant.json`` with the ``calendar_id`` to
+    book into. Up to ``max_size`` clients are kept; the least recently used
+    one is dropped when the pool is full, and clients idle for longer than
+    ``idle_timeout`` seconds are dropped on the next lookup. Requests
+    without a tenant use ``default``, which is never evicted.
+    """
+
+    def __init__(self, tenants_dir: str, default: Optional[GoogleCalendarService] = None,
+                 credentials_file: str = "credentials.json", max_size: int = 256,
+                 idle_timeout: int = 1800, cache_ttl: int = 300, refresh_margin: int = 300,
+                 rate_limiter: Optional[CalendarRateLimiter] = None, quota_retries: int = 3,
+                 coalesce: bool = True):
+        self.tenants_dir = tenants_dir
+        self.default = default
+        self.credentials_file = credentials_file
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.cache_ttl = cache_ttl
+        self.refresh_margin = refresh_margin
+        self.rate_limiter = rate_limiter
+        self.quota_retries = quota_retries
+        self.coalesce = coalesce
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._services: "OrderedDict[str, tuple]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _tenant_dir(self, tenant_id: str) -> str:
+        if not _TENANT_ID.match(tenant_id):
+            raise UnknownTenantError(tenant_id)
+        return os.path.join(self.tenants_dir, tenant_id)
+
+    def has_tenant(self, tenant_id: Optional[str]) -> bool:
+        if not tenant_id:
+            return self.default is not None
+        try:
+            return os.path.exists(os.path.join(self._tenant_dir(tenant_id), "token.json"))
+        except UnknownTenantError:
+            return False
+
+    def get(self, tenant_id: Optional[str] = None) -> GoogleCalendarService:
+        """Return the tenant's calendar client, building it if needed"""
+        if not tenant_id:
+            if self.default is None:
+                raise UnknownTenantError("default")
+            return self.default
+
+        with self._lock:
+            service = self._touch(tenant_id)
+            if service is not None:
+                self.stats["hits"] += 1
+                return service
+            build_lock = self._building.setdefault(tenant_id, threading.Lock())
+
+        # Build outside the pool lock so one slow tenant does not block the rest
+        with build_lock:
+            with self._lock:
+                service = self._touch(tenant_id)
+                if service is not None:
+                    self.stats["hits"] += 1
+                    return service
+            try:
+                service = self._build(tenant_id)
+            except BaseException:
+                with self._lock:
+                    self._building.pop(tenant_id, None)
+                raise
+            # Publish the client and retire the build lock together, so a
+            # request in between cannot miss both and build a duplicate
+            with self._lock:
+                self.stats["misses"] += 1
+                self._services[tenant_id] = (service, time.monotonic())
+                self._building.pop(tenant_id, None)
+                self._evict()
+            return service
+
+    def _touch(self, tenant_id: str) -> Optional[GoogleCalendarService]:
+        entry = self._services.get(tenant_id)
+        if entry is None:
+            return None
+        self._services[tenant_id] = (entry[0], time.monotonic())
+        self._services.move_to_end(tenant_id)
+        return entry[0]
+
+    def _evict(self):
+        idle_before = time.monotonic() - self.idle_timeout
+        while self._services:
+            tenant_id, (_, last_used) = next(iter(self._services.items()))
+            if len(self._services) <= self.max_size and last_used > idle_before:
+                break
+            # Dropping the reference also unregisters its token refresher
+            del self._services[tenant_id]
+            self.stats["evictions"] += 1
+            logger.info(f"Evicted calendar client for tenant {tenant_id}")
+
+    def _build(self, tenant_id: str) -> GoogleCalendarService:
+        tenant_dir = self._tenant_dir(tenant_id)
+        token_file = os.path.join(tenant_dir, "token.json")
+        if not os.path.exists(token_file):
+            # Never start the interactive consent flow from a request
+            raise UnknownTenantError(tenant_id)
+
+        config = {}
+        config_file = os.path.join(tenant_dir, "tenant.json")
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+
+        credentials_file = os.path.join(tenant_dir, "credentials.json")
+        if not os.path.exists(credentials_file):
+            credentials_file = self.credentials_file
+
+        logger.info(f"Creating calendar client for tenant {tenant_id}")
+        try:
+            return GoogleCalendarService(
+                credentials_file=credentials_file,
+                token_file=token_file,
+                calendar_id=config.get("calendar_id", "primary"),
+                cache_ttl=self.cache_ttl,
+                refresh_margin=self.refresh_margin,
+                rate_limiter=self.rate_limiter,
+                quota_retries=self.quota_retries,
+                coalesce=self.coalesce,
+                interactive=False
+            )
+        except CredentialsRequiredError as e:
+            # A broken or revoked token needs onboarding again, not a browser on the server
+            logger.error(f"Tenant {tenant_id} has no usable token: {e}")
+            raise UnknownTenantError(tenant_id) from e
+
+    def __len__(self) -> int:
+        return len(self._services)
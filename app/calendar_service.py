@@ -1,52 +1,363 @@
-import pickle
-import os
+import asyncio
+import heapq
+import logging
+import math
+import threading
+import time
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import List, Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pytz
+from . import cancellation
+from .availability_index import DayFreeIntervals, FreeSlotIndex
+from .async_calendar_client import AsyncCalendarClient, CalendarAPIError
+from .credentials import CredentialManager
+from .metrics import metrics
+from .rate_limiter import AVAILABILITY, BOOKING, SPECULATIVE, CalendarRateLimiter, RateLimitedError
+from .recurrence import time_zone_name
+
+logger = logging.getLogger(__name__)
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+# Calendars per free/busy query allowed by the API
+FREEBUSY_MAX_ITEMS = 50
+
+# 403 reasons that mean "slow down" rather than "not allowed"
+CALENDAR_QUOTA_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+PROJECT_QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+
+class CalendarUnavailableError(Exception):
+    """Availability could not be read; callers must not treat the calendar as free"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _quota_scope(status: int, reason: str) -> Optional[str]:
+    """'calendar' or 'project' for quota errors, None for anything else"""
+    if status == 429 or (status == 403 and reason in CALENDAR_QUOTA_REASONS):
+        return 'calendar'
+    if status == 403 and reason in PROJECT_QUOTA_REASONS:
+        return 'project'
+    return None
+
+
+def _http_error_reason(error: HttpError) -> str:
+    details = getattr(error, 'error_details', None)
+    if isinstance(details, list) and details and isinstance(details[0], dict):
+        return details[0].get('reason', '')
+    return ''
+
+
+def _retry_after(value) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def event_id_for_booking(booking_id: str) -> str:
+    """Deterministic Calendar event ID for a booking (base32hex: a-v, 0-9)"""
+    return 'tt' + ''.join(c for c in booking_id.lower() if c in '0123456789abcdefghijklmnopqrstuv')
+
+
+def _parse_api_time(value: str) -> datetime:
+    """Parse an RFC 3339 timestamp returned by the Calendar API"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _overlapping(busy: List[dict], start_time: datetime, end_time: datetime) -> List[dict]:
+    """Busy periods of a wider window that fall inside the range"""
+    return [
+        b for b in busy
+        if _parse_api_time(b['start']) < end_time and _parse_api_time(b['end']) > start_time
+    ]
+
+
+class _Flight:
+    """A free/busy query in progress that callers needing the same range can wait on"""
+
+    def __init__(self, start_time: datetime, end_time: datetime, priority: str, generation: tuple):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.priority = priority
+        self.generation = generation
+        self.done = threading.Event()
+        self.busy: Optional[List[dict]] = None
+        self.error: Optional[BaseException] = None
+        # Futures of async callers waiting on this flight, with their event loops
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    def wait_async(self) -> asyncio.Future:
+        """A future on the running loop that completes when the flight lands (no thread is held)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if not self.done.is_set():
+                self._waiters.append((loop, future))
+                return future
+        future.set_result(None)
+        return future
+
+    def finish(self, busy: Optional[List[dict]], error: Optional[BaseException]):
+        with self._lock:
+            self.busy, self.error = busy, error
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # The waiter's loop has closed
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class FreeBusyCache:
+    """Caches free/busy windows per calendar.
+
+    A cached window also answers queries for any range it covers, so a
+    7-day lookup serves the single-day lookups that follow it. Entries are
+    dropped on expiry, on our own writes and on push notifications.
+    Every invalidation bumps the calendar's generation; a query that
+    started under an older generation cannot put its answer back.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, List[Tuple[datetime, datetime, float, List[dict]]]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def generation(self, calendar_id: str) -> tuple:
+        """Changes whenever the calendar's cached windows are invalidated"""
+        with self._lock:
+            return self._epoch, self._generations.get(calendar_id, 0)
+
+    def get(self, calendar_id: str, start_time: datetime, end_time: datetime) -> Optional[List[dict]]:
+        """Return busy periods overlapping the range, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entries = [e for e in self._entries.get(calendar_id, []) if e[2] > now]
+            self._entries[calendar_id] = entries
+            for cached_start, cached_end, _, busy in entries:
+                if cached_start <= start_time and end_time <= cached_end:
+                    return _overlapping(busy, start_time, end_time)
+        return None
+
+    def put(self, calendar_id: str, start_time: datetime, end_time: datetime, busy: List[dict],
+            generation: Optional[tuple] = None):
+        """Cache a window; skipped if ``generation`` (taken before the query) is no longer current"""
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(calendar_id, 0)):
+                metrics.incr("calendar.freebusy.stale_puts")
+                return
+            self._entries.setdefault(calendar_id, []).append((start_time, end_time, expires_at, busy))
+
+    def invalidate(self, calendar_id: Optional[str] = None):
+        """Drop cached windows for one calendar, or for all of them"""
+        with self._lock:
+            if calendar_id is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(calendar_id, None)
+                self._generations[calendar_id] = self._generations.get(calendar_id, 0) + 1
+
 
 class GoogleCalendarService:
-    def __init__(self, credentials_file: str, token_file: str, calendar_id: str = 'primary'):
+    def __init__(self, credentials_file: str, token_file: str, calendar_id: str = 'primary',
+                 cache_ttl: int = 300, refresh_margin: int = 300,
+                 rate_limiter: Optional[CalendarRateLimiter] = None, quota_retries: int = 3,
+                 coalesce: bool = True, interactive: bool = True):
         self.credentials_file = credentials_file
+        # False for clients built inside requests: never start the OAuth consent flow
+        self.interactive = interactive
         self.token_file = token_file
         self.calendar_id = calendar_id
+        self.refresh_margin = refresh_margin
+        self.rate_limiter = rate_limiter
+        self.quota_retries = quota_retries
+        self.credential_manager = None
         self.service = None
+        self.credentials = None
+        self._async_client = None
+        self.busy_cache = FreeBusyCache(cache_ttl)
+        self.free_index = FreeSlotIndex(cache_ttl)
+        # Single-flight free/busy: concurrent queries for a covered range share one call
+        self.coalesce = coalesce
+        self._flights: List[_Flight] = []
+        self._flights_lock = threading.Lock()
         self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Google Calendar API"""
-        creds = None
+        self.credential_manager = CredentialManager(
+            self.credentials_file, self.token_file, SCOPES, self.refresh_margin,
+            interactive=self.interactive
+        )
+        creds = self.credential_manager.load()
         
-        # Load existing token
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+        # Refresh ahead of expiry in the background so requests never wait on OAuth
+        self.credential_manager.start()
         
-        # If no valid credentials, get new ones
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_file, SCOPES)
-                # Changed: Use run_local_server() without specifying port for desktop apps
-                # This will automatically find an available port
-                creds = flow.run_local_server(port=0)
+        self.credentials = creds
+        # Bundled discovery document: no network fetch at startup
+        self.service = build('calendar', 'v3', credentials=creds,
+                             static_discovery=True, cache_discovery=False)
+    
+    @property
+    def async_client(self) -> AsyncCalendarClient:
+        """Async client sharing these credentials and the process-wide connection pool"""
+        if self._async_client is None:
+            self._async_client = AsyncCalendarClient(self.credentials, self.calendar_id)
+        return self._async_client
+    
+    def _execute(self, request, priority: str = AVAILABILITY):
+        """Execute an API request within quota, backing off and retrying on quota errors
+        
+        No attempt is started for a chat turn that has been cancelled.
+        """
+        attempt = 0
+        while True:
+            cancellation.check("calendar")
+            if self.rate_limiter:
+                self.rate_limiter.acquire(self.calendar_id, priority)
+            try:
+                return request.execute()
+            except HttpError as error:
+                scope = _quota_scope(error.resp.status, _http_error_reason(error))
+                attempt += 1
+                if scope is None or not self.rate_limiter or attempt > self.quota_retries:
+                    raise
+                delay = self.rate_limiter.backoff(attempt, _retry_after(error.resp.get('retry-after')))
+                self.rate_limiter.penalize(self.calendar_id, delay, project_wide=scope == 'project')
+    
+    async def _aexecute(self, call, priority: str = AVAILABILITY):
+        """Async variant of _execute; ``call`` returns a fresh awaitable per attempt"""
+        attempt = 0
+        while True:
+            cancellation.check("calendar")
+            if self.rate_limiter:
+                delay = self.rate_limiter.reserve_slot(self.calendar_id, priority)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    cancellation.check("calendar")
+            try:
+                return await call()
+            except CalendarAPIError as error:
+                scope = _quota_scope(error.status_code, error.reason)
+                attempt += 1
+                if scope is None or not self.rate_limiter or attempt > self.quota_retries:
+                    raise
+                delay = self.rate_limiter.backoff(attempt, error.retry_after)
+                self.rate_limiter.penalize(self.calendar_id, delay, project_wide=scope == 'project')
+    
+    def _busy_from_response(self, response: dict, calendar_id: Optional[str] = None) -> List[dict]:
+        calendar_id = calendar_id or self.calendar_id
+        calendar = response.get('calendars', {}).get(calendar_id, {})
+        if calendar.get('errors'):
+            # e.g. notFound: the response has no busy list, which is not the same as free
+            raise CalendarUnavailableError(f"Free/busy unavailable for {calendar_id}: {calendar['errors']}")
+        return calendar.get('busy', [])
+    
+    def _claim_flight(self, start_time: datetime, end_time: datetime, priority: str):
+        """The in-flight query covering the range and False, or a new flight to run and True
+        
+        Only flights started under the current cache generation can be
+        joined, so no caller gets an answer from before a booking or a
+        push notification.
+        """
+        generation = self.busy_cache.generation(self.calendar_id)
+        with self._flights_lock:
+            for flight in self._flights:
+                if (flight.generation == generation
+                        and flight.start_time <= start_time and end_time <= flight.end_time):
+                    return flight, False
+            flight = _Flight(start_time, end_time, priority, generation)
+            self._flights.append(flight)
+            return flight, True
+    
+    def _land(self, flight: _Flight, busy: Optional[List[dict]], error: Optional[BaseException]):
+        with self._flights_lock:
+            if flight in self._flights:
+                self._flights.remove(flight)
+        flight.finish(busy, error)
+    
+    def _detach_flights(self):
+        """Queries in flight now predate a change to the calendar: no new caller may join them"""
+        with self._flights_lock:
+            self._flights.clear()
+    
+    def _shared_result(self, flight: _Flight, start_time: datetime, end_time: datetime,
+                       priority: str) -> Optional[List[dict]]:
+        """The joined flight's answer for this range, or None if the caller must query itself
+        
+        A calendar error is shared too, unless it came from a speculative
+        query (skipped for quota) and the caller is not speculative. Any
+        other failure, e.g. the leader's turn being cancelled, is not.
+        """
+        if flight.error is None:
+            metrics.incr("calendar.freebusy.coalesced")
+            return _overlapping(flight.busy, start_time, end_time)
+        if isinstance(flight.error, CalendarUnavailableError) and (
+                flight.priority != SPECULATIVE or priority == SPECULATIVE):
+            metrics.incr("calendar.freebusy.coalesced_errors")
+            raise CalendarUnavailableError(str(flight.error), flight.error.retry_after)
+        return None
+    
+    def get_free_busy(self, start_time: datetime, end_time: datetime,
+                      priority: str = AVAILABILITY) -> List[dict]:
+        """Get free/busy information for the specified time range
+        
+        A query already in flight for a covering range is waited on and
+        shared instead of being sent again.
+        Raises CalendarUnavailableError if the calendar cannot be read.
+        """
+        while True:
+            cached = self.busy_cache.get(self.calendar_id, start_time, end_time)
+            if cached is not None:
+                return cached
+            if not self.coalesce:
+                return self._query_free_busy(start_time, end_time, priority)
             
-            # Save credentials for next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            flight, leader = self._claim_flight(start_time, end_time, priority)
+            if leader:
+                break
+            while not flight.done.wait(cancellation.POLL_INTERVAL):
+                cancellation.check("calendar")
+            shared = self._shared_result(flight, start_time, end_time, priority)
+            if shared is not None:
+                return shared
         
-        self.service = build('calendar', 'v3', credentials=creds)
+        busy, error = None, None
+        try:
+            busy = self._query_free_busy(start_time, end_time, priority, flight.generation)
+            return busy
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._land(flight, busy, error)
     
-    def get_free_busy(self, start_time: datetime, end_time: datetime) -> List[dict]:
-        """Get free/busy information for the specified time range"""
+    def _query_free_busy(self, start_time: datetime, end_time: datetime, priority: str,
+                         generation: Optional[tuple] = None) -> List[dict]:
+        metrics.incr("calendar.freebusy.queries")
+        if generation is None:
+            generation = self.busy_cache.generation(self.calendar_id)
         try:
             freebusy_request = {
                 'timeMin': start_time.isoformat(),
@@ -54,88 +365,428 @@ class GoogleCalendarService:
                 'items': [{'id': self.calendar_id}]
             }
             
-            response = self.service.freebusy().query(body=freebusy_request).execute()
-            return response.get('calendars', {}).get(self.calendar_id, {}).get('busy', [])
+            response = self._execute(self.service.freebusy().query(body=freebusy_request), priority)
+            busy = self._busy_from_response(response)
+            self.busy_cache.put(self.calendar_id, start_time, end_time, busy, generation)
+            return busy
         
+        except RateLimitedError as error:
+            raise CalendarUnavailableError(str(error), error.retry_after) from error
         except HttpError as error:
-            print(f"Error getting free/busy info: {error}")
-            return []
+            logger.warning(f"Error getting free/busy info: {error}")
+            raise CalendarUnavailableError(f"Free/busy query failed: {error}") from error
     
-    def find_available_slots(self, start_date: datetime, end_date: datetime, 
-                           duration_minutes: int = 60, 
-                           working_hours: tuple = (9, 17)) -> List[dict]:
-        """Find available time slots within the given date range"""
-        available_slots = []
-        busy_times = self.get_free_busy(start_date, end_date)
-        
-        # Convert busy times to datetime objects
-        busy_periods = []
-        for busy in busy_times:
-            busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-            busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-            busy_periods.append((busy_start, busy_end))
+    async def aget_free_busy(self, start_time: datetime, end_time: datetime) -> List[dict]:
+        """Async variant of get_free_busy sharing the same cache and in-flight queries"""
+        while True:
+            cached = self.busy_cache.get(self.calendar_id, start_time, end_time)
+            if cached is not None:
+                return cached
+            if not self.coalesce:
+                return await self._aquery_free_busy(start_time, end_time)
+            
+            flight, leader = self._claim_flight(start_time, end_time, AVAILABILITY)
+            if leader:
+                break
+            # The leader may run on a worker thread; it wakes this loop when it lands
+            await flight.wait_async()
+            shared = self._shared_result(flight, start_time, end_time, AVAILABILITY)
+            if shared is not None:
+                return shared
+        
+        busy, error = None, None
+        try:
+            busy = await self._aquery_free_busy(start_time, end_time, flight.generation)
+            return busy
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._land(flight, busy, error)
+    
+    async def _aquery_free_busy(self, start_time: datetime, end_time: datetime,
+                                generation: Optional[tuple] = None) -> List[dict]:
+        metrics.incr("calendar.freebusy.queries")
+        if generation is None:
+            generation = self.busy_cache.generation(self.calendar_id)
+        try:
+            response = await self._aexecute(lambda: self.async_client.free_busy(start_time, end_time))
+            busy = self._busy_from_response(response)
+            self.busy_cache.put(self.calendar_id, start_time, end_time, busy, generation)
+            return busy
+        
+        except RateLimitedError as error:
+            raise CalendarUnavailableError(str(error), error.retry_after) from error
+        except CalendarAPIError as error:
+            logger.warning(f"Error getting free/busy info: {error}")
+            raise CalendarUnavailableError(f"Free/busy query failed: {error}") from error
+    
+    def busy_periods_many(self, calendar_ids: List[str], start_time: datetime,
+                          end_time: datetime) -> Dict[str, List[Tuple[float, float]]]:
+        """Busy periods of several calendars (e.g. attendees) as epoch-second pairs
+        
+        Calendars missing from the cache share one free/busy query (up to
+        FREEBUSY_MAX_ITEMS per query). Raises CalendarUnavailableError if
+        any of them cannot be read.
+        """
+        busy = {}
+        missing = []
+        for calendar_id in calendar_ids:
+            cached = self.busy_cache.get(calendar_id, start_time, end_time)
+            if cached is None:
+                missing.append(calendar_id)
+            else:
+                busy[calendar_id] = cached
+        
+        try:
+            for i in range(0, len(missing), FREEBUSY_MAX_ITEMS):
+                chunk = missing[i:i + FREEBUSY_MAX_ITEMS]
+                generations = {calendar_id: self.busy_cache.generation(calendar_id) for calendar_id in chunk}
+                freebusy_request = {
+                    'timeMin': start_time.isoformat(),
+                    'timeMax': end_time.isoformat(),
+                    'items': [{'id': calendar_id} for calendar_id in chunk]
+                }
+                response = self._execute(self.service.freebusy().query(body=freebusy_request))
+                for calendar_id in chunk:
+                    busy[calendar_id] = self._busy_from_response(response, calendar_id)
+                    self.busy_cache.put(calendar_id, start_time, end_time, busy[calendar_id],
+                                        generations[calendar_id])
+        
+        except RateLimitedError as error:
+            raise CalendarUnavailableError(str(error), error.retry_after) from error
+        except HttpError as error:
+            logger.warning(f"Error getting free/busy info: {error}")
+            raise CalendarUnavailableError(f"Free/busy query failed: {error}") from error
+        
+        return {
+            calendar_id: [(_parse_api_time(b['start']).timestamp(), _parse_api_time(b['end']).timestamp())
+                          for b in periods]
+            for calendar_id, periods in busy.items()
+        }
+    
+    def _working_window(self, day, working_hours: tuple, tzinfo) -> Tuple[datetime, datetime]:
+        """Working hours of a day as datetimes"""
+        work_start = datetime.combine(day, datetime.min.time().replace(hour=working_hours[0]))
+        work_end = datetime.combine(day, datetime.min.time().replace(hour=working_hours[1]))
+        
+        # Make timezone aware; pytz zones must localize() to get the right offset
+        if tzinfo and hasattr(tzinfo, 'localize'):
+            work_start = tzinfo.localize(work_start)
+            work_end = tzinfo.localize(work_end)
+        elif tzinfo:
+            work_start = work_start.replace(tzinfo=tzinfo)
+            work_end = work_end.replace(tzinfo=tzinfo)
+        return work_start, work_end
+    
+    def _busy_periods(self, start_time: datetime, end_time: datetime) -> List[Tuple[float, float]]:
+        """Busy periods in the range as epoch-second pairs"""
+        return [
+            (_parse_api_time(busy['start']).timestamp(), _parse_api_time(busy['end']).timestamp())
+            for busy in self.get_free_busy(start_time, end_time)
+        ]
+    
+    def _day_free_intervals(self, day, working_hours: tuple, tzinfo,
+                            busy_periods: Optional[List[Tuple[float, float]]] = None,
+                            cacheable: bool = True, generation: Optional[tuple] = None) -> DayFreeIntervals:
+        """Free intervals of a working day, served from the index when possible
+        
+        ``generation`` is the cache generation from before ``busy_periods`` were read.
+        """
+        window = (working_hours[0], working_hours[1], str(tzinfo))
+        intervals = self.free_index.get(self.calendar_id, day, window)
+        if intervals is not None:
+            return intervals
+        
+        if generation is None:
+            generation = self.busy_cache.generation(self.calendar_id)
+        work_start, work_end = self._working_window(day, working_hours, tzinfo)
+        if busy_periods is None:
+            busy_periods = self._busy_periods(work_start, work_end)
+        intervals = DayFreeIntervals.from_busy(work_start.timestamp(), work_end.timestamp(), busy_periods)
+        # Not indexed if the calendar changed while its busy periods were read
+        if cacheable and self.busy_cache.generation(self.calendar_id) == generation:
+            self.free_index.put(self.calendar_id, day, window, intervals)
+        return intervals
+    
+    def _iter_free_slots(self, start_date: datetime, end_date: datetime,
+                         duration_minutes: int, working_hours: tuple,
+                         step_minutes: int) -> Iterator[Tuple[datetime, datetime]]:
+        """Yield free (start, end) pairs in chronological order"""
+        busy_periods = None
+        range_start = start_date.timestamp()
+        range_end = end_date.timestamp()
+        duration = duration_minutes * 60
+        step = step_minutes * 60
         
         # Check each day in the range
         current_date = start_date.date()
         end_date_only = end_date.date()
         
         while current_date <= end_date_only:
-            # Create working hours for this day
-            work_start = datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[0]))
-            work_end = datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[1]))
+            work_start, work_end = self._working_window(current_date, working_hours, start_date.tzinfo)
+            day_start = work_start.timestamp()
+            day_end = work_end.timestamp()
+            if day_start >= range_end:
+                break
             
-            # Make timezone aware
-            if start_date.tzinfo:
-                work_start = work_start.replace(tzinfo=start_date.tzinfo)
-                work_end = work_end.replace(tzinfo=start_date.tzinfo)
+            window = (working_hours[0], working_hours[1], str(start_date.tzinfo))
+            intervals = self.free_index.get(self.calendar_id, current_date, window)
+            if intervals is None:
+                # One free/busy query covers every day missing from the index
+                if busy_periods is None:
+                    generation = self.busy_cache.generation(self.calendar_id)
+                    busy_periods = self._busy_periods(start_date, end_date)
+                intervals = self._day_free_intervals(
+                    current_date, working_hours, start_date.tzinfo, busy_periods,
+                    cacheable=range_start <= day_start and day_end <= range_end,
+                    generation=generation
+                )
             
-            # Find free slots in this day
-            current_time = work_start
-            while current_time + timedelta(minutes=duration_minutes) <= work_end:
-                slot_end = current_time + timedelta(minutes=duration_minutes)
-                
-                # Check if this slot conflicts with any busy period
-                is_free = True
-                for busy_start, busy_end in busy_periods:
-                    if (current_time < busy_end and slot_end > busy_start):
-                        is_free = False
-                        break
-                
-                if is_free:
-                    available_slots.append({
-                        'start': current_time,
-                        'end': slot_end,
-                        'formatted': f"{current_time.strftime('%Y-%m-%d %I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
-                    })
-                
-                current_time += timedelta(minutes=30)  # 30-minute intervals
+            # Walk the free intervals on the step grid anchored at work start
+            lo = max(day_start, range_start)
+            hi = min(day_end, range_end)
+            for free_start, free_end in list(intervals):
+                free_start = max(free_start, lo)
+                free_end = min(free_end, hi)
+                offset = math.ceil((free_start - day_start) / step) * step
+                while day_start + offset + duration <= free_end:
+                    current_time = work_start + timedelta(seconds=offset)
+                    yield current_time, current_time + timedelta(minutes=duration_minutes)
+                    offset += step
             
             current_date += timedelta(days=1)
+    
+    @staticmethod
+    def _format_slot(start: datetime, end: datetime) -> dict:
+        return {
+            'start': start,
+            'end': end,
+            'formatted': f"{start.strftime('%Y-%m-%d %I:%M %p')} - {end.strftime('%I:%M %p')}"
+        }
+    
+    def iter_available_slots(self, start_date: datetime, end_date: datetime,
+                             duration_minutes: int = 60,
+                             working_hours: tuple = (9, 17),
+                             step_minutes: int = 30) -> Iterator[dict]:
+        """Lazily yield available slots; stop iterating to stop the search"""
+        for start, end in self._iter_free_slots(start_date, end_date, duration_minutes,
+                                                working_hours, step_minutes):
+            yield self._format_slot(start, end)
+    
+    def find_available_slots(self, start_date: datetime, end_date: datetime, 
+                           duration_minutes: int = 60, 
+                           working_hours: tuple = (9, 17),
+                           limit: Optional[int] = None,
+                           preferred_time: Optional[datetime] = None,
+                           step_minutes: int = 30) -> List[dict]:
+        """Find available time slots within the given date range.
+        
+        With ``limit`` the search stops once enough slots are found. With
+        ``preferred_time`` the ``limit`` slots closest to it are returned,
+        closest first.
+        """
+        free_slots = self._iter_free_slots(start_date, end_date, duration_minutes,
+                                           working_hours, step_minutes)
+        
+        if preferred_time is None or not limit:
+            return [self._format_slot(start, end) for start, end in islice(free_slots, limit)]
         
-        return available_slots
+        # Bounded max-heap on distance; slots arrive in time order, so once a
+        # slot is later than the preferred time and farther than the worst
+        # kept one, nothing after it can qualify
+        target = preferred_time.timestamp()
+        heap = []
+        for index, (start, end) in enumerate(free_slots):
+            distance = abs(start.timestamp() - target)
+            if len(heap) < limit:
+                heapq.heappush(heap, (-distance, index, start, end))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, index, start, end))
+            elif start.timestamp() > target:
+                break
+        
+        ranked = sorted(heap, key=lambda e: (-e[0], e[1]))
+        return [self._format_slot(start, end) for _, _, start, end in ranked]
+    
+    def is_slot_free(self, start_time: datetime, end_time: datetime,
+                     working_hours: tuple = (9, 17)) -> bool:
+        """Whether the slot lies in free working time, using the per-day index"""
+        intervals = self._day_free_intervals(start_time.date(), working_hours, start_time.tzinfo)
+        return intervals.is_free(start_time.timestamp(), end_time.timestamp())
+    
+    def next_free_slot(self, after: datetime, duration_minutes: int = 60,
+                       working_hours: tuple = (9, 17), max_days: int = 14) -> Optional[datetime]:
+        """Earliest free start at or after ``after`` with room for the duration"""
+        day = after.date()
+        for _ in range(max_days):
+            intervals = self._day_free_intervals(day, working_hours, after.tzinfo)
+            start = intervals.next_free(after.timestamp(), duration_minutes * 60)
+            if start is not None:
+                work_start, _ = self._working_window(day, working_hours, after.tzinfo)
+                return work_start + timedelta(seconds=start - work_start.timestamp())
+            day += timedelta(days=1)
+        return None
+    
+    def check_series(self, starts: List[datetime], duration_minutes: int = 60,
+                     working_hours: tuple = (9, 17), alternatives: int = 2,
+                     step_minutes: int = 30) -> List[dict]:
+        """Check every occurrence of a recurring series with one free/busy query
+        
+        The query covers the whole series, so its cost does not grow with the
+        number of occurrences. Each result is a slot with ``available`` and,
+        for conflicts, the ``alternatives`` free starts closest to the
+        requested time on the same day, within working hours.
+        """
+        duration = timedelta(minutes=duration_minutes)
+        tzinfo = starts[0].tzinfo
+        first_day, _ = self._working_window(starts[0].date(), working_hours, tzinfo)
+        _, last_day = self._working_window(starts[-1].date(), working_hours, tzinfo)
+        busy_periods = self._busy_periods(min(starts[0], first_day), max(starts[-1] + duration, last_day))
+        
+        # Merge overlapping busy periods so one bisect finds any overlap
+        busy_starts, busy_ends = [], []
+        for busy_start, busy_end in sorted(busy_periods):
+            if busy_ends and busy_start <= busy_ends[-1]:
+                busy_ends[-1] = max(busy_ends[-1], busy_end)
+            else:
+                busy_starts.append(busy_start)
+                busy_ends.append(busy_end)
+        
+        results = []
+        for start in starts:
+            end = start + duration
+            i = bisect_right(busy_ends, start.timestamp())
+            available = i == len(busy_starts) or busy_starts[i] >= end.timestamp()
+            slot = dict(self._format_slot(start, end), available=available, alternatives=[])
+            if not available and alternatives:
+                slot["alternatives"] = self._nearest_free(start, duration_minutes, working_hours,
+                                                          busy_periods, alternatives, step_minutes)
+            results.append(slot)
+        return results
+    
+    def _nearest_free(self, start: datetime, duration_minutes: int, working_hours: tuple,
+                      busy_periods: List[Tuple[float, float]], count: int,
+                      step_minutes: int) -> List[dict]:
+        """Free slots on the grid of ``start``'s working day, closest to ``start`` first"""
+        work_start, work_end = self._working_window(start.date(), working_hours, start.tzinfo)
+        day_start = work_start.timestamp()
+        intervals = DayFreeIntervals.from_busy(day_start, work_end.timestamp(), busy_periods)
+        duration = duration_minutes * 60
+        step = step_minutes * 60
+        
+        candidates = []
+        for free_start, free_end in intervals:
+            offset = math.ceil((free_start - day_start) / step) * step
+            while day_start + offset + duration <= free_end:
+                candidates.append(offset)
+                offset += step
+        
+        target = start.timestamp() - day_start
+        nearest = heapq.nsmallest(count, candidates, key=lambda offset: abs(offset - target))
+        return [
+            self._format_slot(work_start + timedelta(seconds=offset),
+                              work_start + timedelta(seconds=offset + duration))
+            for offset in nearest
+        ]
     
     def create_event(self, title: str, start_time: datetime, end_time: datetime, 
-                    description: str = None) -> Optional[str]:
-        """Create a new calendar event"""
+                    description: str = None, event_id: str = None,
+                    recurrence: Optional[List[str]] = None) -> Optional[str]:
+        """Create a new calendar event
+        
+        With ``event_id`` the insert is idempotent: if an earlier attempt
+        already created the event, its ID is returned instead of a duplicate.
+        ``recurrence`` holds RRULE/EXDATE lines and makes it a recurring event.
+        Raises CalendarUnavailableError when the insert may succeed on retry
+        (rate limited or a server error); other failures return None.
+        """
         try:
             event = {
                 'summary': title,
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': str(start_time.tzinfo) if start_time.tzinfo else 'UTC',
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': str(end_time.tzinfo) if end_time.tzinfo else 'UTC',
-                },
+                'start': {'dateTime': start_time.isoformat()},
+                'end': {'dateTime': end_time.isoformat()},
             }
+            # A bare UTC offset is not a valid timeZone; the offset in dateTime is enough
+            for key, value in (('start', start_time), ('end', end_time)):
+                zone = time_zone_name(value)
+                if zone:
+                    event[key]['timeZone'] = zone
             
             if description:
                 event['description'] = description
+            if event_id:
+                event['id'] = event_id
+            if recurrence:
+                event['recurrence'] = recurrence
             
-            result = self.service.events().insert(calendarId=self.calendar_id, body=event).execute()
+            result = self._execute(self.service.events().insert(calendarId=self.calendar_id, body=event), BOOKING)
+            if recurrence:
+                # A series touches many days; refetch them all
+                self.invalidate_cache()
+            else:
+                # Raw free/busy windows are refetched; indexed days are split in place
+                self.busy_cache.invalidate(self.calendar_id)
+                self._detach_flights()
+                self.free_index.apply_booking(self.calendar_id, start_time, end_time)
             return result.get('id')
         
         except HttpError as error:
-            print(f"Error creating event: {error}")
-            return None
\ No newline at end of file
+            if event_id and error.resp.status == 409:
+                # Created by an earlier attempt whose response was lost
+                self.invalidate_cache()
+                return event_id
+            if error.resp.status >= 500:
+                raise CalendarUnavailableError(f"Event insert failed: {error}") from error
+            logger.error(f"Error creating event: {error}")
+            return None
+        except RateLimitedError as error:
+            raise CalendarUnavailableError(str(error), error.retry_after) from error
+    
+    def get_event(self, event_id: str) -> Optional[dict]:
+        """Fetch an event, or None if it does not exist or was cancelled
+        
+        Raises CalendarUnavailableError when rate limited.
+        """
+        try:
+            event = self._execute(self.service.events().get(calendarId=self.calendar_id, eventId=event_id), BOOKING)
+            return None if event.get('status') == 'cancelled' else event
+        
+        except HttpError as error:
+            if error.resp.status in (404, 410):
+                return None
+            raise
+        except RateLimitedError as error:
+            raise CalendarUnavailableError(str(error), error.retry_after) from error
+    
+    def invalidate_cache(self):
+        """Forget cached availability for this calendar, including queries still in flight"""
+        self.busy_cache.invalidate(self.calendar_id)
+        self._detach_flights()
+        self.free_index.invalidate(self.calendar_id)
+    
+    def watch_events(self, channel_id: str, address: str, token: str, ttl_seconds: int) -> Optional[dict]:
+        """Open a push-notification channel for event changes on this calendar"""
+        try:
+            body = {
+                'id': channel_id,
+                'type': 'web_hook',
+                'address': address,
+                'token': token,
+                'params': {'ttl': str(ttl_seconds)},
+            }
+            return self._execute(self.service.events().watch(calendarId=self.calendar_id, body=body))
+        
+        except (HttpError, RateLimitedError) as error:
+            logger.warning(f"Error opening watch channel: {error}")
+            return None
+    
+    def stop_channel(self, channel_id: str, resource_id: str) -> bool:
+        """Close a push-notification channel"""
+        try:
+            self._execute(self.service.channels().stop(body={'id': channel_id, 'resourceId': resource_id}))
+            return True
+        
+        except (HttpError, RateLimitedError) as error:
+            logger.warning(f"Error stopping watch channel: {error}")
+            return False
\ No newline at end of file
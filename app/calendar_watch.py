@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WatchChannel:
+    """A Google Calendar push-notification channel owned by this process"""
+
+    def __init__(self, channel_id: str, resource_id: str, expiration: float, service):
+        self.channel_id = channel_id
+        self.resource_id = resource_id
+        self.expiration = expiration  # epoch seconds
+        self.service = service
+
+
+class CalendarWatchManager:
+    """Opens, validates and renews Calendar watch channels.
+
+    Channel tokens are derived from a shared secret and the channel ID, so any
+    worker can validate a notification regardless of which one opened the
+    channel. Notifications invalidate the cached availability of the calendar
+    the channel belongs to.
+    """
+
+    def __init__(self, address: str, secret: str, ttl_seconds: int = 86400,
+                 renew_before_seconds: int = 3600):
+        self.address = address
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.renew_before_seconds = renew_before_seconds
+        self.channels: Dict[str, WatchChannel] = {}
+        self._services: Dict[str, object] = {}
+
+    def channel_token(self, channel_id: str) -> str:
+        return hmac.new(self.secret.encode(), channel_id.encode(), hashlib.sha256).hexdigest()
+
+    def is_valid_token(self, channel_id: str, token: Optional[str]) -> bool:
+        if not channel_id or not token:
+            return False
+        return hmac.compare_digest(self.channel_token(channel_id), token)
+
+    def watch(self, service) -> Optional[WatchChannel]:
+        """Open a channel for the calendar behind ``service``"""
+        channel_id = str(uuid.uuid4())
+        result = service.watch_events(
+            channel_id, self.address, self.channel_token(channel_id), self.ttl_seconds
+        )
+        if not result:
+            return None
+
+        expiration = int(result.get('expiration', 0)) / 1000 or time.time() + self.ttl_seconds
+        channel = WatchChannel(channel_id, result.get('resourceId', ''), expiration, service)
+        self.channels[channel_id] = channel
+        self._services[service.calendar_id] = service
+        logger.info(f"Opened watch channel {channel_id} for calendar {service.calendar_id}")
+        return channel
+
+    def handle_notification(self, channel_id: str, token: Optional[str], resource_state: str,
+                            calendar_id: Optional[str] = None) -> bool:
+        """Invalidate cached availability for a validated notification.
+
+        Returns False when the token does not match the channel.
+        """
+        if not self.is_valid_token(channel_id, token):
+            return False
+
+        # The first message on a new channel only confirms it is live
+        if resource_state == 'sync':
+            return True
+
+        channel = self.channels.get(channel_id)
+        if channel:
+            channel.service.invalidate_cache()
+        elif calendar_id and calendar_id in self._services:
+            self._services[calendar_id].invalidate_cache()
+        else:
+            # Channel opened by another worker: we cannot tell which calendar
+            # changed, so drop everything we hold
+            for service in self._services.values():
+                service.invalidate_cache()
+        return True
+
+    def renew_due(self):
+        """Replace channels that are about to expire"""
+        deadline = time.time() + self.renew_before_seconds
+        for channel in [c for c in self.channels.values() if c.expiration <= deadline]:
+            if self.watch(channel.service):
+                self.stop(channel)
+            else:
+                logger.warning(f"Could not renew watch channel {channel.channel_id}")
+
+    def stop(self, channel: WatchChannel):
+        channel.service.stop_channel(channel.channel_id, channel.resource_id)
+        self.channels.pop(channel.channel_id, None)
+
+    def stop_all(self):
+        for channel in list(self.channels.values()):
+            self.stop(channel)
+
+    async def run_renewal_loop(self, interval_seconds: int = 300):
+        """Background task that keeps channels alive until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.renew_due)
+            except Exception as e:
+                logger.error(f"Watch channel renewal failed: {e}")
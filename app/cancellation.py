@@ -0,0 +1,80 @@
+"""Cancellation of a chat turn whose client has gone away.
+
+The /chat handler gives each turn a ``CancelToken`` and cancels it when
+the client disconnects. ``BookingAgent.process_message`` binds the token
+to its context, and the work that follows checks it at checkpoints:
+between graph nodes, before every Groq attempt and before every Calendar
+API request (prefetch and hedge threads run in a copy of the turn's
+context, so they see the token too). A checkpoint on a cancelled turn
+raises ``TurnCancelled`` and counts ``cancel.checkpoints.<where>``.
+
+The Groq and Google clients are synchronous, so a request already on the
+wire cannot be interrupted; it finishes, but nothing after it starts.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextvars import ContextVar
+from typing import Optional
+
+from app.metrics import metrics
+
+_current_token: ContextVar[Optional["CancelToken"]] = ContextVar("cancel_token", default=None)
+
+# How often a cancellable wait looks at the token
+POLL_INTERVAL = 0.1
+
+
+class TurnCancelled(Exception):
+    """The turn was cancelled (its client disconnected) and has been abandoned"""
+
+
+class CancelToken:
+    """Set once, from any thread, when the turn's result is no longer wanted"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+        self.cancelled_at = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "client disconnected"):
+        if not self._event.is_set():
+            self.reason = reason
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+
+
+def bind(token: Optional[CancelToken]):
+    """Make ``token`` the current turn's token; returns the reset handle"""
+    return _current_token.set(token)
+
+
+def unbind(handle):
+    _current_token.reset(handle)
+
+
+def check(where: str):
+    """Raise ``TurnCancelled`` if the current turn has been cancelled"""
+    token = _current_token.get()
+    if token is not None and token.cancelled:
+        metrics.incr(f"cancel.checkpoints.{where}")
+        raise TurnCancelled(f"Turn cancelled ({token.reason}) before {where}")
+
+
+def wait_first(futures, timeout: Optional[float] = None, where: str = "wait"):
+    """``concurrent.futures.wait(..., FIRST_COMPLETED)`` that stops waiting once the turn is cancelled"""
+    token = _current_token.get()
+    if token is None:
+        return wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+
+    end = None if timeout is None else time.monotonic() + timeout
+    while True:
+        check(where)
+        interval = POLL_INTERVAL if end is None else max(0.0, min(POLL_INTERVAL, end - time.monotonic()))
+        done, pending = wait(futures, timeout=interval, return_when=FIRST_COMPLETED)
+        if done or (end is not None and time.monotonic() >= end):
+            return done, pending
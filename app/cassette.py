@@ -0,0 +1,261 @@
+"""Record agent turns with their LLM and calendar calls, and play them back.
+
+A cassette is a JSONL file with one line per ``process_message`` call:
+
+    {"conversation": ..., "recorded_at": ..., "input": {...},
+     "calls": [{"kind": "llm", ...}, {"kind": "calendar", ...}], "output": {...}}
+
+``CassetteRecorder`` captures turns from a running agent; ``CassettePlayer``
+answers the same calls from a cassette so turns can be re-run without
+network access (see benchmarks/replay.py). Calls are tied to their turn
+through a context variable, so concurrent turns record separately.
+"""
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .calendar_service import CalendarUnavailableError, GoogleCalendarService, _parse_api_time
+
+logger = logging.getLogger(__name__)
+
+# The calls of the turn running in this context (recording) or still to be answered (replay)
+_current_turn: ContextVar[Optional[Dict[str, Any]]] = ContextVar("cassette_turn", default=None)
+
+# Service methods the agent reaches the calendar through; recorded after caching
+CALENDAR_METHODS = ("get_free_busy", "create_event", "get_event")
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def load(path: str) -> List[Dict[str, Any]]:
+    with open(path) as cassette:
+        return [json.loads(line) for line in cassette if line.strip()]
+
+
+class CassetteRecorder:
+    """Appends every turn of ``agent`` to a cassette file.
+
+    Production transcripts contain personal data: keep cassettes where
+    conversation logs are kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def install(self, agent):
+        llm_class = type(agent.llm)
+        self._wrap_llm(llm_class)
+        for name in CALENDAR_METHODS:
+            self._wrap_calendar(name)
+
+        process_message = agent.process_message
+
+        def recorded_process_message(message, session_id=None, history=None, summary=None,
+                                     tenant_id=None, **kwargs):
+            turn = {
+                "conversation": session_id,
+                "recorded_at": datetime.now().isoformat(),
+                "input": {
+                    "message": message,
+                    "session_id": session_id,
+                    "history": [m.to_dict() if hasattr(m, "to_dict") else m for m in history or []],
+                    "summary": summary,
+                    "tenant_id": tenant_id,
+                },
+                "calls": [],
+            }
+            token = _current_turn.set(turn)
+            try:
+                result = process_message(message, session_id, history=history, summary=summary,
+                                         tenant_id=tenant_id, **kwargs)
+            finally:
+                _current_turn.reset(token)
+            turn["output"] = {k: result.get(k) for k in ("response", "booking_confirmed", "suggested_slots")}
+            self._write(turn)
+            return result
+
+        agent.process_message = recorded_process_message
+        logger.info(f"Recording agent turns to {self.path}")
+
+    def _write(self, turn: Dict[str, Any]):
+        line = json.dumps(_jsonable(turn), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    @staticmethod
+    def _wrap_llm(llm_class):
+        invoke = llm_class.invoke
+
+        def recorded_invoke(self, messages, response_format=None, model=None, **kwargs):
+            response = invoke(self, messages, response_format=response_format, model=model, **kwargs)
+            turn = _current_turn.get()
+            if turn is not None:
+                turn["calls"].append({
+                    "kind": "llm",
+                    "model": model or self.model,
+                    "response_format": response_format,
+                    "messages": messages,
+                    "content": response.content,
+                    "failed": getattr(response, "failed", False),
+                })
+            return response
+
+        llm_class.invoke = recorded_invoke
+
+    @staticmethod
+    def _wrap_calendar(name: str):
+        method = getattr(GoogleCalendarService, name)
+
+        def recorded(self, *args, **kwargs):
+            turn = _current_turn.get()
+            if turn is None:
+                return method(self, *args, **kwargs)
+            call = {"kind": "calendar", "method": name, "calendar_id": self.calendar_id,
+                    "args": _jsonable(list(args))}
+            try:
+                result = method(self, *args, **kwargs)
+                call["result"] = _jsonable(result)
+                return result
+            except CalendarUnavailableError as e:
+                call["error"] = str(e)
+                raise
+            finally:
+                turn["calls"].append(call)
+
+        setattr(GoogleCalendarService, name, recorded)
+
+
+def frozen_datetime(moment: datetime):
+    """A ``datetime`` class whose ``now()`` is ``moment``, to replay a turn on its own date"""
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment if tz is None else moment.astimezone(tz)
+
+    return FrozenDatetime
+
+
+class _ReplayResponse:
+    def __init__(self, content: str, failed: bool = False):
+        self.content = content
+        self.failed = failed
+
+
+class CassettePlayer:
+    """Answers the agent's LLM and calendar calls from recorded turns.
+
+    Calls are matched within the turn being played: LLM calls in order
+    (JSON-mode and free-text separately), free/busy queries by calendar
+    and range. A prompt that differs from the recorded one still gets the
+    recorded answer and is reported as drift. Free/busy queries the turn
+    did not record (the live service answered them from its cache) are
+    served from any recorded answer covering the range. ``clock_modules``
+    get a ``datetime`` frozen at each turn's recording time, so dates in
+    prompts and queries match the recording.
+    """
+
+    def __init__(self, turns: List[Dict[str, Any]], clock_modules=()):
+        self.turns = turns
+        self.clock_modules = list(clock_modules)
+        self._lock = threading.Lock()
+        self._free_busy: Dict[str, List[tuple]] = {}
+        for turn in turns:
+            for call in turn["calls"]:
+                if call["kind"] == "calendar" and call["method"] == "get_free_busy" and "result" in call:
+                    start, end = (_parse_api_time(value) for value in call["args"][:2])
+                    self._free_busy.setdefault(call["calendar_id"], []).append((start, end, call["result"]))
+
+    def install(self, llm_class):
+        player = self
+
+        def invoke(self, messages, response_format=None, model=None, **kwargs):
+            return player._llm(messages, bool(response_format))
+
+        llm_class.invoke = invoke
+        for name in CALENDAR_METHODS:
+            setattr(GoogleCalendarService, name, self._calendar(name))
+
+    def play(self, agent, turn: Dict[str, Any]):
+        """Run one recorded turn; returns the agent's result and the replay report"""
+        state = {
+            "llm": [c for c in turn["calls"] if c["kind"] == "llm"],
+            "calendar": [c for c in turn["calls"] if c["kind"] == "calendar"],
+            "drift": [],
+            "unrecorded": [],
+        }
+        clock = frozen_datetime(datetime.fromisoformat(turn["recorded_at"]))
+        originals = [module.datetime for module in self.clock_modules]
+        for module in self.clock_modules:
+            module.datetime = clock
+        token = _current_turn.set(state)
+        try:
+            result = agent.process_message(**turn["input"])
+        finally:
+            _current_turn.reset(token)
+            for module, original in zip(self.clock_modules, originals):
+                module.datetime = original
+        return result, state
+
+    def _llm(self, messages, json_mode: bool):
+        state = _current_turn.get()
+        with self._lock:
+            for i, call in enumerate(state["llm"]):
+                if bool(call["response_format"]) == json_mode:
+                    del state["llm"][i]
+                    break
+            else:
+                state["unrecorded"].append({"kind": "llm", "json_mode": json_mode})
+                return _ReplayResponse("", failed=True)
+            if _jsonable(messages) != call["messages"]:
+                state["drift"].append({"kind": "llm", "recorded": call["messages"], "replayed": _jsonable(messages)})
+        return _ReplayResponse(call["content"], call.get("failed", False))
+
+    def _calendar(self, name: str):
+        player = self
+
+        def replayed(self, *args, **kwargs):
+            state = _current_turn.get()
+            args = _jsonable(list(args))
+            with player._lock:
+                candidates = [c for c in state["calendar"]
+                              if c["method"] == name and c["calendar_id"] == self.calendar_id]
+                match = next((c for c in candidates if c["args"][:2] == args[:2]), None)
+                if match is None and name != "get_free_busy" and candidates:
+                    match = candidates[0]
+                if match is not None:
+                    state["calendar"].remove(match)
+                    if "error" in match:
+                        raise CalendarUnavailableError(match["error"])
+                    return match["result"]
+                if name == "get_free_busy":
+                    busy = player._covering_free_busy(self.calendar_id, *args[:2])
+                    if busy is not None:
+                        return busy
+                state["unrecorded"].append({"kind": "calendar", "method": name, "args": args})
+            if name == "get_free_busy":
+                raise CalendarUnavailableError("No recorded free/busy answer covers this range")
+            return None
+
+        return replayed
+
+    def _covering_free_busy(self, calendar_id: str, start: str, end: str) -> Optional[List[dict]]:
+        start, end = _parse_api_time(start), _parse_api_time(end)
+        for recorded_start, recorded_end, busy in self._free_busy.get(calendar_id, []):
+            if recorded_start <= start and end <= recorded_end:
+                return [b for b in busy if _parse_api_time(b["start"]) < end and _parse_api_time(b["end"]) > start]
+        return None
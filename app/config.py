@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -5,13 +6,98 @@ load_dotenv()
 
 class Settings:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    
+    # Groq model per graph node; a failed or timed-out call is retried once on FALLBACK_MODEL
+    INTENT_MODEL = os.getenv("INTENT_MODEL", "llama-3.1-8b-instant")
+    RESPONSE_MODEL = os.getenv("RESPONSE_MODEL", "llama3-70b-8192")
+    FALLBACK_MODEL = os.getenv("FALLBACK_MODEL", "llama-3.3-70b-versatile")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 15.0))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 1))
+    # Per-tenant overrides, e.g. {"acme": {"intent": "llama-3.3-70b-versatile"}}
+    TENANT_MODEL_OVERRIDES = json.loads(os.getenv("TENANT_MODEL_OVERRIDES", "{}"))
+    
+    # Time budget for one /chat turn (seconds, 0 disables); the reply falls back to a
+    # template when less than RESPONSE_MIN_BUDGET is left for the LLM call
+    CHAT_DEADLINE = float(os.getenv("CHAT_DEADLINE", 20.0))
+    RESPONSE_MIN_BUDGET = float(os.getenv("RESPONSE_MIN_BUDGET", 2.0))
+    # Hedged intent calls: send a duplicate after the observed p95 latency
+    # (INTENT_HEDGE_DELAY until INTENT_HEDGE_MIN_SAMPLES calls have been timed)
+    INTENT_HEDGE = os.getenv("INTENT_HEDGE", "false").lower() == "true"
+    INTENT_HEDGE_DELAY = float(os.getenv("INTENT_HEDGE_DELAY", 1.0))
+    INTENT_HEDGE_MIN_SAMPLES = int(os.getenv("INTENT_HEDGE_MIN_SAMPLES", 20))
+    INTENT_HEDGE_WORKERS = int(os.getenv("INTENT_HEDGE_WORKERS", 16))
     GOOGLE_CALENDAR_CREDENTIALS_FILE = os.getenv("GOOGLE_CALENDAR_CREDENTIALS_FILE", "credentials.json")
     GOOGLE_CALENDAR_TOKEN_FILE = os.getenv("GOOGLE_CALENDAR_TOKEN_FILE", "token.json")
     CALENDAR_ID = os.getenv("CALENDAR_ID", "primary")
+    # Refresh OAuth tokens this many seconds before they expire
+    GOOGLE_TOKEN_REFRESH_MARGIN = int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", 300))
+    FREEBUSY_CACHE_TTL = int(os.getenv("FREEBUSY_CACHE_TTL", 300))
+    # Concurrent free/busy queries for a range already being fetched wait for that call
+    FREEBUSY_COALESCE = os.getenv("FREEBUSY_COALESCE", "true").lower() == "true"
+    
+    # Multi-tenant calendars: one directory per tenant holding its token.json
+    TENANT_CREDENTIALS_DIR = os.getenv("TENANT_CREDENTIALS_DIR", "tenants")
+    TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", 256))
+    TENANT_IDLE_TIMEOUT = int(os.getenv("TENANT_IDLE_TIMEOUT", 1800))
+    
+    # Google Calendar API quota (requests/second; bookings may use the reserved share)
+    CALENDAR_PROJECT_QPS = float(os.getenv("CALENDAR_PROJECT_QPS", 10))
+    CALENDAR_PROJECT_BURST = float(os.getenv("CALENDAR_PROJECT_BURST", 20))
+    CALENDAR_PER_CALENDAR_QPS = float(os.getenv("CALENDAR_PER_CALENDAR_QPS", 2))
+    CALENDAR_PER_CALENDAR_BURST = float(os.getenv("CALENDAR_PER_CALENDAR_BURST", 5))
+    CALENDAR_BOOKING_RESERVE = float(os.getenv("CALENDAR_BOOKING_RESERVE", 0.2))
+    CALENDAR_RATE_LIMIT_MAX_WAIT = float(os.getenv("CALENDAR_RATE_LIMIT_MAX_WAIT", 5.0))
+    CALENDAR_QUOTA_RETRIES = int(os.getenv("CALENDAR_QUOTA_RETRIES", 3))
+    
+    # Calendar push notifications (disabled unless a public webhook URL is set)
+    CALENDAR_WEBHOOK_URL = os.getenv("CALENDAR_WEBHOOK_URL")
+    CALENDAR_WEBHOOK_SECRET = os.getenv("CALENDAR_WEBHOOK_SECRET", "")
+    CALENDAR_CHANNEL_TTL = int(os.getenv("CALENDAR_CHANNEL_TTL", 86400))
+    CALENDAR_CHANNEL_RENEW_BEFORE = int(os.getenv("CALENDAR_CHANNEL_RENEW_BEFORE", 3600))
+    
+    # Conversation history sent to the LLM (estimated tokens)
+    HISTORY_TOKEN_CAP = int(os.getenv("HISTORY_TOKEN_CAP", 400))
+    HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", 100))
+    
+    # Booking job queue
+    BOOKING_WORKERS = int(os.getenv("BOOKING_WORKERS", 4))
+    BOOKING_MAX_ATTEMPTS = int(os.getenv("BOOKING_MAX_ATTEMPTS", 3))
+    BOOKING_RETRY_BASE_DELAY = float(os.getenv("BOOKING_RETRY_BASE_DELAY", 1.0))
+    BOOKING_JOURNAL_PATH = os.getenv("BOOKING_JOURNAL_PATH", "bookings.db")
+    # Group-commit window: journal writes arriving within it share one fsync
+    BOOKING_JOURNAL_COMMIT_INTERVAL = float(os.getenv("BOOKING_JOURNAL_COMMIT_INTERVAL", 0.005))
+    
+    # Speculative free/busy prefetch run alongside intent extraction (0 disables)
+    CALENDAR_PREFETCH_DAYS = int(os.getenv("CALENDAR_PREFETCH_DAYS", 7))
+    CALENDAR_PREFETCH_WORKERS = int(os.getenv("CALENDAR_PREFETCH_WORKERS", 8))
+    CALENDAR_PREFETCH_WAIT = float(os.getenv("CALENDAR_PREFETCH_WAIT", 10.0))
+    
+    # Append every agent turn with its LLM and calendar calls to this JSONL cassette
+    # for offline replay (benchmarks/replay.py); empty disables. Contains user messages.
+    CASSETTE_RECORD_PATH = os.getenv("CASSETTE_RECORD_PATH", "")
+    
+    # Debug profiling: /chat requests with a matching X-Profile-Token header run under
+    # cProfile (newest PROFILING_MAX_FILES kept in PROFILING_DIR); enables /debug/* endpoints
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+    PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 50))
+    
+    # How often /chat checks for a disconnected client while the turn runs (0 disables
+    # cancellation); a cancelled turn stops at its next node, LLM call or calendar query
+    CHAT_DISCONNECT_POLL = float(os.getenv("CHAT_DISCONNECT_POLL", 0.25))
+    
+    # Warm-up before /ready reports ready: connections, caches and a stub-LLM turn
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 30.0))
+    # Timezones clients query in, loaded ahead of the first request
+    WARMUP_TIMEZONES = [z.strip() for z in os.getenv("WARMUP_TIMEZONES", "UTC").split(",") if z.strip()]
     
     # FastAPI settings
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", 8000))
+    # Gzip responses at least this many bytes (0 disables)
+    GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", 1024))
     
     # Streamlit settings
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:8501")
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class CredentialsRequiredError(Exception):
+    """The token cannot be used or refreshed, and the consent flow is not allowed here"""
+
+
+class CredentialManager:
+    """Loads, refreshes and persists the OAuth credentials behind a token file.
+
+    Tokens are stored as the JSON produced by ``Credentials.to_json`` and
+    written atomically. Refreshes happen ahead of expiry from a background
+    thread under an exclusive file lock; a worker that finds a fresher token
+    on disk adopts it instead of refreshing again, so processes sharing a
+    token file refresh once between them. With ``interactive=False`` a
+    missing or unusable token raises ``CredentialsRequiredError`` instead
+    of opening a browser for consent (for clients built inside requests).
+    """
+
+    def __init__(self, credentials_file: str, token_file: str, scopes: List[str],
+                 refresh_margin: int = 300, interactive: bool = True):
+        self.credentials_file = credentials_file
+        self.token_file = token_file
+        self.scopes = scopes
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.interactive = interactive
+        self.credentials: Optional[Credentials] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.token_file + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Optional[Credentials]:
+        if not os.path.exists(self.token_file):
+            return None
+        try:
+            with open(self.token_file, 'r') as token:
+                return Credentials.from_authorized_user_info(json.load(token), self.scopes)
+        except (ValueError, UnicodeDecodeError):
+            # Older releases pickled the token; it is not loaded for safety
+            logger.warning(f"Token file {self.token_file} is not JSON or is malformed")
+            return None
+
+    def _write(self, creds: Credentials):
+        directory = os.path.dirname(os.path.abspath(self.token_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.token-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as tmp:
+                tmp.write(creds.to_json())
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.token_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load(self) -> Credentials:
+        """Load credentials, refreshing or running the consent flow if needed"""
+        with self._lock, self._file_lock():
+            creds = self._read()
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    creds.refresh(Request())
+                elif not self.interactive:
+                    raise CredentialsRequiredError(
+                        f"Token file {self.token_file} is missing, malformed or cannot be refreshed"
+                    )
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(self.credentials_file, self.scopes)
+                    # Use run_local_server() without specifying port for desktop apps
+                    creds = flow.run_local_server(port=0)
+                self._write(creds)
+            self.credentials = creds
+        return creds
+
+    def needs_refresh(self) -> bool:
+        creds = self.credentials
+        if creds is None or creds.expiry is None:
+            return False
+        # google-auth keeps expiry as naive UTC
+        return creds.expiry - datetime.utcnow() <= self.refresh_margin
+
+    def refresh_if_due(self) -> bool:
+        """Refresh ahead of expiry; returns True if the token changed"""
+        if not self.needs_refresh():
+            return False
+
+        with self._lock, self._file_lock():
+            if not self.needs_refresh():
+                return False
+
+            # Another worker may already have refreshed the shared token
+            on_disk = self._read()
+            if on_disk and on_disk.expiry and on_disk.expiry - datetime.utcnow() > self.refresh_margin:
+                self._adopt(on_disk)
+                return True
+
+            fresh = Credentials.from_authorized_user_info(json.loads(self.credentials.to_json()), self.scopes)
+            fresh.refresh(Request())
+            self._write(fresh)
+            self._adopt(fresh)
+            return True
+
+    def _adopt(self, fresh: Credentials):
+        # Update in place: API clients hold a reference to this object
+        self.credentials.token = fresh.token
+        self.credentials.expiry = fresh.expiry
+        # Another process may have rotated the refresh token; the old one is
+        # revoked. google-auth exposes these read-only, hence the private fields
+        if fresh.refresh_token and fresh.refresh_token != self.credentials.refresh_token:
+            self.credentials._refresh_token = fresh.refresh_token
+        if fresh.scopes and fresh.scopes != self.credentials.scopes:
+            self.credentials._scopes = fresh.scopes
+
+    def start(self):
+        """Keep these credentials fresh from the shared background refresher"""
+        _refresher.register(self)
+
+
+class BackgroundRefresher:
+    """One daemon thread that refreshes every registered manager ahead of expiry"""
+
+    def __init__(self, poll_interval: float = 30.0):
+        self.poll_interval = poll_interval
+        self._managers = weakref.WeakSet()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, manager: CredentialManager):
+        with self._lock:
+            self._managers.add(manager)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="credential-refresher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            for manager in list(self._managers):
+                try:
+                    manager.refresh_if_due()
+                except Exception as e:
+                    logger.error(f"Background token refresh failed for {manager.token_file}: {e}")
+
+
+_refresher = BackgroundRefresher()
@@ -1,10 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from urllib.parse import unquote
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import math
+import time
 import uuid
 import logging
+import pytz
+
+# orjson-backed responses when orjson is installed
+try:
+    import orjson  # noqa: F401 (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,19 +31,94 @@ logger = logging.getLogger(__name__)
 
 # Import with error handling - using absolute imports
 try:
-    from app.models import ChatMessage, ChatResponse
+    from app.models import (
+        ChatMessage, ChatResponse, TimeSlot, AvailabilityResponse, BookingResponse, BookingJobStatus,
+        RecurringRequest, RecurringResponse, MeetingRequest, SchedulingRequest, SchedulingResponse
+    )
 except ImportError:
     # Define models inline if import fails
     class ChatMessage(BaseModel):
         message: str
         session_id: Optional[str] = None
         timestamp: Optional[str] = None
+        tenant_id: Optional[str] = None
     
     class ChatResponse(BaseModel):
         response: str
         session_id: str
         booking_confirmed: bool = False
         suggested_slots: List[Dict[str, Any]] = []
+    
+    class TimeSlot(BaseModel):
+        start: str
+        end: str
+        time: Optional[str] = None
+        available: bool = True
+    
+    class AvailabilityResponse(BaseModel):
+        slots: List[TimeSlot] = []
+        timezone: str = "UTC"
+        next_cursor: Optional[str] = None
+    
+    class BookingResponse(BaseModel):
+        message: str
+        booking_confirmed: bool
+        session_id: str
+        booking_id: Optional[str] = None
+        status: Optional[str] = None
+        booking_details: Optional[Dict[str, Any]] = None
+    
+    class BookingJobStatus(BaseModel):
+        booking_id: str
+        status: str
+        session_id: Optional[str] = None
+        attempts: int = 0
+        message: Optional[str] = None
+        booking_confirmed: bool = False
+        booking_details: Optional[Dict[str, Any]] = None
+    
+    class RecurringRequest(BaseModel):
+        start: str
+        rrule: str
+        duration_minutes: int = 60
+        timezone: str = "UTC"
+        title: str = "Meeting"
+        description: Optional[str] = None
+        skip_conflicts: bool = False
+        tenant_id: Optional[str] = None
+    
+    class RecurringResponse(BaseModel):
+        occurrences: int
+        available: int
+        first: Optional[str] = None
+        last: Optional[str] = None
+        conflicts: List[Dict[str, Any]] = []
+        success: Optional[bool] = None
+        event_id: Optional[str] = None
+        message: Optional[str] = None
+    
+    class MeetingRequest(BaseModel):
+        id: str
+        duration_minutes: int = 60
+        attendees: List[str]
+        after: List[str] = []
+    
+    class SchedulingRequest(BaseModel):
+        meetings: List[MeetingRequest]
+        start_date: str
+        end_date: str
+        timezone: str = "UTC"
+        working_hours: List[int] = [9, 17]
+        step_minutes: int = 30
+        time_limit_seconds: float = 2.0
+        tenant_id: Optional[str] = None
+    
+    class SchedulingResponse(BaseModel):
+        status: str
+        scheduled: List[Dict[str, Any]] = []
+        unscheduled: List[str] = []
+        nodes: int = 0
+        elapsed_ms: float = 0.0
 
 try:
     from app.agent.booking_agent import BookingAgent
@@ -32,7 +126,7 @@ except ImportError:
     logger.error("Could not import BookingAgent. Make sure all dependencies are installed.")
     # Create a dummy agent for testing
     class BookingAgent:
-        def process_message(self, message: str, session_id: str = None):
+        def process_message(self, message: str, session_id: str = None, **kwargs):
             return {
                 "response": "I'm sorry, the booking agent is not available right now. Please try again later.",
                 "session_id": session_id or str(uuid.uuid4()),
@@ -40,13 +134,42 @@ except ImportError:
                 "suggested_slots": []
             }
         
-        def confirm_booking(self, slot_data: dict, session_id: str = None):
+        def confirm_booking(self, slot_data: dict, session_id: str = None, booking_id: str = None,
+                            tenant_id: str = None):
             return {
                 "response": "Booking service is currently unavailable.",
                 "session_id": session_id or str(uuid.uuid4()),
                 "booking_confirmed": False
             }
 
+try:
+    from app.agent.tools import calendar_service, calendar_pool
+    from app.calendar_pool import UnknownTenantError
+    from app.calendar_service import event_id_for_booking, CalendarUnavailableError
+    from app.calendar_watch import CalendarWatchManager
+    from app.async_calendar_client import aclose_http_client
+except ImportError:
+    logger.error("Could not import the calendar service. Push notifications are disabled.")
+    calendar_service = None
+    calendar_pool = None
+    CalendarUnavailableError = None
+    CalendarWatchManager = None
+    aclose_http_client = None
+
+try:
+    from app.warmup import warm_up
+except ImportError:
+    warm_up = None
+
+from app.booking_queue import BookingQueue
+from app.booking_journal import BookingJournal
+from app.cancellation import CancelToken
+from app.metrics import metrics
+from app.profiling import MemoryTracer, RequestProfiler
+from app.recurrence import RecurrenceError, book_recurring, check_recurring
+from app.scheduling_solver import Meeting, SchedulingError, schedule_meetings
+from app.session_store import Session, USER, ASSISTANT
+
 # Import settings with fallback
 try:
     from app.config import settings
@@ -57,17 +180,42 @@ except ImportError:
         API_PORT = int(os.getenv('API_PORT', 8000))
         GROQ_API_KEY = os.getenv('GROQ_API_KEY')
         FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:8501')
+        BOOKING_WORKERS = int(os.getenv('BOOKING_WORKERS', 4))
+        BOOKING_MAX_ATTEMPTS = int(os.getenv('BOOKING_MAX_ATTEMPTS', 3))
+        BOOKING_RETRY_BASE_DELAY = float(os.getenv('BOOKING_RETRY_BASE_DELAY', 1.0))
+        BOOKING_JOURNAL_PATH = os.getenv('BOOKING_JOURNAL_PATH', 'bookings.db')
+        BOOKING_JOURNAL_COMMIT_INTERVAL = float(os.getenv('BOOKING_JOURNAL_COMMIT_INTERVAL', 0.005))
+        GZIP_MIN_SIZE = int(os.getenv('GZIP_MIN_SIZE', 1024))
+        CHAT_DEADLINE = float(os.getenv('CHAT_DEADLINE', 20.0))
+        CASSETTE_RECORD_PATH = os.getenv('CASSETTE_RECORD_PATH', '')
+        PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+        PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+        PROFILING_DIR = os.getenv('PROFILING_DIR', 'profiles')
+        PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 50))
+        WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+        WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', 30.0))
+        CHAT_DISCONNECT_POLL = float(os.getenv('CHAT_DISCONNECT_POLL', 0.25))
     
     settings = Settings()
 
 # Global variables for the app
 booking_agent = None
 sessions = {}
+watch_manager = None
+booking_queue = None
+booking_journal = None
+# Debug profiling; both stay None unless PROFILING_ENABLED and PROFILING_TOKEN are set
+request_profiler = None
+memory_tracer = None
+# /ready answers 503 until the lifespan warm-up has finished (or timed out)
+service_ready = False
+warmup_report = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global booking_agent
+    global booking_agent, watch_manager, booking_queue, booking_journal, request_profiler, memory_tracer
+    global service_ready
     logger.info("TailorTalk Booking API starting up...")
     logger.info(f"API will be available at http://{settings.API_HOST}:{settings.API_PORT}")
     
@@ -79,18 +227,87 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize BookingAgent: {e}")
         booking_agent = BookingAgent()  # Will use dummy agent
     
+    if settings.CASSETTE_RECORD_PATH:
+        from app.cassette import CassetteRecorder
+        CassetteRecorder(settings.CASSETTE_RECORD_PATH).install(booking_agent)
+    
+    if settings.PROFILING_ENABLED:
+        if settings.PROFILING_TOKEN:
+            request_profiler = RequestProfiler(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+            memory_tracer = MemoryTracer()
+            logger.warning(f"Request profiling is enabled; profiles are written to {settings.PROFILING_DIR}")
+        else:
+            logger.error("PROFILING_ENABLED is set without PROFILING_TOKEN; profiling stays off")
+    
+    # Every confirmation is journaled before the calendar is called
+    booking_journal = BookingJournal(
+        settings.BOOKING_JOURNAL_PATH,
+        commit_interval=settings.BOOKING_JOURNAL_COMMIT_INTERVAL
+    )
+    
+    # Bookings are confirmed by background workers with retries
+    booking_queue = BookingQueue(
+        handler=booking_agent.confirm_booking,
+        workers=settings.BOOKING_WORKERS,
+        max_attempts=settings.BOOKING_MAX_ATTEMPTS,
+        base_delay=settings.BOOKING_RETRY_BASE_DELAY,
+        on_complete=_record_booking_outcome
+    )
+    await booking_queue.start()
+    await _reconcile_bookings()
+    booking_journal.start()
+    
+    # Subscribe to calendar push notifications so cached availability stays fresh
+    renewal_task = None
+    if getattr(settings, "CALENDAR_WEBHOOK_URL", None) and not getattr(settings, "CALENDAR_WEBHOOK_SECRET", ""):
+        logger.error("CALENDAR_WEBHOOK_URL is set but CALENDAR_WEBHOOK_SECRET is empty; "
+                     "not opening a calendar watch channel")
+    elif getattr(settings, "CALENDAR_WEBHOOK_URL", None) and calendar_service and CalendarWatchManager:
+        watch_manager = CalendarWatchManager(
+            address=settings.CALENDAR_WEBHOOK_URL,
+            secret=settings.CALENDAR_WEBHOOK_SECRET,
+            ttl_seconds=settings.CALENDAR_CHANNEL_TTL,
+            renew_before_seconds=settings.CALENDAR_CHANNEL_RENEW_BEFORE
+        )
+        if await asyncio.to_thread(watch_manager.watch, calendar_service):
+            renewal_task = asyncio.create_task(watch_manager.run_renewal_loop())
+        else:
+            logger.warning("Could not open a calendar watch channel; relying on cache TTL")
+    
+    # Warm up in the background so /health answers while /ready still says 503
+    warmup_task = None
+    if settings.WARMUP_ENABLED and warm_up:
+        warmup_task = asyncio.create_task(_run_warmup())
+    else:
+        service_ready = True
+    
     yield
     
     # Shutdown
     logger.info("TailorTalk Booking API shutting down...")
+    await booking_queue.stop()
+    await asyncio.to_thread(booking_journal.close)
+    if renewal_task:
+        renewal_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    if watch_manager:
+        await asyncio.to_thread(watch_manager.stop_all)
+    if aclose_http_client:
+        await aclose_http_client()
 
 app = FastAPI(
     title="TailorTalk Booking API", 
     version="1.0.0",
     description="AI-powered booking assistant API",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Compress large bodies (long session histories) for clients that accept gzip
+if settings.GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -113,15 +330,55 @@ async def root():
         "endpoints": {
             "chat": "/chat",
             "confirm_booking": "/confirm-booking",
-            "health": "/health"
+            "availability": "/availability",
+            "bookings": "/bookings/{booking_id}",
+            "recurring_availability": "/availability/recurring",
+            "recurring_bookings": "/bookings/recurring",
+            "schedule": "/schedule",
+            "calendar_notifications": "/calendar/notifications",
+            "metrics": "/metrics",
+            "health": "/health",
+            "ready": "/ready"
         }
     }
 
+def _calendar_for(tenant_id: Optional[str]):
+    """The tenant's calendar client, or a 404/503 for the request"""
+    if calendar_pool is None:
+        raise HTTPException(status_code=503, detail="Calendar service is not available")
+    try:
+        return calendar_pool.get(tenant_id)
+    except UnknownTenantError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+
+def _profiling_authorized(request: Request) -> bool:
+    token = request.headers.get("X-Profile-Token")
+    return bool(token) and hmac.compare_digest(token, settings.PROFILING_TOKEN)
+
+def _require_profiling(request: Request):
+    """Debug endpoints do not exist unless profiling is enabled and the token matches"""
+    if request_profiler is None or not _profiling_authorized(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+def _check_tenant(tenant_id: Optional[str]):
+    # Requests without a tenant keep working (with the agent's fallbacks) when no calendar is configured
+    if tenant_id and not (calendar_pool is not None and calendar_pool.has_tenant(tenant_id)):
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
-    """Handle chat messages from the frontend"""
+async def chat(message: ChatMessage, request: Request):
+    """Handle chat messages from the frontend
+    
+    The turn runs in a worker thread and is cancelled if the client
+    disconnects before it finishes (the reply is then dropped, status 499).
+    With profiling enabled, a request carrying X-Profile-Token runs under
+    cProfile; the profile ID (X-Request-ID if valid) is returned in X-Profile-Id.
+    """
     global booking_agent, sessions
     
+    # The turn's time budget starts when the request arrives
+    deadline = time.monotonic() + settings.CHAT_DEADLINE if settings.CHAT_DEADLINE > 0 else None
+    
     try:
         # Validate input
         if not message.message or not message.message.strip():
@@ -130,38 +387,58 @@ async def chat(message: ChatMessage):
         # Generate session ID if not provided
         session_id = message.session_id or str(uuid.uuid4())
         
-        # Store session data
+        # Store session data; a session stays with the tenant it started with
         if session_id not in sessions:
-            sessions[session_id] = {
-                "created_at": message.timestamp,
-                "messages": []
-            }
+            _check_tenant(message.tenant_id)
+            sessions[session_id] = Session(message.timestamp, message.tenant_id)
+        elif message.tenant_id and message.tenant_id != sessions[session_id].tenant_id:
+            raise HTTPException(status_code=409, detail="Session belongs to a different tenant")
         
         # Add user message to session
-        sessions[session_id]["messages"].append({
-            "role": "user",
-            "content": message.message,
-            "timestamp": message.timestamp
-        })
+        session = sessions[session_id]
+        session.add(USER, message.message, message.timestamp)
         
         logger.info(f"Processing message for session {session_id}: {message.message[:50]}...")
         
-        # Process message with the agent
-        result = booking_agent.process_message(message.message, session_id)
+        # Process message with the agent, windowing the earlier turns
+        process_message = booking_agent.process_message
+        profile_id = None
+        if request_profiler is not None and _profiling_authorized(request):
+            profile_id = request.headers.get("X-Request-ID")
+            if not RequestProfiler.valid_id(profile_id):
+                profile_id = uuid.uuid4().hex
+            process_message = functools.partial(request_profiler.run, profile_id, process_message)
+        cancel = CancelToken()
+        turn = asyncio.ensure_future(asyncio.to_thread(
+            process_message,
+            message.message, session_id,
+            history=session.messages[:-1],
+            summary=session.summary,
+            tenant_id=session.tenant_id,
+            deadline=deadline,
+            cancel=cancel
+        ))
+        if await _client_left(request, turn, cancel):
+            logger.info(f"Client disconnected; cancelled the turn for session {session_id}")
+            return Response(status_code=499)
+        result = turn.result()
+        if result.get("cancelled"):
+            return Response(status_code=499)
+        if result.get("summary"):
+            session.summary = result["summary"]
         
         # Add assistant response to session
-        sessions[session_id]["messages"].append({
-            "role": "assistant",
-            "content": result["response"],
-            "timestamp": message.timestamp
-        })
+        session.add(ASSISTANT, result["response"], message.timestamp)
         
-        return ChatResponse(
+        # Built from the agent's own output: skip validation and FastAPI's re-encoding
+        response = ChatResponse.model_construct(
             response=result["response"],
             session_id=result["session_id"],
             booking_confirmed=result.get("booking_confirmed", False),
             suggested_slots=result.get("suggested_slots", [])
         )
+        headers = {"X-Profile-Id": profile_id} if profile_id else None
+        return FastJSONResponse(response.model_dump(), headers=headers)
     
     except HTTPException:
         raise
@@ -169,10 +446,85 @@ async def chat(message: ChatMessage):
         logger.error(f"Error processing chat message: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/confirm-booking")
+async def _client_left(request: Request, turn: asyncio.Future, cancel: CancelToken) -> bool:
+    """Wait for the turn; cancel it and return True if the client disconnects first"""
+    if settings.CHAT_DISCONNECT_POLL <= 0:
+        await turn
+        return False
+    
+    while True:
+        done, _ = await asyncio.wait({turn}, timeout=settings.CHAT_DISCONNECT_POLL)
+        if done:
+            return False
+        if await request.is_disconnected():
+            cancel.cancel()
+            metrics.incr("chat.disconnects")
+            # How long the abandoned turn keeps running to its next checkpoint
+            turn.add_done_callback(
+                lambda _: metrics.incr("cancel.drain_seconds", time.monotonic() - cancel.cancelled_at)
+            )
+            return True
+
+async def _reconcile_bookings():
+    """Settle bookings that were journaled but never finished (e.g. after a crash)"""
+    global booking_journal, booking_queue
+    
+    for intent in booking_journal.unresolved():
+        booking_id = intent["booking_id"]
+        slot = intent.get("slot") or {}
+        
+        event = None
+        if calendar_pool is not None:
+            try:
+                service = calendar_pool.get(intent.get("tenant_id"))
+                event = await asyncio.to_thread(service.get_event, event_id_for_booking(booking_id))
+            except Exception as e:
+                logger.warning(f"Could not look up booking {booking_id}: {e}")
+        
+        if event:
+            logger.info(f"Booking {booking_id} was created before shutdown; recording outcome")
+            booking_journal.record_outcome(booking_id, "confirmed", {"event_id": event.get("id"), "reconciled": True})
+            continue
+        
+        try:
+            expired = datetime.fromisoformat(str(slot.get("start", "")).replace("Z", "+00:00")).timestamp() <= time.time()
+        except ValueError:
+            expired = True
+        if expired:
+            logger.warning(f"Booking {booking_id} was interrupted and its slot has passed")
+            booking_journal.record_outcome(booking_id, "failed", {"reason": "slot passed before recovery"})
+        else:
+            logger.info(f"Resuming interrupted booking {booking_id}")
+            booking_queue.submit(slot, intent.get("session_id"), booking_id, intent.get("tenant_id"))
+
+async def _run_warmup():
+    """Warm connections and caches, then report ready (also when warm-up fails or times out)"""
+    global service_ready, warmup_report
+    
+    try:
+        warmup_report = await asyncio.wait_for(
+            warm_up(booking_agent, calendar_service), settings.WARMUP_TIMEOUT
+        )
+        logger.info(f"Warm-up finished in {warmup_report['seconds']}s")
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up did not finish within {settings.WARMUP_TIMEOUT}s; reporting ready anyway")
+        warmup_report = {"timed_out": True, "seconds": settings.WARMUP_TIMEOUT}
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        warmup_report = {"error": str(e)}
+    service_ready = True
+
+def _record_booking_outcome(job):
+    """Journal the outcome and add the final booking message to the conversation"""
+    booking_journal.record_outcome(job.booking_id, job.status, job.result.get("booking_result"))
+    
+    if job.session_id and job.session_id in sessions:
+        sessions[job.session_id].add(ASSISTANT, job.message, booking_confirmed=job.status == "confirmed")
+
+@app.post("/confirm-booking", status_code=202)
 async def confirm_booking(booking_data: dict):
-    """Confirm a booking slot"""
-    global booking_agent, sessions
+    """Queue a booking confirmation; poll /bookings/{booking_id} for the outcome"""
+    global booking_queue
     
     try:
         session_id = booking_data.get("conversation_id")
@@ -181,24 +533,23 @@ async def confirm_booking(booking_data: dict):
         if not selected_slot:
             raise HTTPException(status_code=400, detail="No slot selected")
         
-        logger.info(f"Confirming booking for session {session_id}")
+        tenant_id = booking_data.get("tenant_id") or getattr(sessions.get(session_id), "tenant_id", None)
+        _check_tenant(tenant_id)
         
-        # Process booking confirmation
-        result = booking_agent.confirm_booking(selected_slot, session_id)
+        # Write-ahead: the intent is durable before any calendar call is made
+        booking_id = f"booking_{uuid.uuid4().hex}"
+        await asyncio.wrap_future(booking_journal.record_intent(booking_id, session_id, selected_slot, tenant_id))
         
-        # Update session if exists
-        if session_id and session_id in sessions:
-            sessions[session_id]["messages"].append({
-                "role": "assistant",
-                "content": result["response"],
-                "booking_confirmed": True
-            })
+        logger.info(f"Queueing booking {booking_id} for session {session_id}")
+        job = booking_queue.submit(selected_slot, session_id, booking_id, tenant_id)
         
-        return {
-            "message": result["response"],
-            "booking_confirmed": result.get("booking_confirmed", False),
-            "session_id": session_id
-        }
+        return BookingResponse(
+            message="Your booking is being confirmed. This usually takes a few seconds.",
+            booking_confirmed=False,
+            session_id=session_id or "",
+            booking_id=job.booking_id,
+            status=job.status
+        )
     
     except HTTPException:
         raise
@@ -206,15 +557,191 @@ async def confirm_booking(booking_data: dict):
         logger.error(f"Error confirming booking: {e}")
         raise HTTPException(status_code=500, detail="Failed to confirm booking")
 
+@app.get("/bookings/{booking_id}", response_model=BookingJobStatus)
+async def get_booking(booking_id: str):
+    """Get the status of a queued booking"""
+    global booking_queue
+    
+    job = booking_queue.get(booking_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    
+    # to_dict() already has BookingJobStatus's fields; no model round trip needed
+    return FastJSONResponse(job.to_dict())
+
+def _encode_cursor(slot_start: datetime) -> str:
+    return base64.urlsafe_b64encode(slot_start.isoformat().encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> datetime:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode()).decode())
+
+@app.get("/availability", response_model=AvailabilityResponse)
+async def availability(
+    request: Request,
+    start_date: str = Query(..., description="First day to search, YYYY-MM-DD"),
+    end_date: str = Query(..., description="Last day to search (inclusive), YYYY-MM-DD"),
+    duration_minutes: int = Query(60, ge=5, le=480),
+    timezone: str = Query("UTC", description="IANA timezone for working hours and results"),
+    step_minutes: int = Query(30, ge=5, le=240),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
+    tenant_id: Optional[str] = Query(None, description="Tenant whose calendar is searched")
+):
+    """Structured slot search straight from the calendar, without the LLM"""
+    calendar = _calendar_for(tenant_id)
+    
+    try:
+        tz = pytz.timezone(timezone)
+        range_start = tz.localize(datetime.strptime(start_date, '%Y-%m-%d'))
+        range_end = tz.localize(datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1))
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {timezone}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
+    if range_end <= range_start or range_end - range_start > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="Date range must cover 1 to 31 days")
+    
+    search_start = range_start
+    if cursor:
+        try:
+            after = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if after.tzinfo is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Resume on the grid point after the last slot of the previous page,
+        # never before the requested range (e.g. a cursor from another query)
+        search_start = max(after.astimezone(tz) + timedelta(minutes=step_minutes), range_start)
+    
+    # A cursor at the end of the range leaves nothing to search: empty last page
+    slots = []
+    if search_start < range_end:
+        try:
+            # Warm the free/busy cache without blocking a worker thread on I/O
+            await calendar.aget_free_busy(search_start, range_end)
+            
+            # Fetch one extra slot to learn whether another page exists
+            slots = await asyncio.to_thread(
+                calendar.find_available_slots,
+                search_start, range_end, duration_minutes,
+                limit=limit + 1, step_minutes=step_minutes
+            )
+        except CalendarUnavailableError as e:
+            logger.warning(f"Calendar unavailable for availability search: {e}")
+            headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+            raise HTTPException(status_code=503, detail="Calendar is temporarily unavailable, please retry shortly", headers=headers)
+        except Exception as e:
+            logger.error(f"Error searching availability: {e}")
+            raise HTTPException(status_code=502, detail="Could not check calendar availability")
+    
+    page = slots[:limit]
+    next_cursor = _encode_cursor(page[-1]["start"]) if len(slots) > limit else None
+    result = AvailabilityResponse(
+        slots=[
+            TimeSlot(start=slot["start"].isoformat(), end=slot["end"].isoformat(), time=slot["formatted"])
+            for slot in page
+        ],
+        timezone=timezone,
+        next_cursor=next_cursor
+    )
+    
+    etag = 'W/"' + hashlib.sha1(result.model_dump_json().encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=result.model_dump_json(), media_type="application/json", headers=headers)
+
+def _series_start(request: RecurringRequest) -> datetime:
+    """The first occurrence in the request's timezone, where the series repeats"""
+    try:
+        tz = pytz.timezone(request.timezone)
+        start = datetime.fromisoformat(request.start.replace("Z", "+00:00"))
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {request.timezone}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start must be an ISO date-time")
+    return tz.localize(start) if start.tzinfo is None else start.astimezone(tz)
+
+async def _run_series(fn, calendar, *args, **kwargs) -> dict:
+    try:
+        return await asyncio.to_thread(fn, calendar, *args, **kwargs)
+    except RecurrenceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CalendarUnavailableError as e:
+        logger.warning(f"Calendar unavailable for recurring series: {e}")
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=503, detail="Calendar is temporarily unavailable, please retry shortly", headers=headers)
+
+@app.post("/availability/recurring", response_model=RecurringResponse)
+async def recurring_availability(request: RecurringRequest):
+    """Check every occurrence of a recurring series with one free/busy query"""
+    calendar = _calendar_for(request.tenant_id)
+    result = await _run_series(check_recurring, calendar, _series_start(request), request.rrule,
+                               request.duration_minutes)
+    return FastJSONResponse(RecurringResponse.model_construct(**result).model_dump())
+
+@app.post("/bookings/recurring", response_model=RecurringResponse)
+async def book_recurring_series(request: RecurringRequest):
+    """Book a recurring series as one recurring event; 409 with the conflicts unless skip_conflicts"""
+    calendar = _calendar_for(request.tenant_id)
+    result = await _run_series(book_recurring, calendar, request.title, _series_start(request), request.rrule,
+                               request.duration_minutes, request.description or "", request.skip_conflicts)
+    if not result["success"]:
+        status_code = 409 if result["conflicts"] else 502
+        return FastJSONResponse(RecurringResponse.model_construct(**result).model_dump(), status_code=status_code)
+    return FastJSONResponse(RecurringResponse.model_construct(**result).model_dump())
+
+@app.post("/schedule", response_model=SchedulingResponse)
+async def schedule(request: SchedulingRequest):
+    """Place several meetings (e.g. an interview loop) into the attendees' common free time"""
+    calendar = _calendar_for(request.tenant_id)
+    
+    try:
+        tz = pytz.timezone(request.timezone)
+        window_start = tz.localize(datetime.strptime(request.start_date, '%Y-%m-%d'))
+        window_end = tz.localize(datetime.strptime(request.end_date, '%Y-%m-%d') + timedelta(days=1))
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {request.timezone}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
+    if window_end <= window_start or window_end - window_start > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="Date range must cover 1 to 31 days")
+    if not 0 <= request.working_hours[0] < request.working_hours[1] <= 23:
+        raise HTTPException(status_code=400, detail="working_hours must be [start, end] hours with start < end")
+    
+    meetings = [Meeting(m.id, m.duration_minutes, m.attendees, m.after) for m in request.meetings]
+    try:
+        result = await asyncio.to_thread(
+            schedule_meetings, calendar, meetings, window_start, window_end,
+            tuple(request.working_hours), request.step_minutes, request.time_limit_seconds
+        )
+    except SchedulingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CalendarUnavailableError as e:
+        logger.warning(f"Calendar unavailable for scheduling: {e}")
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=503, detail="Calendar is temporarily unavailable, please retry shortly", headers=headers)
+    
+    return FastJSONResponse(SchedulingResponse.model_construct(**result).model_dump())
+
 @app.get("/sessions/{session_id}")
-async def get_session(session_id: str):
-    """Get session history"""
+async def get_session(
+    session_id: str,
+    limit: int = Query(100, ge=1, le=1000, description="Messages per page"),
+    before: Optional[int] = Query(None, ge=0, description="next_before from a newer page")
+):
+    """Get session history, newest page first; pages are oldest-first inside"""
     global sessions
     
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return sessions[session_id]
+    # Serialized directly: jsonable_encoder would walk every message first
+    return FastJSONResponse(dict(sessions[session_id].to_dict(limit, before), session_id=session_id))
 
 @app.delete("/sessions/{session_id}")
 async def clear_session(session_id: str):
@@ -227,14 +754,48 @@ async def clear_session(session_id: str):
     else:
         raise HTTPException(status_code=404, detail="Session not found")
 
+@app.post("/calendar/notifications")
+async def calendar_notification(request: Request):
+    """Receive Google Calendar watch-channel notifications"""
+    global watch_manager
+    
+    if not watch_manager:
+        raise HTTPException(status_code=404, detail="Push notifications are not enabled")
+    
+    headers = request.headers
+    resource_uri = headers.get("X-Goog-Resource-URI", "")
+    calendar_id = None
+    if "/calendars/" in resource_uri:
+        calendar_id = unquote(resource_uri.split("/calendars/", 1)[1].split("/", 1)[0])
+    
+    accepted = watch_manager.handle_notification(
+        channel_id=headers.get("X-Goog-Channel-ID", ""),
+        token=headers.get("X-Goog-Channel-Token"),
+        resource_state=headers.get("X-Goog-Resource-State", ""),
+        calendar_id=calendar_id
+    )
+    if not accepted:
+        raise HTTPException(status_code=403, detail="Invalid channel token")
+    
+    return {"message": "Notification processed"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the startup warm-up is done, then the warm-up report"""
+    if not service_ready:
+        return FastJSONResponse({"ready": False}, status_code=503)
+    return {"ready": True, "warmup": warmup_report}
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
     global booking_agent, sessions
     
     try:
-        # Test if agent is working
-        test_result = booking_agent.process_message("test", "health_check")
+        # Test if agent is working. The class method is called directly so
+        # cassette recording (an instance wrapper) keeps probes out of fixtures
+        test_result = await asyncio.to_thread(type(booking_agent).process_message, booking_agent,
+                                              "test", "health_check")
         agent_status = "healthy" if test_result else "unhealthy"
     except:
         agent_status = "unhealthy"
@@ -242,9 +803,73 @@ async def health():
     return {
         "status": "healthy",
         "agent_status": agent_status,
-        "active_sessions": len(sessions)
+        "active_sessions": len(sessions),
+        "calendar_clients": len(calendar_pool) if calendar_pool is not None else 0
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Counters for calendar throttling, caches and background work"""
+    global booking_agent
+    
+    counters = metrics.snapshot()
+    intent_requests = counters.get("intent.requests", 0)
+    intent_latency = getattr(booking_agent, "intent_latency", None)
+    return {
+        "counters": counters,
+        "intent_parse_failure_rate": counters.get("intent.parse_failures", 0) / intent_requests if intent_requests else 0.0,
+        "calendar_pool": dict(calendar_pool.stats, size=len(calendar_pool)) if calendar_pool is not None else {},
+        "prefetch": {name: counters.get(f"prefetch.{name}", 0) for name in ("started", "reused", "discarded")},
+        "intent_latency_p95": intent_latency.percentile(0.95) if intent_latency is not None else None
     }
 
+@app.get("/debug/profiles")
+async def list_profiles(request: Request):
+    """Saved request profiles, newest first"""
+    _require_profiling(request)
+    return {"profiles": request_profiler.list()}
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(
+    request: Request,
+    profile_id: str,
+    top: int = Query(30, ge=1, le=500),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$")
+):
+    """Text summary of a saved profile (the .prof file itself stays in PROFILING_DIR)"""
+    _require_profiling(request)
+    try:
+        summary = await asyncio.to_thread(request_profiler.summary, profile_id, top, sort)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=summary, media_type="text/plain")
+
+@app.post("/debug/memory/start")
+async def start_memory_tracing(request: Request, frames: int = Query(1, ge=1, le=50)):
+    """Start tracemalloc; allocations are traced (and slower) until stopped"""
+    _require_profiling(request)
+    memory_tracer.start(frames)
+    return {"tracing": True, "frames": frames}
+
+@app.get("/debug/memory/snapshot")
+async def memory_snapshot(
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+):
+    """Top allocation sites, plus the changes since the previous snapshot"""
+    _require_profiling(request)
+    if not memory_tracer.tracing:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; POST /debug/memory/start first")
+    return await asyncio.to_thread(memory_tracer.snapshot, limit, key_type)
+
+@app.post("/debug/memory/stop")
+async def stop_memory_tracing(request: Request):
+    """Stop tracemalloc and free its traces"""
+    _require_profiling(request)
+    memory_tracer.stop()
+    return {"tracing": False}
+
 # Exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -0,0 +1,56 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+
+class Counters:
+    """Process-wide named counters, safe to bump from any thread.
+
+    Names are dotted (``calendar.throttled.availability``); ``snapshot()``
+    returns a plain dict for the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._values[name] += value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class LatencyWindow:
+    """The most recent ``size`` latency samples, for percentile estimates"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+metrics = Counters()
@@ -7,13 +7,15 @@ class ChatMessage(BaseModel):
     message: str = Field(..., description="The user's message")
     session_id: Optional[str] = Field(None, description="Session identifier")
     timestamp: Optional[str] = Field(None, description="Message timestamp")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose calendar is used (default calendar if omitted)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "message": "I want to book an appointment for tomorrow at 2 PM",
                 "session_id": "12345-67890",
-                "timestamp": "2024-01-15T14:30:00Z"
+                "timestamp": "2024-01-15T14:30:00Z",
+                "tenant_id": "acme-dental"
             }
         }
 
@@ -34,6 +36,28 @@ class TimeSlot(BaseModel):
             }
         }
 
+class AvailabilityResponse(BaseModel):
+    """Model for structured availability queries"""
+    slots: List[TimeSlot] = Field(default_factory=list, description="Available time slots")
+    timezone: str = Field("UTC", description="Timezone the slots are expressed in")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "slots": [
+                    {
+                        "start": "2024-01-15T14:00:00+00:00",
+                        "end": "2024-01-15T15:00:00+00:00",
+                        "time": "2024-01-15 02:00 PM - 03:00 PM",
+                        "available": True
+                    }
+                ],
+                "timezone": "UTC",
+                "next_cursor": "MjAyNC0wMS0xNVQxNDowMDowMCswMDowMA"
+            }
+        }
+
 class ChatResponse(BaseModel):
     """Model for chat responses"""
     response: str = Field(..., description="The assistant's response")
@@ -62,6 +86,7 @@ class BookingConfirmation(BaseModel):
     """Model for booking confirmation requests"""
     conversation_id: str = Field(..., description="Conversation/session ID")
     selected_slot: Dict[str, Any] = Field(..., description="Selected time slot")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose calendar is booked")
     action: str = Field("confirm_booking", description="Action to perform")
     additional_details: Optional[Dict[str, Any]] = Field(None, description="Additional booking details")
     
@@ -84,6 +109,7 @@ class BookingResponse(BaseModel):
     booking_confirmed: bool = Field(..., description="Whether booking was successful")
     session_id: str = Field(..., description="Session identifier")
     booking_id: Optional[str] = Field(None, description="Unique booking identifier")
+    status: Optional[str] = Field(None, description="Booking job status")
     booking_details: Optional[Dict[str, Any]] = Field(None, description="Booking details")
     
     class Config:
@@ -93,6 +119,7 @@ class BookingResponse(BaseModel):
                 "booking_confirmed": True,
                 "session_id": "12345-67890",
                 "booking_id": "booking_123456",
+                "status": "confirmed",
                 "booking_details": {
                     "title": "Meeting",
                     "start_time": "2024-01-15T14:00:00Z",
@@ -101,11 +128,129 @@ class BookingResponse(BaseModel):
             }
         }
 
+class BookingJobStatus(BaseModel):
+    """Model for booking job status polling"""
+    booking_id: str = Field(..., description="Unique booking identifier")
+    status: str = Field(..., description="One of pending, processing, retrying, confirmed, failed")
+    session_id: Optional[str] = Field(None, description="Session identifier")
+    attempts: int = Field(0, description="Booking attempts made so far")
+    message: Optional[str] = Field(None, description="Latest message for the user")
+    booking_confirmed: bool = Field(False, description="Whether the booking is confirmed")
+    booking_details: Optional[Dict[str, Any]] = Field(None, description="Calendar result once booked")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "booking_id": "booking_123456",
+                "status": "confirmed",
+                "session_id": "12345-67890",
+                "attempts": 1,
+                "message": "Perfect! Your Meeting has been confirmed for 2:00 PM - 3:00 PM.",
+                "booking_confirmed": True,
+                "booking_details": {"success": True, "event_id": "abc123"}
+            }
+        }
+
+class RecurringRequest(BaseModel):
+    """Model for checking or booking a recurring appointment"""
+    start: str = Field(..., description="First occurrence, ISO format (local to timezone if no offset)")
+    rrule: str = Field(..., description="RFC 5545 recurrence rule")
+    duration_minutes: int = Field(60, ge=5, le=480, description="Duration of each occurrence")
+    timezone: str = Field("UTC", description="IANA timezone the series repeats in")
+    title: str = Field("Meeting", description="Title of the appointment")
+    description: Optional[str] = Field(None, description="Optional description")
+    skip_conflicts: bool = Field(False, description="Book the free occurrences and leave out conflicting ones")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose calendar is used")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "start": "2024-01-16T10:00:00",
+                "rrule": "FREQ=WEEKLY;BYDAY=TU;COUNT=12",
+                "duration_minutes": 60,
+                "timezone": "Europe/London",
+                "title": "Weekly check-in"
+            }
+        }
+
+class RecurringResponse(BaseModel):
+    """Model for recurring availability and booking results"""
+    occurrences: int = Field(..., description="Occurrences in the series")
+    available: int = Field(..., description="Occurrences without a conflict")
+    first: Optional[str] = Field(None, description="First occurrence")
+    last: Optional[str] = Field(None, description="Last occurrence")
+    conflicts: List[Dict[str, Any]] = Field(default_factory=list, description="Conflicting occurrences with nearest free alternatives")
+    success: Optional[bool] = Field(None, description="Whether the series was booked (bookings only)")
+    event_id: Optional[str] = Field(None, description="ID of the recurring event (bookings only)")
+    message: Optional[str] = Field(None, description="Result message (bookings only)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "occurrences": 12,
+                "available": 11,
+                "first": "2024-01-16T10:00:00+00:00",
+                "last": "2024-04-02T10:00:00+01:00",
+                "conflicts": [
+                    {
+                        "start": "2024-02-06T10:00:00+00:00",
+                        "end": "2024-02-06T11:00:00+00:00",
+                        "time": "2024-02-06 10:00 AM - 11:00 AM",
+                        "alternatives": [
+                            {"start": "2024-02-06T11:00:00+00:00", "end": "2024-02-06T12:00:00+00:00", "time": "2024-02-06 11:00 AM - 12:00 PM"}
+                        ]
+                    }
+                ]
+            }
+        }
+
+class MeetingRequest(BaseModel):
+    """One meeting for the scheduling solver"""
+    id: str = Field(..., description="Meeting identifier, referenced by 'after'")
+    duration_minutes: int = Field(60, ge=5, le=480, description="Meeting length")
+    attendees: List[str] = Field(..., min_length=1, description="Calendar IDs (e.g. emails) of the attendees")
+    after: List[str] = Field(default_factory=list, description="Meetings that must end before this one starts")
+
+class SchedulingRequest(BaseModel):
+    """Model for placing several meetings at once"""
+    meetings: List[MeetingRequest] = Field(..., min_length=1, max_length=50, description="Meetings to place")
+    start_date: str = Field(..., description="First day to search, YYYY-MM-DD")
+    end_date: str = Field(..., description="Last day to search (inclusive), YYYY-MM-DD")
+    timezone: str = Field("UTC", description="IANA timezone for working hours and results")
+    working_hours: List[int] = Field(default_factory=lambda: [9, 17], min_length=2, max_length=2, description="Start and end hour")
+    step_minutes: int = Field(30, ge=5, le=240, description="Grid for candidate start times")
+    time_limit_seconds: float = Field(2.0, gt=0, le=10, description="Search time limit; the best schedule found so far is returned")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose calendar credentials are used")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "meetings": [
+                    {"id": "intro", "duration_minutes": 30, "attendees": ["recruiter@example.com", "candidate@example.com"]},
+                    {"id": "technical", "duration_minutes": 60, "attendees": ["engineer@example.com", "candidate@example.com"], "after": ["intro"]}
+                ],
+                "start_date": "2024-01-15",
+                "end_date": "2024-01-26",
+                "timezone": "Europe/London"
+            }
+        }
+
+class SchedulingResponse(BaseModel):
+    """Model for scheduling solver results"""
+    status: str = Field(..., description="complete, partial (not everything fits) or timed_out (best found in time)")
+    scheduled: List[Dict[str, Any]] = Field(default_factory=list, description="Placed meetings, in time order")
+    unscheduled: List[str] = Field(default_factory=list, description="Meetings that could not be placed")
+    nodes: int = Field(0, description="Search nodes explored")
+    elapsed_ms: float = Field(0.0, description="Solver time")
+
 class SessionData(BaseModel):
     """Model for session data"""
     session_id: str = Field(..., description="Session identifier")
     created_at: Optional[str] = Field(None, description="Session creation timestamp")
-    messages: List[Dict[str, Any]] = Field(default_factory=list, description="Message history")
+    tenant_id: Optional[str] = Field(None, description="Tenant the session belongs to")
+    total_messages: int = Field(0, description="Messages in the whole session")
+    messages: List[Dict[str, Any]] = Field(default_factory=list, description="One page of message history, oldest first")
+    next_before: Optional[int] = Field(None, description="Pass as ?before= to get the previous page")
     booking_history: List[Dict[str, Any]] = Field(default_factory=list, description="Booking history")
     
     class Config:
@@ -113,6 +258,8 @@ class SessionData(BaseModel):
             "example": {
                 "session_id": "12345-67890",
                 "created_at": "2024-01-15T12:00:00Z",
+                "tenant_id": None,
+                "total_messages": 240,
                 "messages": [
                     {
                         "role": "user",
@@ -120,6 +267,7 @@ class SessionData(BaseModel):
                         "timestamp": "2024-01-15T12:01:00Z"
                     }
                 ],
+                "next_before": 140,
                 "booking_history": []
             }
         }
@@ -0,0 +1,118 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+_PROFILE_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class RequestProfiler:
+    """Runs single requests under cProfile and keeps the newest ``max_files`` profiles.
+
+    Profiles are written to ``directory`` as ``<request id>.prof`` (load them
+    with ``pstats`` or snakeviz). Only the request's own thread is profiled;
+    work handed to executor threads (e.g. the calendar prefetch) is not.
+    """
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max_files
+        # cProfile cannot profile two calls at once in one process
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def valid_id(profile_id: Optional[str]) -> bool:
+        return bool(profile_id) and bool(_PROFILE_ID.match(profile_id))
+
+    def path(self, profile_id: str) -> str:
+        if not self.valid_id(profile_id):
+            raise ValueError(f"Invalid profile ID: {profile_id!r}")
+        return os.path.join(self.directory, f"{profile_id}.prof")
+
+    def run(self, profile_id: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn`` under the profiler and save the profile as ``profile_id``"""
+        path = self.path(profile_id)
+        with self._lock:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(fn, *args, **kwargs)
+            finally:
+                profiler.dump_stats(path)
+                self._rotate()
+
+    def _rotate(self):
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in profiles[:max(0, len(profiles) - self.max_files)]:
+            os.remove(entry.path)
+
+    def list(self) -> List[Dict[str, Any]]:
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime, reverse=True
+        )
+        return [
+            {"id": entry.name[:-len(".prof")], "size": entry.stat().st_size,
+             "created_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(entry.stat().st_mtime))}
+            for entry in profiles
+        ]
+
+    def summary(self, profile_id: str, top: int = 30, sort: str = "cumulative") -> str:
+        """The ``top`` functions of a saved profile as pstats text"""
+        out = io.StringIO()
+        pstats.Stats(self.path(profile_id), stream=out).sort_stats(sort).print_stats(top)
+        return out.getvalue()
+
+
+class MemoryTracer:
+    """tracemalloc controls for the debug endpoints; nothing is traced until ``start``"""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous = None
+
+    def stop(self):
+        tracemalloc.stop()
+        self._previous = None
+
+    def snapshot(self, limit: int = 20, key_type: str = "lineno") -> Dict[str, Any]:
+        """Largest allocation sites now, and the biggest changes since the last snapshot"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [self._stat(stat) for stat in snapshot.statistics(key_type)[:limit]],
+        }
+        if self._previous is not None:
+            result["changes"] = [self._stat(stat) for stat in snapshot.compare_to(self._previous, key_type)[:limit]]
+        self._previous = snapshot
+        return result
+
+    @staticmethod
+    def _stat(stat) -> Dict[str, Any]:
+        entry = {"where": str(stat.traceback), "size": stat.size, "count": stat.count}
+        if hasattr(stat, "size_diff"):
+            entry.update(size_diff=stat.size_diff, count_diff=stat.count_diff)
+        return entry
@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .metrics import metrics
+
+# Request priorities: bookings may use the reserve that availability checks leave free,
+# speculative fetches (prefetch) only run if quota is available right now
+BOOKING = "booking"
+AVAILABILITY = "availability"
+SPECULATIVE = "speculative"
+
+
+class RateLimitedError(Exception):
+    """The request would have to wait longer than allowed for quota"""
+
+    def __init__(self, retry_after: float, scope: str = "calendar"):
+        super().__init__(f"Calendar API {scope} rate limit reached; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations, so waiting happens outside the lock"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, now: float, floor: float = 0.0) -> float:
+        """Seconds until one token can be taken without going below ``floor``"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = max(0.0, (floor + 1 - self.tokens) / self.rate)
+        return max(wait, self.blocked_until - now)
+
+    def take(self):
+        # May go negative: later callers then wait for the tokens owed
+        self.tokens -= 1
+
+    def block(self, until: float):
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class CalendarRateLimiter:
+    """Quota guard shared by every calendar client in the process.
+
+    Each call takes a token from the project bucket (the Google Cloud
+    project's quota, shared by all tenants) and from the bucket of the
+    calendar it targets. Availability checks leave ``reserve`` of each
+    bucket for bookings, so bookings still go through while availability
+    traffic is throttled. A call that would wait longer than ``max_wait``
+    fails fast with RateLimitedError rather than holding a worker. Quota
+    errors from the API pause the affected bucket (see ``penalize``).
+    """
+
+    def __init__(self, project_rate: float = 10.0, project_burst: float = 20,
+                 calendar_rate: float = 2.0, calendar_burst: float = 5,
+                 reserve: float = 0.2, max_wait: float = 5.0,
+                 base_backoff: float = 1.0, max_backoff: float = 32.0,
+                 max_calendars: int = 10000):
+        self.calendar_rate = calendar_rate
+        self.calendar_burst = calendar_burst
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_calendars = max_calendars
+        self.project = TokenBucket(project_rate, project_burst)
+        self._calendars: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, calendar_id: str) -> TokenBucket:
+        bucket = self._calendars.get(calendar_id)
+        if bucket is None:
+            bucket = self._calendars[calendar_id] = TokenBucket(self.calendar_rate, self.calendar_burst)
+            if len(self._calendars) > self.max_calendars:
+                self._calendars.popitem(last=False)
+        else:
+            self._calendars.move_to_end(calendar_id)
+        return bucket
+
+    def reserve_slot(self, calendar_id: str, priority: str = AVAILABILITY,
+                     max_wait: Optional[float] = None) -> float:
+        """Claim quota for one call; returns the seconds to wait before making it"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        if priority == SPECULATIVE:
+            max_wait = 0.0
+        with self._lock:
+            now = time.monotonic()
+            calendar = self._bucket(calendar_id)
+            delays = []
+            for scope, bucket in (("project", self.project), ("calendar", calendar)):
+                floor = bucket.capacity * self.reserve if priority != BOOKING else 0.0
+                delays.append((bucket.delay(now, floor), scope))
+            delay, scope = max(delays)
+            if delay > max_wait:
+                metrics.incr(f"calendar.rate_limit.rejected.{priority}")
+                raise RateLimitedError(delay, scope)
+            self.project.take()
+            calendar.take()
+
+        if delay > 0:
+            metrics.incr(f"calendar.rate_limit.throttled.{priority}")
+            metrics.incr("calendar.rate_limit.wait_seconds", delay)
+        return delay
+
+    def acquire(self, calendar_id: str, priority: str = AVAILABILITY, max_wait: Optional[float] = None):
+        """Blocking variant of reserve_slot"""
+        delay = self.reserve_slot(calendar_id, priority, max_wait)
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry ``attempt`` (1-based) after a quota error"""
+        if retry_after:
+            return min(self.max_backoff, retry_after)
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def penalize(self, calendar_id: str, delay: float, project_wide: bool = False):
+        """Hold back further calls after the API reported exhausted quota"""
+        until = time.monotonic() + delay
+        with self._lock:
+            (self.project if project_wide else self._bucket(calendar_id)).block(until)
+        metrics.incr("calendar.quota_errors.project" if project_wide else "calendar.quota_errors.calendar")
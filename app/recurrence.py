@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+import pytz
+from dateutil.rrule import rrulestr
+
+# Upper bound on a series; open-ended rules must say COUNT or UNTIL
+MAX_OCCURRENCES = 260
+
+
+class RecurrenceError(ValueError):
+    """The recurrence rule is invalid or describes too many occurrences"""
+
+
+def _localize(tzinfo, value: datetime) -> datetime:
+    if tzinfo is None:
+        return value
+    if hasattr(tzinfo, 'localize'):
+        return tzinfo.localize(value)
+    return value.replace(tzinfo=tzinfo)
+
+
+def time_zone_name(value: datetime) -> Optional[str]:
+    """IANA name of ``value``'s zone; 'UTC' for naive or zero-offset values, None for other fixed offsets"""
+    zone = getattr(value.tzinfo, 'zone', None) or getattr(value.tzinfo, 'key', None)
+    if zone:
+        return zone
+    if value.tzinfo is None or value.utcoffset() == timedelta(0):
+        return 'UTC'
+    return None
+
+
+def normalize_rule(rule: str) -> str:
+    """The rule without its ``RRULE:`` prefix; one RRULE only"""
+    rule = (rule or "").strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[6:]
+    if not rule or "\n" in rule:
+        raise RecurrenceError("Expected a single RRULE such as FREQ=WEEKLY;BYDAY=TU;COUNT=12")
+    return rule
+
+
+def expand(rule: str, start: datetime, limit: int = MAX_OCCURRENCES) -> List[datetime]:
+    """Start times of every occurrence of ``rule``, beginning at ``start``
+
+    The rule is expanded on the wall clock and each occurrence localized on
+    its own, so a 10:00 series stays at 10:00 across DST changes (as Google
+    Calendar does). UNTIL is read as wall-clock time in the same zone.
+    A fixed UTC offset has no DST rules, so ``start`` must carry a named
+    zone (or UTC).
+    """
+    if time_zone_name(start) is None:
+        raise RecurrenceError(f"A recurring series needs a named timezone such as Asia/Kolkata, "
+                              f"not the fixed offset {start.strftime('%z')}")
+    try:
+        rrule = rrulestr(normalize_rule(rule), dtstart=start.replace(tzinfo=None), ignoretz=True)
+    except (ValueError, TypeError) as e:
+        raise RecurrenceError(f"Invalid RRULE: {e}") from e
+
+    occurrences = list(islice(rrule, limit + 1))
+    if not occurrences:
+        raise RecurrenceError("The rule has no occurrences")
+    if len(occurrences) > limit:
+        raise RecurrenceError(f"The rule has more than {limit} occurrences; add COUNT or UNTIL")
+    return [_localize(start.tzinfo, occurrence) for occurrence in occurrences]
+
+
+def exdate(starts: List[datetime]) -> str:
+    """EXDATE line excluding the given occurrences from a series"""
+    return "EXDATE:" + ",".join(s.astimezone(pytz.utc).strftime('%Y%m%dT%H%M%SZ') for s in starts)
+
+
+def _slot_json(slot: Dict[str, Any]) -> Dict[str, Any]:
+    return {"start": slot["start"].isoformat(), "end": slot["end"].isoformat(), "time": slot["formatted"]}
+
+
+def check_recurring(calendar, start: datetime, rule: str, duration_minutes: int = 60,
+                    alternatives: int = 2) -> Dict[str, Any]:
+    """Check every occurrence of a series against one covering free/busy query
+
+    Returns the occurrence count and each conflicting occurrence with its
+    nearest free ``alternatives`` on the same day.
+    """
+    starts = expand(rule, start)
+    results = calendar.check_series(starts, duration_minutes, alternatives=alternatives)
+    conflicts = [
+        dict(_slot_json(slot), alternatives=[_slot_json(alt) for alt in slot["alternatives"]])
+        for slot in results if not slot["available"]
+    ]
+    return {
+        "occurrences": len(results),
+        "available": len(results) - len(conflicts),
+        "first": starts[0].isoformat(),
+        "last": starts[-1].isoformat(),
+        "conflicts": conflicts,
+    }
+
+
+def book_recurring(calendar, title: str, start: datetime, rule: str, duration_minutes: int = 60,
+                   description: str = "", skip_conflicts: bool = False,
+                   event_id: Optional[str] = None) -> Dict[str, Any]:
+    """Create the series as one recurring event after checking it
+
+    With conflicts the series is not booked unless ``skip_conflicts`` is
+    set, in which case the conflicting occurrences are left out (EXDATE).
+    """
+    check = check_recurring(calendar, start, rule, duration_minutes)
+    if check["conflicts"] and not skip_conflicts:
+        return dict(check, success=False,
+                    message=f"{len(check['conflicts'])} of {check['occurrences']} occurrences conflict with existing events")
+
+    recurrence = ["RRULE:" + normalize_rule(rule)]
+    if check["conflicts"]:
+        recurrence.append(exdate([datetime.fromisoformat(c["start"]) for c in check["conflicts"]]))
+
+    created = calendar.create_event(title, start, start + timedelta(minutes=duration_minutes),
+                                    description, event_id=event_id, recurrence=recurrence)
+    if not created:
+        return dict(check, success=False, message="Failed to create calendar event")
+    return dict(check, success=True, event_id=created,
+                message=f"Booked '{title}': {check['available']} occurrences from {start.strftime('%Y-%m-%d %I:%M %p')}")
@@ -0,0 +1,218 @@
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from .availability_index import DayFreeIntervals
+
+COMPLETE = "complete"
+PARTIAL = "partial"
+TIMED_OUT = "timed_out"
+
+
+class SchedulingError(ValueError):
+    """The meetings cannot be scheduled as described (unknown or cyclic ordering)"""
+
+
+class Meeting:
+    """A meeting to place: its length, who attends and which meetings must end before it"""
+
+    def __init__(self, meeting_id: str, duration_minutes: int, attendees: Iterable[str],
+                 after: Iterable[str] = ()):
+        self.meeting_id = meeting_id
+        self.duration = duration_minutes * 60
+        self.attendees = frozenset(attendees)
+        self.after = frozenset(after)
+
+
+class _StopSearch(Exception):
+    pass
+
+
+class SchedulingSolver:
+    """Places meetings into their attendees' common free time.
+
+    Candidate starts lie on a ``step_minutes`` grid inside working hours
+    where every attendee of the meeting is free. The search is
+    backtracking with forward checking: the meeting with the fewest
+    candidates left goes next, earliest start first, and each choice
+    removes clashing candidates (shared attendees, ordering) from the
+    meetings not yet placed. Meetings may also be left out, so when not
+    everything fits the result is the largest set that does (ordering
+    applies between the meetings that are placed). The search
+    stops at the first complete schedule or after ``time_limit`` seconds,
+    returning the best schedule found so far.
+    """
+
+    def __init__(self, meetings: List[Meeting], busy: Dict[str, List[Tuple[float, float]]],
+                 window_start: datetime, window_end: datetime, working_hours: tuple = (9, 17),
+                 step_minutes: int = 30, time_limit: float = 2.0):
+        self.meetings = {m.meeting_id: m for m in meetings}
+        if len(self.meetings) != len(meetings):
+            raise SchedulingError("Meeting IDs must be unique")
+        self.busy = busy
+        self.window_start = window_start
+        self.window_end = window_end
+        self.working_hours = working_hours
+        self.step = step_minutes * 60
+        self.time_limit = time_limit
+        self._check_ordering()
+        self._neighbors = {
+            m.meeting_id: [
+                other for other in self.meetings.values()
+                if other is not m and (other.attendees & m.attendees
+                                       or other.meeting_id in m.after or m.meeting_id in other.after)
+            ]
+            for m in meetings
+        }
+
+    def _check_ordering(self):
+        for meeting in self.meetings.values():
+            unknown = meeting.after - self.meetings.keys()
+            if unknown:
+                raise SchedulingError(f"{meeting.meeting_id} comes after unknown meetings: {sorted(unknown)}")
+
+        # Depth-first search for a cycle in the "after" graph
+        state = {}
+
+        def visit(meeting_id):
+            state[meeting_id] = 1
+            for before in self.meetings[meeting_id].after:
+                if state.get(before) == 1:
+                    raise SchedulingError(f"Ordering constraints form a cycle through {before}")
+                if before not in state:
+                    visit(before)
+            state[meeting_id] = 2
+
+        for meeting_id in self.meetings:
+            if meeting_id not in state:
+                visit(meeting_id)
+
+    def _work_window(self, day) -> Tuple[datetime, datetime]:
+        tzinfo = self.window_start.tzinfo
+        bounds = []
+        for hour in self.working_hours:
+            value = datetime.combine(day, datetime.min.time().replace(hour=hour))
+            if tzinfo and hasattr(tzinfo, 'localize'):
+                value = tzinfo.localize(value)
+            elif tzinfo:
+                value = value.replace(tzinfo=tzinfo)
+            bounds.append(value)
+        return bounds[0], bounds[1]
+
+    def _candidates(self, meeting: Meeting) -> List[float]:
+        """Grid starts (epoch seconds) where every attendee is free for the whole meeting"""
+        busy = [period for attendee in meeting.attendees for period in self.busy.get(attendee, [])]
+        range_start = self.window_start.timestamp()
+        range_end = self.window_end.timestamp()
+        starts = []
+        day = self.window_start.date()
+        while day <= self.window_end.date():
+            work_start, work_end = self._work_window(day)
+            day_start = work_start.timestamp()
+            lo = max(day_start, range_start)
+            hi = min(work_end.timestamp(), range_end)
+            for free_start, free_end in DayFreeIntervals.from_busy(day_start, work_end.timestamp(), busy):
+                free_start = max(free_start, lo)
+                free_end = min(free_end, hi)
+                offset = -(-(free_start - day_start) // self.step) * self.step
+                while day_start + offset + meeting.duration <= free_end:
+                    starts.append(day_start + offset)
+                    offset += self.step
+            day += timedelta(days=1)
+        return starts
+
+    def _prune(self, domain: List[float], placed: Meeting, start: float, other: Meeting) -> List[float]:
+        """Candidates of ``other`` still compatible with ``placed`` starting at ``start``"""
+        if other.meeting_id in placed.after:
+            domain = domain[:bisect_right(domain, start - other.duration)]
+        if placed.meeting_id in other.after:
+            domain = domain[bisect_left(domain, start + placed.duration):]
+        if other.attendees & placed.attendees:
+            i = bisect_right(domain, start - other.duration)
+            j = bisect_left(domain, start + placed.duration)
+            if i < j:
+                domain = domain[:i] + domain[j:]
+        return domain
+
+    def _search(self, assignment: Dict[str, float], domains: Dict[str, List[float]], skipped: set):
+        self.nodes += 1
+        if time.monotonic() > self._deadline:
+            self.timed_out = True
+            raise _StopSearch()
+
+        live = [m for m in domains if m not in assignment and m not in skipped and domains[m]]
+        if len(assignment) > len(self._best):
+            self._best = dict(assignment)
+            if len(self._best) == len(self.meetings):
+                raise _StopSearch()
+        # Bound: even placing every meeting still open would not beat the best
+        if len(assignment) + len(live) <= len(self._best):
+            return
+
+        pick = min(live, key=lambda m: len(domains[m]))
+        meeting = self.meetings[pick]
+        for start in domains[pick]:
+            pruned = dict(domains)
+            for other in self._neighbors[pick]:
+                if other.meeting_id not in assignment:
+                    pruned[other.meeting_id] = self._prune(domains[other.meeting_id], meeting, start, other)
+            assignment[pick] = start
+            self._search(assignment, pruned, skipped)
+            del assignment[pick]
+
+        # Leave this meeting out and try to place the rest
+        skipped.add(pick)
+        self._search(assignment, domains, skipped)
+        skipped.discard(pick)
+
+    def solve(self) -> Dict:
+        """Run the search; see the class docstring for the result semantics"""
+        started = time.monotonic()
+        self._deadline = started + self.time_limit
+        self._best: Dict[str, float] = {}
+        self.nodes = 0
+        self.timed_out = False
+
+        domains = {meeting_id: self._candidates(m) for meeting_id, m in self.meetings.items()}
+        try:
+            self._search({}, domains, set())
+        except _StopSearch:
+            pass
+
+        tzinfo = self.window_start.tzinfo
+        scheduled = []
+        for meeting_id, start in sorted(self._best.items(), key=lambda item: item[1]):
+            meeting = self.meetings[meeting_id]
+            start_dt = datetime.fromtimestamp(start, tzinfo)
+            end_dt = datetime.fromtimestamp(start + meeting.duration, tzinfo)
+            scheduled.append({
+                "id": meeting_id,
+                "start": start_dt.isoformat(),
+                "end": end_dt.isoformat(),
+                "time": f"{start_dt.strftime('%Y-%m-%d %I:%M %p')} - {end_dt.strftime('%I:%M %p')}",
+                "attendees": sorted(meeting.attendees),
+            })
+
+        if len(self._best) == len(self.meetings):
+            status = COMPLETE
+        else:
+            status = TIMED_OUT if self.timed_out else PARTIAL
+        return {
+            "status": status,
+            "scheduled": scheduled,
+            "unscheduled": [meeting_id for meeting_id in self.meetings if meeting_id not in self._best],
+            "nodes": self.nodes,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+
+
+def schedule_meetings(calendar, meetings: List[Meeting], window_start: datetime, window_end: datetime,
+                      working_hours: tuple = (9, 17), step_minutes: int = 30,
+                      time_limit: float = 2.0) -> Dict:
+    """Fetch every attendee's busy time with one free/busy query, then solve"""
+    attendees = sorted({a for m in meetings for a in m.attendees})
+    busy = calendar.busy_periods_many(attendees, window_start, window_end)
+    solver = SchedulingSolver(meetings, busy, window_start, window_end,
+                              working_hours, step_minutes, time_limit)
+    return solver.solve()
@@ -0,0 +1,80 @@
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+USER = sys.intern("user")
+ASSISTANT = sys.intern("assistant")
+
+
+class MessageRecord:
+    """One chat message, without a per-message ``__dict__``.
+
+    Roles are interned so every record shares the same two strings. ``get``
+    and item access mirror the dicts this replaces, so code that reads
+    messages as mappings (e.g. HistoryWindow) keeps working.
+    """
+
+    __slots__ = ("role", "content", "timestamp", "booking_confirmed")
+
+    def __init__(self, role: str, content: str, timestamp: Optional[str] = None,
+                 booking_confirmed: Optional[bool] = None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = timestamp
+        self.booking_confirmed = booking_confirmed
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        message = {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+        if self.booking_confirmed is not None:
+            message["booking_confirmed"] = self.booking_confirmed
+        return message
+
+
+class Session:
+    """A conversation: its messages plus the state the agent carries between turns"""
+
+    __slots__ = ("created_at", "tenant_id", "summary", "messages")
+
+    def __init__(self, created_at: Optional[str] = None, tenant_id: Optional[str] = None):
+        self.created_at = created_at
+        self.tenant_id = tenant_id
+        self.summary: Optional[Dict[str, Any]] = None
+        self.messages: List[MessageRecord] = []
+
+    def add(self, role: str, content: str, timestamp: Optional[str] = None,
+            booking_confirmed: Optional[bool] = None) -> MessageRecord:
+        record = MessageRecord(role, content, timestamp, booking_confirmed)
+        self.messages.append(record)
+        return record
+
+    def page(self, limit: int, before: Optional[int] = None) -> Tuple[List[MessageRecord], Optional[int]]:
+        """Up to ``limit`` messages ending just before index ``before`` (newest page by default)
+
+        Returns the page, oldest first, and the ``before`` value for the
+        previous page, or None once the start of the conversation is reached.
+        """
+        end = len(self.messages) if before is None else max(0, min(before, len(self.messages)))
+        start = max(0, end - limit)
+        return self.messages[start:end], (start if start > 0 else None)
+
+    def to_dict(self, limit: Optional[int] = None, before: Optional[int] = None) -> Dict[str, Any]:
+        if limit is None:
+            messages, next_before = self.messages, None
+        else:
+            messages, next_before = self.page(limit, before)
+        return {
+            "created_at": self.created_at,
+            "tenant_id": self.tenant_id,
+            "summary": self.summary,
+            "total_messages": len(self.messages),
+            "messages": [m.to_dict() for m in messages],
+            "next_before": next_before,
+        }
@@ -0,0 +1,136 @@
+"""Warm-up run by the API lifespan before the service reports ready.
+
+The first turn after a deploy otherwise pays for everything that is set
+up lazily: TLS connections to Groq and Google, pytz zone files, the
+strptime regex cache, pydantic validators and LangGraph's first run.
+``warm_up`` does that work once with a synthetic turn whose LLM and
+calendar are stubs (no tokens or quota spent) and reports how long each
+step took. A step that fails is logged and skipped; warm-up never keeps
+the service from starting.
+"""
+import asyncio
+import copy
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+import pytz
+
+from app.agent.prompts import intent_messages, response_messages
+from app.agent.tools import _date_range, turn_calendar
+from app.calendar_service import GoogleCalendarService
+from app.config import settings
+from app.metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MESSAGE = "Do you have any time this week?"
+
+
+class _WarmupLLM:
+    """Answers the synthetic turn: an availability check, then a fixed reply"""
+
+    model = "warmup"
+
+    def invoke(self, messages, response_format=None, model=None, **kwargs):
+        class Response:
+            failed = False
+
+            def __init__(self, content):
+                self.content = content
+
+        if response_format:
+            return Response(json.dumps({
+                "intent": "check_availability",
+                "details": {"date": None, "time": None, "duration": 60, "title": "Meeting", "needs_clarification": []}
+            }))
+        return Response("Here are a few open times. Which one works for you?")
+
+
+class _WarmupCalendar(GoogleCalendarService):
+    """An empty calendar: the synthetic turn runs the real slot search without spending quota"""
+
+    def __init__(self):
+        super().__init__(credentials_file="", token_file="", calendar_id="warmup", cache_ttl=0)
+
+    def _authenticate(self):
+        pass
+
+    def _query_free_busy(self, start_time, end_time, priority, generation=None):
+        return []
+
+    async def _aquery_free_busy(self, start_time, end_time, generation=None):
+        return []
+
+
+def _prime_caches():
+    """Timezones, strptime formats and prompt templates the first turn would load"""
+    for zone in settings.WARMUP_TIMEZONES:
+        pytz.timezone(zone).localize(datetime(2024, 1, 15))
+    pytz.utc.localize(datetime.strptime("2024-01-15 14:00", '%Y-%m-%d %H:%M'))
+    datetime.strptime("2024-01-15", '%Y-%m-%d')
+    datetime.strptime("02:00 PM", '%I:%M %p')
+    today = datetime.now().strftime('%Y-%m-%d (%A)')
+    intent_messages(WARMUP_MESSAGE, today=today)
+    response_messages(WARMUP_MESSAGE, context="{}")
+
+
+def _open_llm_connection(agent):
+    """A models listing opens the Groq client's pooled connection without spending tokens"""
+    agent.llm.client.models.list(timeout=settings.LLM_TIMEOUT or 10)
+
+
+def _synthetic_turn(agent):
+    """One availability turn through the real graph and tools, with a stub LLM and calendar
+
+    The turn runs on a shallow copy of the agent so live requests keep the
+    real LLM, hedging state and latency window; the copy compiles its own
+    graph. The class method is called directly so instance wrappers (e.g.
+    cassette recording) do not see the turn. The calendar connections are
+    warmed by the free/busy steps; the turn itself spends no quota.
+    """
+    warm = copy.copy(agent)
+    warm.llm = _WarmupLLM()
+    warm.hedge_executor = None
+    warm.intent_latency = LatencyWindow()
+    if agent.graph is not None:
+        warm.graph = warm._build_graph()
+    with turn_calendar(_WarmupCalendar()):
+        result = type(agent).process_message(warm, WARMUP_MESSAGE, "warmup")
+    return len(result.get("suggested_slots", []))
+
+
+async def _step(report: Dict[str, Any], name: str, fn, *args):
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        report[name] = {"ok": True}
+    except Exception as e:
+        logger.warning(f"Warm-up step {name} failed: {e}")
+        report[name] = {"ok": False, "error": str(e)}
+    report[name]["seconds"] = round(time.perf_counter() - started, 3)
+
+
+async def warm_up(agent, calendar=None) -> Dict[str, Any]:
+    """Run every warm-up step and return ``{"steps": {...}, "seconds": total}``
+
+    Today's free/busy is fetched on the async client (used by /availability)
+    and the chat window on the sync client (used by the agent), so both
+    connections are open and both ranges are cached when traffic arrives.
+    """
+    started = time.perf_counter()
+    steps: Dict[str, Any] = {}
+    await _step(steps, "caches", _prime_caches)
+    await _step(steps, "llm_connection", asyncio.to_thread, _open_llm_connection, agent)
+    if calendar is not None:
+        today = datetime.now().strftime('%Y-%m-%d')
+        window_end = (datetime.now() + timedelta(days=max(settings.CALENDAR_PREFETCH_DAYS, 7))).strftime('%Y-%m-%d')
+        await _step(steps, "free_busy_today", calendar.aget_free_busy, *_date_range(today, today))
+        await _step(steps, "free_busy_window", asyncio.to_thread,
+                    calendar.get_free_busy, *_date_range(today, window_end))
+    await _step(steps, "synthetic_turn", asyncio.to_thread, _synthetic_turn, agent)
+    return {"steps": steps, "seconds": round(time.perf_counter() - started, 3)}
@@ -0,0 +1,132 @@
+"""First-request latency after startup, with and without the lifespan warm-up.
+
+Each run starts a fresh interpreter, brings the API up through its
+lifespan (FastAPI TestClient), waits for /ready and then times the first
+few /chat requests. Groq and Google Calendar are the load_harness fakes;
+each fake charges --connect-latency once per process for the first call
+that reaches it, standing in for the TLS handshake of a cold connection.
+
+    python -m benchmarks.cold_start [--runs 5] [--requests 3]
+        [--llm-latency 0.4] [--calendar-latency 0.25] [--connect-latency 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _cold_once(latency):
+    """Sleep ``latency`` on the first call only, like opening a pooled connection"""
+    lock, opened = threading.Lock(), []
+
+    def connect():
+        with lock:
+            if not opened:
+                time.sleep(latency)
+                opened.append(True)
+
+    return connect
+
+
+def child(args):
+    os.environ.setdefault("GROQ_API_KEY", "cold-start")
+    import random
+
+    from benchmarks.load_harness import default_intents, fake_llm, install_fake_calendar
+
+    api = install_fake_calendar(args.calendar_latency)
+    connect_calendar = _cold_once(args.connect_latency)
+    query = api.query
+
+    def cold_query(body):
+        connect_calendar()
+        return query(body)
+
+    api.query = cold_query
+
+    import app.calendar_service as calendar_module
+
+    async def aget_free_busy(service, start_time, end_time):
+        return await asyncio.to_thread(service.get_free_busy, start_time, end_time)
+
+    calendar_module.GoogleCalendarService.aget_free_busy = aget_free_busy
+
+    from groq.resources.models import Models
+    from app.agent import booking_agent as agent_module
+
+    connect_llm = _cold_once(args.connect_latency)
+    invoke = fake_llm(args.llm_latency, default_intents())
+
+    def cold_invoke(self, messages, **kwargs):
+        connect_llm()
+        return invoke(self, messages, **kwargs)
+
+    agent_module.GroqLLMWrapper.invoke = cold_invoke
+    Models.list = lambda self, **kwargs: connect_llm()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    random.seed(args.seed)
+    started = time.perf_counter()
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.01)
+        ready = time.perf_counter() - started
+        timings = []
+        for i in range(args.requests):
+            request_started = time.perf_counter()
+            client.post("/chat", json={"message": "Do you have time tomorrow afternoon?",
+                                       "session_id": f"cold-{i}"})
+            timings.append(time.perf_counter() - request_started)
+        report = client.get("/ready").json()["warmup"]
+    print(json.dumps({"ready": ready, "requests": timings, "warmup": report}))
+
+
+def run(args, warmup):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, WARMUP_ENABLED="true" if warmup else "false",
+                   BOOKING_JOURNAL_PATH=os.path.join(tmp, "bookings.db"))
+        command = [sys.executable, "-m", "benchmarks.cold_start", "--child",
+                   "--requests", str(args.requests), "--seed", str(args.seed),
+                   "--llm-latency", str(args.llm_latency), "--calendar-latency", str(args.calendar_latency),
+                   "--connect-latency", str(args.connect_latency)]
+        output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="seconds per LLM call")
+    parser.add_argument("--calendar-latency", type=float, default=0.25, help="seconds per Calendar API call")
+    parser.add_argument("--connect-latency", type=float, default=0.2, help="one-time cost of a cold connection")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    for label, warmup in (("warm-up off", False), ("warm-up on", True)):
+        results = [run(args, warmup) for _ in range(args.runs)]
+        ready = statistics.median(r["ready"] for r in results)
+        per_request = [statistics.median(r["requests"][i] for r in results) for i in range(args.requests)]
+        requests = ", ".join(f"#{i + 1} {t * 1000:.0f}" for i, t in enumerate(per_request))
+        print(f"{label:>11}: ready after {ready * 1000:.0f} ms; /chat ms {requests}")
+        if warmup:
+            steps = results[-1]["warmup"]["steps"]
+            print(" " * 13 + "steps: " + ", ".join(f"{name} {step['seconds'] * 1000:.0f} ms"
+                                                     for name, step in steps.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Score intent classification accuracy and latency per model.
+
+Runs every labeled message in ``intent_corpus.jsonl`` through the intent
+prompt in JSON mode and compares the intent and date with the labels.
+Dates are labeled as an offset from today (null when no single date is
+implied), so the corpus does not go stale.
+
+    python -m benchmarks.intent_accuracy --models llama-3.1-8b-instant llama3-70b-8192
+    python -m benchmarks.intent_accuracy --offline   # keyword fallback only, no API calls
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.agent.intent import JSON_RESPONSE_FORMAT, IntentParseError, parse_intent
+from app.agent.prompts import intent_messages
+
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+
+
+def load_corpus():
+    with open(CORPUS) as corpus:
+        examples = [json.loads(line) for line in corpus if line.strip()]
+    today = datetime.now()
+    for example in examples:
+        offset = example["date_offset"]
+        example["date"] = None if offset is None else (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+    return examples
+
+
+def classify_offline(message):
+    # The agent's fallback when the LLM call fails: keyword date parsing, intent unknown
+    from app.agent.booking_agent import BookingAgent
+    details = BookingAgent._parse_basic_intent(None, message)
+    return "general_inquiry", details.get("date")
+
+
+def classify_live(llm, model, message):
+    messages = intent_messages(message, today=datetime.now().strftime('%Y-%m-%d (%A)'), history="")
+    response = llm.invoke(messages, response_format=JSON_RESPONSE_FORMAT, model=model)
+    if getattr(response, "failed", False):
+        return None, None
+    result = parse_intent(response.content)
+    return result.intent, result.details.date
+
+
+def score(label, examples, classify):
+    latencies, intent_hits, date_hits, failures = [], 0, 0, 0
+    for example in examples:
+        started = time.perf_counter()
+        try:
+            intent, date = classify(example["message"])
+        except IntentParseError:
+            intent, date = None, None
+        latencies.append(time.perf_counter() - started)
+        if intent is None:
+            failures += 1
+        intent_hits += intent == example["intent"]
+        date_hits += date == example["date"]
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:>24}: intent {intent_hits / len(examples):6.1%}  date {date_hits / len(examples):6.1%}  "
+          f"failed {failures:2d}  latency p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=["llama-3.1-8b-instant", "llama3-70b-8192"])
+    parser.add_argument("--offline", action="store_true", help="score the keyword fallback without calling Groq")
+    args = parser.parse_args()
+
+    examples = load_corpus()
+    print(f"examples: {len(examples)}")
+    if args.offline:
+        score("keyword fallback", examples, classify_offline)
+        return
+
+    from app.agent.booking_agent import GroqLLMWrapper
+    from app.config import settings
+    # No fallback model: a failed call should count against the model that failed
+    llm = GroqLLMWrapper(api_key=settings.GROQ_API_KEY, timeout=settings.LLM_TIMEOUT)
+    for model in args.models:
+        score(model, examples, lambda message: classify_live(llm, model, message))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Drive BookingAgent.process_message with simulated provider latency.
+
+The Groq client and the Google Calendar API are replaced by in-process
+fakes that sleep for a configurable latency, so the harness measures the
+agent's own scheduling of I/O (no network, no credentials). Each turn
+starts with a cold availability cache. The last run turns free/busy
+coalescing off to show how many identical concurrent queries it saves.
+
+    python -m benchmarks.load_harness [--turns 40] [--concurrency 4]
+        [--llm-latency 0.4] [--calendar-latency 0.25]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault("GROQ_API_KEY", "load-harness")
+
+import app.calendar_service as calendar_module
+from app.metrics import metrics
+
+INTENT_MARKER = "extract appointment booking intent"
+
+
+class _Call:
+    def __init__(self, run):
+        self._run = run
+
+    def execute(self):
+        return self._run()
+
+
+class FakeCalendarAPI:
+    """Answers freebusy/events calls after a fixed delay and counts them"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = {"freebusy": 0, "insert": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def freebusy(self):
+        return self
+
+    def events(self):
+        return self
+
+    def query(self, body):
+        def run():
+            self._count("freebusy")
+            time.sleep(self.latency)
+            start = datetime.fromisoformat(body["timeMin"]).replace(hour=10, minute=0)
+            busy = [{"start": (start + timedelta(days=d)).isoformat(),
+                     "end": (start + timedelta(days=d, hours=1)).isoformat()} for d in range(8)]
+            return {"calendars": {item["id"]: {"busy": busy} for item in body["items"]}}
+        return _Call(run)
+
+    def insert(self, calendarId, body):
+        def run():
+            self._count("insert")
+            time.sleep(self.latency)
+            return {"id": body.get("id", "evt")}
+        return _Call(run)
+
+
+def install_fake_calendar(latency):
+    api = FakeCalendarAPI(latency)
+
+    def authenticate(service):
+        service.service = api
+
+    calendar_module.GoogleCalendarService._authenticate = authenticate
+    return api
+
+
+def fake_llm(latency, intents):
+    class Response:
+        def __init__(self, content):
+            self.content = content
+
+    def invoke(self, messages, response_format=None, model=None, **kwargs):
+        time.sleep(latency)
+        if INTENT_MARKER in messages[0]["content"]:
+            return Response(json.dumps(random.choice(intents)))
+        return Response("Here are a few times that work. Which one would you like?")
+
+    return invoke
+
+
+def default_intents():
+    today = datetime.now()
+    details = {"time": None, "duration": 60, "title": "Meeting", "needs_clarification": []}
+    return [
+        {"intent": "check_availability", "details": dict(details, date=None)},
+        {"intent": "book_appointment", "details": dict(details, date=(today + timedelta(days=1)).strftime('%Y-%m-%d'))},
+        {"intent": "book_appointment", "details": dict(details, date=(today + timedelta(days=3)).strftime('%Y-%m-%d'))},
+        {"intent": "book_appointment", "details": dict(details, date=(today + timedelta(days=30)).strftime('%Y-%m-%d'))},
+        {"intent": "general_inquiry", "details": dict(details, date=None)},
+    ]
+
+
+def build_agent(args):
+    api = install_fake_calendar(args.calendar_latency)
+
+    from app.agent import booking_agent as agent_module
+    from app.agent.tools import calendar_service
+
+    agent_module.GroqLLMWrapper.invoke = fake_llm(args.llm_latency, default_intents())
+    if not args.rate_limit:
+        # Measure the agent, not the quota guard (one fake calendar would be throttled)
+        calendar_service.rate_limiter = None
+    return agent_module.BookingAgent(), calendar_service, api
+
+
+def run_turns(agent, calendar_service, args):
+    def turn(i):
+        calendar_service.invalidate_cache()
+        started = time.perf_counter()
+        agent.process_message(f"I'd like to book something (turn {i})", f"load-{i % args.concurrency}")
+        return time.perf_counter() - started
+
+    random.seed(args.seed)
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        return list(pool.map(turn, range(args.turns)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="seconds per LLM call")
+    parser.add_argument("--calendar-latency", type=float, default=0.25, help="seconds per Calendar API call")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rate-limit", action="store_true", help="keep the Calendar API rate limiter on")
+    args = parser.parse_args()
+
+    agent, calendar_service, api = build_agent(args)
+    executor = agent.prefetch_executor
+
+    results, calls = {}, {}
+    runs = (("prefetch off", None, True), ("prefetch on", executor, True),
+            ("prefetch on, no coalescing", executor, False))
+    for label, prefetch, coalesce in runs:
+        agent.prefetch_executor = prefetch
+        calendar_service.coalesce = coalesce
+        api.calls["freebusy"] = 0
+        coalesced = metrics.get("calendar.freebusy.coalesced")
+        timings = run_turns(agent, calendar_service, args)
+        results[label], calls[label] = statistics.mean(timings), api.calls["freebusy"]
+        print(f"{label:>26}: mean {results[label] * 1000:.0f} ms/turn, "
+              f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.0f} ms, "
+              f"freebusy calls {api.calls['freebusy']}, "
+              f"coalesced {metrics.get('calendar.freebusy.coalesced') - coalesced:.0f}")
+
+    print(f"prefetch stats: { {name: metrics.get(f'prefetch.{name}') for name in ('started', 'reused', 'discarded')} }")
+    print(f"counters: {metrics.snapshot()}")
+    saving = results["prefetch off"] - results["prefetch on"]
+    print(f"wall-clock saving: {saving * 1000:.0f} ms/turn")
+    print(f"coalescing: {calls['prefetch on, no coalescing'] - calls['prefetch on']} fewer freebusy calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Compare prompt size (and optionally latency) of the legacy and compact prompts.
+
+Replays the scripted conversations in ``conversations.jsonl`` and builds the
+intent and reply prompts each turn would send. "Before" is the original
+f-string prompts with the full history appended; "after" is the compact
+templates with the sliding window and rolling summary.
+
+    python -m benchmarks.prompt_tokens            # token estimates only
+    python -m benchmarks.prompt_tokens --live     # also time real Groq calls
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from app.agent.history import HistoryWindow, estimate_tokens
+from app.agent.prompts import intent_messages, response_messages, render_history
+
+CORPUS = os.path.join(os.path.dirname(__file__), "conversations.jsonl")
+
+SAMPLE_CONTEXT = {
+    "intent": "check_availability",
+    "details": {"date": "2024-01-16", "time": "14:00", "duration": 60, "title": "Meeting", "needs_clarification": []},
+    "available_slots": [
+        {"time": "2024-01-16 02:00 PM - 03:00 PM", "start": "2024-01-16T14:00:00+00:00", "end": "2024-01-16T15:00:00+00:00"},
+        {"time": "2024-01-16 02:30 PM - 03:30 PM", "start": "2024-01-16T14:30:00+00:00", "end": "2024-01-16T15:30:00+00:00"},
+        {"time": "2024-01-16 03:00 PM - 04:00 PM", "start": "2024-01-16T15:00:00+00:00", "end": "2024-01-16T16:00:00+00:00"},
+    ],
+    "confirmation_pending": True,
+    "booking_confirmed": False,
+}
+SAMPLE_REPLY = "I found a few open times tomorrow afternoon: 2:00 PM, 2:30 PM and 3:00 PM. Which one works best for you?"
+
+
+def legacy_intent_prompt(user_message, history):
+    return f"""
+        You are a professional appointment booking assistant. Analyze the user's message and extract booking information.
+        {history}
+        User message: "{user_message}"
+        
+        Extract the following information and respond ONLY with a valid JSON object:
+        - intent: one of [book_appointment, check_availability, confirm_booking, general_inquiry]
+        - details: object containing:
+          - date: date in YYYY-MM-DD format if mentioned (null if not specified)
+          - time: time in HH:MM format if mentioned (null if not specified)
+          - duration: duration in minutes (default 60 if not specified)
+          - title: purpose/title of meeting (default "Meeting" if not specified)
+          - needs_clarification: array of missing information needed
+
+        Examples:
+        - "Book a meeting tomorrow at 2 PM" → {{"intent": "book_appointment", "details": {{"date": "2024-XX-XX", "time": "14:00", "duration": 60, "title": "Meeting", "needs_clarification": []}}}}
+        - "Do you have time Friday?" → {{"intent": "check_availability", "details": {{"date": null, "time": null, "duration": 60, "title": "Meeting", "needs_clarification": ["specific_date", "preferred_time"]}}}}
+
+        JSON Response:
+        """
+
+
+def legacy_response_prompt(user_message, history):
+    return f"""
+            You are a friendly, professional appointment booking assistant. Generate a natural response based on this context.
+            {history}
+            Context: {json.dumps(SAMPLE_CONTEXT, default=str, indent=2)}
+            User input: "{user_message}"
+
+            Guidelines:
+            - Be conversational and helpful
+            - If showing available slots, present them clearly with times
+            - If booking is confirmed, be enthusiastic and provide details
+            - If information is missing, ask specific questions
+            - Keep responses concise but complete
+            - Use a friendly, professional tone
+
+            Response:
+            """
+
+
+def messages_tokens(messages):
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def run(live=False):
+    window = HistoryWindow()
+    llm = None
+    if live:
+        from app.agent.booking_agent import GroqLLMWrapper
+        from app.config import settings
+        llm = GroqLLMWrapper(api_key=settings.GROQ_API_KEY)
+
+    before_tokens, after_tokens = [], []
+    before_latency, after_latency = [], []
+    with open(CORPUS) as corpus:
+        conversations = [json.loads(line) for line in corpus if line.strip()]
+
+    for conversation in conversations:
+        history, summary = [], None
+        for turn in conversation["turns"]:
+            full_history = "\n".join(f"{m['role']}: {m['content']}" for m in history)
+            before = [
+                [{"role": "system", "content": legacy_intent_prompt(turn, full_history)}],
+                [{"role": "system", "content": legacy_response_prompt(turn, full_history)}],
+            ]
+            recent, summary = window.build(history, summary)
+            rendered = render_history(recent, summary["text"])
+            compact = dict(SAMPLE_CONTEXT, available_slots=[slot["time"] for slot in SAMPLE_CONTEXT["available_slots"]])
+            context = json.dumps(compact, separators=(',', ':'))
+            after = [intent_messages(turn, "2024-01-15 (Monday)", rendered),
+                     response_messages(turn, context, rendered)]
+
+            before_tokens.append(sum(messages_tokens(m) for m in before))
+            after_tokens.append(sum(messages_tokens(m) for m in after))
+
+            if llm:
+                for prompts, latencies in ((before, before_latency), (after, after_latency)):
+                    started = time.perf_counter()
+                    for messages in prompts:
+                        llm.invoke(messages)
+                    latencies.append(time.perf_counter() - started)
+
+            history += [{"role": "user", "content": turn}, {"role": "assistant", "content": SAMPLE_REPLY}]
+
+    print(f"turns: {len(before_tokens)}")
+    print(f"prompt tokens/turn  before: mean {statistics.mean(before_tokens):.0f}, max {max(before_tokens)}")
+    print(f"prompt tokens/turn  after:  mean {statistics.mean(after_tokens):.0f}, max {max(after_tokens)}")
+    if llm:
+        print(f"latency/turn        before: median {statistics.median(before_latency) * 1000:.0f} ms")
+        print(f"latency/turn        after:  median {statistics.median(after_latency) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="also measure latency against the Groq API")
+    run(parser.parse_args().live)
@@ -0,0 +1,124 @@
+"""Replay recorded conversations through BookingAgent with no network.
+
+Cassettes are recorded by running the API with CASSETTE_RECORD_PATH set.
+Every LLM and calendar call is answered from the cassette, and the clock
+is frozen at each turn's recording time. What is left is the agent's own
+work, which is reported as CPU time per turn. Replies that differ from the
+recording, prompts that changed, and calls the cassette cannot answer are
+listed, so prompt or logic changes show up as behavior diffs.
+
+    python -m benchmarks.replay cassette.jsonl [--repeat 3] [--diffs 5]
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "replay")
+os.environ.setdefault("INTENT_HEDGE", "false")
+
+import app.calendar_service as calendar_module
+from app.cassette import CassettePlayer, load
+
+
+def install_offline_calendar():
+    # No credentials and no discovery document: every call is answered by the player
+    def authenticate(service):
+        service.service = None
+
+    calendar_module.GoogleCalendarService._authenticate = authenticate
+
+
+def offline_pool(pool, turns):
+    """Serve each recorded tenant from an offline client with the calendar ID it was recorded with"""
+    calendar_ids = {}
+    for turn in turns:
+        for call in turn["calls"]:
+            if call["kind"] == "calendar":
+                calendar_ids.setdefault(turn["input"].get("tenant_id"), call["calendar_id"])
+    clients = {}
+
+    def get(tenant_id=None):
+        if not tenant_id:
+            return pool.default
+        if tenant_id not in clients:
+            clients[tenant_id] = calendar_module.GoogleCalendarService(
+                credentials_file="", token_file="", calendar_id=calendar_ids.get(tenant_id, "primary")
+            )
+        return clients[tenant_id]
+
+    pool.get = get
+    return clients
+
+
+def output_diff(recorded, replayed):
+    lines = []
+    for key in ("response", "booking_confirmed", "suggested_slots"):
+        before = json.dumps(recorded.get(key), indent=1, sort_keys=True, default=str).splitlines()
+        after = json.dumps(replayed.get(key), indent=1, sort_keys=True, default=str).splitlines()
+        if before != after:
+            lines += [f"  {key}:"] + [f"    {line}" for line in difflib.unified_diff(before, after, "recorded", "replayed", lineterm="", n=1)]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassette")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the cassette this many times for timing")
+    parser.add_argument("--diffs", type=int, default=5, help="print at most this many differing turns")
+    args = parser.parse_args()
+
+    install_offline_calendar()
+    from app.agent import booking_agent as agent_module
+    from app.agent import tools as tools_module
+
+    turns = load(args.cassette)
+    player = CassettePlayer(turns, clock_modules=[agent_module, tools_module])
+    player.install(agent_module.GroqLLMWrapper)
+    tenant_clients = offline_pool(tools_module.calendar_pool, turns)
+    agent = agent_module.BookingAgent()
+
+    cpu, wall = [], []
+    changed, drifted, unrecorded = [], 0, 0
+    for repeat in range(args.repeat):
+        for index, turn in enumerate(turns):
+            for client in [tools_module.calendar_service, *tenant_clients.values()]:
+                client.invalidate_cache()
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            result, report = player.play(agent, turn)
+            cpu.append(time.process_time() - cpu_started)
+            wall.append(time.perf_counter() - wall_started)
+            if repeat:
+                continue
+            drifted += bool(report["drift"])
+            unrecorded += len(report["unrecorded"])
+            diff = output_diff(turn["output"], result)
+            if diff or report["drift"] or report["unrecorded"]:
+                changed.append((index, turn, diff, report))
+
+    cpu.sort()
+    print(f"turns: {len(turns)} x {args.repeat}")
+    print(f"cpu/turn: mean {statistics.mean(cpu) * 1000:.2f} ms, p50 {statistics.median(cpu) * 1000:.2f} ms, "
+          f"p95 {cpu[min(len(cpu) - 1, int(len(cpu) * 0.95))] * 1000:.2f} ms")
+    print(f"wall/turn: mean {statistics.mean(wall) * 1000:.2f} ms ({len(wall) / sum(wall):.0f} turns/s single-threaded)")
+    print(f"turns with changed output: {sum(bool(c[2]) for c in changed)}, with prompt drift: {drifted}, "
+          f"unrecorded calls: {unrecorded}")
+
+    for index, turn, diff, report in changed[:args.diffs]:
+        print(f"\nturn {index} ({turn['conversation']}): {turn['input']['message']!r}")
+        for line in diff:
+            print(line)
+        for drift in report["drift"]:
+            before = "\n".join(m["content"] for m in drift["recorded"]).splitlines()
+            after = "\n".join(m["content"] for m in drift["replayed"]).splitlines()
+            print("  prompt:")
+            for line in difflib.unified_diff(before, after, "recorded", "replayed", lineterm="", n=0):
+                print(f"    {line}")
+        for call in report["unrecorded"]:
+            print(f"  unrecorded {call}")
+
+
+if __name__ == "__main__":
+    main()
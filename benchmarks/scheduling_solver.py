@@ -0,0 +1,83 @@
+"""Time the multi-meeting scheduling solver on synthetic calendars.
+
+Each run places 10 meetings among 8 attendees over two weeks (weekends
+blocked): a 5-stage interview loop that must run in order, plus 5 group
+sessions of 3-6 people. Attendee calendars are filled with random 30-120
+minute events until ``--busy`` of working time is taken. No calendar API
+is involved; the solver gets the busy periods directly.
+
+    python -m benchmarks.scheduling_solver [--runs 20] [--busy 0.3 0.45 0.6]
+"""
+import argparse
+import random
+import statistics
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytz
+
+from app.scheduling_solver import Meeting, SchedulingSolver
+
+ATTENDEES = [f"person{i}@example.com" for i in range(8)]
+TZ = pytz.timezone("Europe/London")
+WINDOW_START = TZ.localize(datetime(2024, 1, 15))
+DAYS = 14
+
+
+def make_busy(rng, density):
+    busy = {}
+    for attendee in ATTENDEES:
+        periods = []
+        for day in range(DAYS):
+            day_start = WINDOW_START + timedelta(days=day, hours=9)
+            if day_start.weekday() >= 5:
+                periods.append((day_start.timestamp(), (day_start + timedelta(hours=8)).timestamp()))
+                continue
+            taken = 0
+            while taken < density * 480:
+                start = day_start + timedelta(minutes=rng.randrange(0, 480, 30))
+                length = rng.choice([30, 60, 60, 90, 120])
+                periods.append((start.timestamp(), (start + timedelta(minutes=length)).timestamp()))
+                taken += length
+        busy[attendee] = periods
+    return busy
+
+
+def make_meetings(rng):
+    candidate, interviewers = ATTENDEES[0], ATTENDEES[1:]
+    meetings, previous = [], []
+    for stage in range(5):
+        panel = [candidate] + rng.sample(interviewers, rng.choice([1, 2]))
+        meetings.append(Meeting(f"interview-{stage}", rng.choice([30, 45, 60]), panel, previous))
+        previous = [f"interview-{stage}"]
+    for group in range(5):
+        meetings.append(Meeting(f"group-{group}", rng.choice([60, 90]), rng.sample(ATTENDEES, rng.randint(3, 6))))
+    return meetings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--busy", type=float, nargs="+", default=[0.3, 0.45, 0.6])
+    parser.add_argument("--time-limit", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for density in args.busy:
+        times, nodes, placed, statuses = [], [], [], Counter()
+        for seed in range(args.runs):
+            rng = random.Random(seed)
+            solver = SchedulingSolver(make_meetings(rng), make_busy(rng, density), WINDOW_START,
+                                      WINDOW_START + timedelta(days=DAYS), time_limit=args.time_limit)
+            result = solver.solve()
+            times.append(result["elapsed_ms"])
+            nodes.append(result["nodes"])
+            placed.append(len(result["scheduled"]))
+            statuses[result["status"]] += 1
+        times.sort()
+        print(f"busy {density:.0%}: solve median {statistics.median(times):7.1f} ms, "
+              f"max {times[-1]:7.1f} ms, nodes median {statistics.median(nodes):.0f}, "
+              f"placed mean {statistics.mean(placed):.1f}/10, {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
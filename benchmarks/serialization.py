@@ -0,0 +1,77 @@
+"""Time response serialization for a long session and a /chat reply.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps, and a
+validated ChatResponse) with the fast path the API now uses (orjson
+straight from the data, ChatResponse.model_construct), and reports the
+gzip size of the session body. No server or network is involved.
+
+    python -m benchmarks.serialization [--messages 1000] [--repeats 50]
+"""
+import argparse
+import gzip
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.models import ChatResponse
+from app.session_store import Session
+
+SLOTS = [
+    {"start": "2024-01-16T14:00:00+00:00", "end": "2024-01-16T15:00:00+00:00", "time": "02:00 PM - 03:00 PM"},
+    {"start": "2024-01-16T14:30:00+00:00", "end": "2024-01-16T15:30:00+00:00", "time": "02:30 PM - 03:30 PM"},
+    {"start": "2024-01-16T15:00:00+00:00", "end": "2024-01-16T16:00:00+00:00", "time": "03:00 PM - 04:00 PM"},
+]
+
+
+def make_session(count):
+    session = Session("2024-01-15T12:00:00")
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        content = (f"Can we meet tomorrow afternoon? (message {i})" if role == "user"
+                   else "I found a few open times tomorrow afternoon. Which one works best for you?")
+        session.add(role, content, f"2024-01-15T12:{i % 60:02d}:00")
+    return session
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    session = make_session(args.messages)
+    chat = {"response": "I found these times tomorrow. Which one works best for you?",
+            "session_id": "12345-67890", "booking_confirmed": False, "suggested_slots": SLOTS}
+
+    rows = [
+        ("session, default (jsonable_encoder + json)",
+         lambda: JSONResponse(jsonable_encoder(session.to_dict())).body),
+        ("session, orjson direct",
+         lambda: ORJSONResponse(session.to_dict()).body),
+        ("chat reply, validated model + default",
+         lambda: JSONResponse(jsonable_encoder(ChatResponse(**chat))).body),
+        ("chat reply, model_construct + orjson",
+         lambda: ORJSONResponse(ChatResponse.model_construct(**chat).model_dump()).body),
+    ]
+    for label, fn in rows:
+        unit = "ms" if "session" in label else "us"
+        value = timed(fn, args.repeats if "session" in label else args.repeats * 100)
+        print(f"{label:>44}: {value if unit == 'ms' else value * 1000:8.3f} {unit}")
+
+    body = ORJSONResponse(session.to_dict()).body
+    print(f"{'session body':>44}: {len(body) / 1024:8.1f} KiB, gzip {len(gzip.compress(body)) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
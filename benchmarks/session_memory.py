@@ -0,0 +1,74 @@
+"""Memory held by session message history, dicts vs MessageRecord.
+
+Builds N sessions of M messages each way and measures the traced
+allocation with tracemalloc. Message text is generated per message in
+both cases, so the difference is the per-message container overhead.
+
+    python -m benchmarks.session_memory [--sessions 100] [--messages 1000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from app.session_store import Session
+
+
+def _content(i):
+    return (f"Can we meet tomorrow afternoon? (message {i})" if i % 2 == 0
+            else f"I found a few open times tomorrow afternoon. Which one works? ({i})")
+
+
+def dict_sessions(sessions, messages):
+    store = {}
+    for s in range(sessions):
+        history = []
+        for i in range(messages):
+            history.append({
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": _content(i),
+                "timestamp": f"2024-01-15T12:{i % 60:02d}:{s % 60:02d}"
+            })
+        store[f"session-{s}"] = {"created_at": None, "tenant_id": None, "messages": history}
+    return store
+
+
+def record_sessions(sessions, messages):
+    store = {}
+    for s in range(sessions):
+        session = Session()
+        for i in range(messages):
+            session.add("user" if i % 2 == 0 else "assistant", _content(i),
+                        f"2024-01-15T12:{i % 60:02d}:{s % 60:02d}")
+        store[f"session-{s}"] = session
+    return store
+
+
+def measure(build, sessions, messages):
+    gc.collect()
+    tracemalloc.start()
+    store = build(sessions, messages)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+
+    total = args.sessions * args.messages
+    results = {}
+    for label, build in (("dict messages", dict_sessions), ("MessageRecord", record_sessions)):
+        results[label] = measure(build, args.sessions, args.messages)
+        print(f"{label:>14}: {results[label] / 2 ** 20:7.1f} MiB total, "
+              f"{results[label] / total * 1000 / 1024:6.1f} KiB per 1,000 messages")
+
+    saved = 1 - results["MessageRecord"] / results["dict messages"]
+    print(f"{'saving':>14}: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
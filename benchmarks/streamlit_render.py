@@ -0,0 +1,61 @@
+"""Time a full rerun of the Streamlit chat page with a long conversation.
+
+Loads N synthetic messages into session state (only the last assistant
+message carries suggested slots unless --slots-everywhere is given; the
+original page raised DuplicateWidgetID with slots on several messages) and times ``AppTest.run()``, which executes the
+script the way a rerun does. No backend is needed.
+
+    python -m benchmarks.streamlit_render [--messages 500] [--script frontend/streamlit_app.py]
+"""
+import argparse
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+SLOTS = [
+    {"start": "2024-01-16T14:00:00+00:00", "end": "2024-01-16T15:00:00+00:00", "time": "02:00 PM - 03:00 PM"},
+    {"start": "2024-01-16T14:30:00+00:00", "end": "2024-01-16T15:30:00+00:00", "time": "02:30 PM - 03:30 PM"},
+    {"start": "2024-01-16T15:00:00+00:00", "end": "2024-01-16T16:00:00+00:00", "time": "03:00 PM - 04:00 PM"},
+]
+
+
+def make_messages(count, slots_everywhere=False):
+    messages = []
+    last_assistant = count - 1 if count % 2 == 0 else count - 2
+    for i in range(count):
+        if i % 2 == 0:
+            messages.append({"role": "user", "content": f"Can we meet tomorrow afternoon? (message {i})"})
+        else:
+            message = {
+                "role": "assistant",
+                "content": "I found a few open times tomorrow afternoon. Which one works best for you?",
+            }
+            if slots_everywhere or i == last_assistant:
+                message["suggested_slots"] = list(SLOTS)
+            messages.append(message)
+    return messages
+
+
+def run(script, count, repeats, slots_everywhere=False):
+    timings, elements = [], 0
+    for _ in range(repeats):
+        app = AppTest.from_file(script, default_timeout=120)
+        app.session_state["messages"] = make_messages(count, slots_everywhere)
+        started = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - started)
+        elements = len(app.markdown) + len(app.button)
+    print(f"{script}: {count} messages, median rerun {statistics.median(timings) * 1000:.0f} ms, "
+          f"{elements} markdown/button elements")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--script", default="frontend/streamlit_app.py")
+    parser.add_argument("--slots-everywhere", action="store_true",
+                        help="attach suggested slots to every assistant message")
+    args = parser.parse_args()
+    run(args.script, args.messages, args.repeats, args.slots_everywhere)
@@ -1,6 +1,9 @@
 import streamlit as st
 import requests
+import requests.adapters
+import html
 import json
+import time
 from datetime import datetime
 import uuid
 import os
@@ -57,6 +60,53 @@ st.markdown("""
 
 # Configuration
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:8000')
+RECENT_MESSAGES = 20  # Messages rendered individually at the bottom of the chat
+HISTORY_PAGE_SIZE = 50  # Older messages per page when history is expanded
+# Which business's calendar to use: ?tenant=<id> in the page URL, else TENANT_ID
+TENANT_ID = st.query_params.get("tenant") or os.getenv('TENANT_ID') or None
+
+@st.cache_resource
+def get_http_session():
+    """One keep-alive HTTP session per server process, reused across reruns"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+http = get_http_session()
+
+def render_message_html(message):
+    """Build (once) and cache the HTML for a chat message"""
+    if "html" not in message:
+        is_user = message["role"] == "user"
+        css_class = "user-message" if is_user else "assistant-message"
+        speaker = "You" if is_user else "TailorTalk"
+        content = html.escape(str(message["content"])).replace("\n", "<br>")
+        message["html"] = f'<div class="chat-message {css_class}"><strong>{speaker}:</strong> {content}</div>'
+    return message["html"]
+
+def render_slots_html(slots):
+    items = "".join(f"<li>{html.escape(str(slot['start']))} - {html.escape(str(slot['end']))}</li>" for slot in slots)
+    return f'<div class="suggested-slots"><strong>Suggested Time Slots:</strong><ul>{items}</ul></div>'
+
+def wait_for_booking(job, timeout=30.0):
+    """Poll a queued booking until it is confirmed, fails or the timeout passes"""
+    booking_id = job.get("booking_id")
+    if not booking_id:
+        return job
+    
+    deadline = time.monotonic() + timeout
+    delay = 0.25
+    while time.monotonic() < deadline:
+        response = http.get(f"{BACKEND_URL}/bookings/{booking_id}")
+        if response.status_code == 200:
+            job = response.json()
+            if job.get("status") in ("confirmed", "failed"):
+                return job
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+    return {}
 
 # Initialize session state
 if 'conversation_id' not in st.session_state:
@@ -90,56 +140,76 @@ with st.sidebar:
 # Main chat interface
 st.header("Chat with TailorTalk")
 
-# Display chat messages
-for message in st.session_state.messages:
-    if message["role"] == "user":
-        st.markdown(f"""
-        <div class="chat-message user-message">
-            <strong>You:</strong> {message["content"]}
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
-        <div class="chat-message assistant-message">
-            <strong>TailorTalk:</strong> {message["content"]}
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display suggested slots if available
-        if "suggested_slots" in message:
-            st.markdown("""
-            <div class="suggested-slots">
-                <strong>Suggested Time Slots:</strong>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            for i, slot in enumerate(message["suggested_slots"]):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"• {slot['start']} - {slot['end']}")
-                with col2:
-                    if st.button(f"Book", key=f"book_{i}_{len(st.session_state.messages)}"):
-                        # Send booking confirmation
-                        booking_data = {
-                            "conversation_id": st.session_state.conversation_id,
-                            "selected_slot": slot,
-                            "action": "confirm_booking"
-                        }
-                        
-                        try:
-                            response = requests.post(f"{BACKEND_URL}/confirm-booking", json=booking_data)
-                            if response.status_code == 200:
-                                result = response.json()
-                                st.session_state.booking_status = "confirmed"
-                                st.session_state.messages.append({
-                                    "role": "assistant",
-                                    "content": result.get("message", "Booking confirmed successfully!")
-                                })
-                                st.rerun()
-                            else:
-                                st.error("Failed to confirm booking. Please try again.")
-                        except Exception as e:
-                            st.error(f"Error: {str(e)}")
+messages = st.session_state.messages
+older, recent = messages[:-RECENT_MESSAGES], messages[-RECENT_MESSAGES:]
+
+# Older messages stay collapsed; when shown, one page is sent as a single block
+if older:
+    with st.expander(f"Earlier messages ({len(older)})"):
+        if st.checkbox("Show earlier messages", key="show_history"):
+            pages = (len(older) + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+            page = st.number_input("Page (1 = most recent)", min_value=1, max_value=pages, value=1, step=1)
+            end = len(older) - (page - 1) * HISTORY_PAGE_SIZE
+            st.markdown(
+                "".join(render_message_html(m) for m in older[max(end - HISTORY_PAGE_SIZE, 0):end]),
+                unsafe_allow_html=True
+            )
+
+# Only the latest assistant message with suggestions gets Book buttons
+latest_slots_index = next(
+    (i for i in range(len(recent) - 1, -1, -1)
+     if recent[i]["role"] == "assistant" and recent[i].get("suggested_slots")),
+    None
+)
+
+for index, message in enumerate(recent):
+    st.markdown(render_message_html(message), unsafe_allow_html=True)
+    
+    slots = message.get("suggested_slots") if message["role"] == "assistant" else None
+    if not slots:
+        continue
+    
+    if index != latest_slots_index:
+        st.markdown(render_slots_html(slots), unsafe_allow_html=True)
+        continue
+    
+    # Display suggested slots with booking buttons
+    st.markdown("""
+    <div class="suggested-slots">
+        <strong>Suggested Time Slots:</strong>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    for i, slot in enumerate(slots):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.write(f"• {slot['start']} - {slot['end']}")
+        with col2:
+            if st.button(f"Book", key=f"book_{i}_{len(messages)}"):
+                # Send booking confirmation
+                booking_data = {
+                    "conversation_id": st.session_state.conversation_id,
+                    "selected_slot": slot,
+                    "tenant_id": TENANT_ID,
+                    "action": "confirm_booking"
+                }
+                
+                try:
+                    response = http.post(f"{BACKEND_URL}/confirm-booking", json=booking_data)
+                    if response.status_code in (200, 202):
+                        with st.spinner("Confirming your booking..."):
+                            result = wait_for_booking(response.json())
+                        if result.get("booking_confirmed"):
+                            st.session_state.booking_status = "confirmed"
+                        st.session_state.messages.append({
+                            "role": "assistant",
+                            "content": result.get("message") or "Your booking is still being processed. Please check back shortly."
+                        })
+                        st.rerun()
+                    else:
+                        st.error("Failed to confirm booking. Please try again.")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
 
 # Display booking confirmation
 if st.session_state.booking_status == "confirmed":
@@ -160,14 +230,16 @@ if user_input:
     # Prepare request data
     request_data = {
         "message": user_input,
+        "session_id": st.session_state.conversation_id,
         "conversation_id": st.session_state.conversation_id,
+        "tenant_id": TENANT_ID,
         "timestamp": datetime.now().isoformat()
     }
     
     # Send to backend
     try:
         with st.spinner("TailorTalk is thinking..."):
-            response = requests.post(f"{BACKEND_URL}/chat", json=request_data)
+            response = http.post(f"{BACKEND_URL}/chat", json=request_data)
         
         if response.status_code == 200:
             result = response.json()
@@ -0,0 +1,102 @@
+import os
+import threading
+from datetime import datetime
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from app.calendar_service import GoogleCalendarService
+from app.rate_limiter import AVAILABILITY
+
+
+class _Call:
+    def __init__(self, run):
+        self._run = run
+
+    def execute(self):
+        return self._run()
+
+
+class FakeCalendarAPI:
+    """In-memory stand-in for the googleapiclient Calendar resource.
+
+    ``busy`` holds the periods every free/busy query answers with; while
+    ``gate`` is set, queries block until it is released.
+    """
+
+    def __init__(self):
+        self.busy = []
+        self.events_by_id = {}
+        self.calls = {"freebusy": 0, "insert": 0, "get": 0}
+        self.gate = None
+        self.started = threading.Event()
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def freebusy(self):
+        return self
+
+    def events(self):
+        return self
+
+    def query(self, body):
+        def run():
+            self._count("freebusy")
+            self.started.set()
+            if self.gate is not None:
+                self.gate.wait(5)
+            start, end = datetime.fromisoformat(body["timeMin"]), datetime.fromisoformat(body["timeMax"])
+            busy = [b for b in self.busy
+                    if datetime.fromisoformat(b["start"]) < end and datetime.fromisoformat(b["end"]) > start]
+            return {"calendars": {item["id"]: {"busy": busy} for item in body["items"]}}
+        return _Call(run)
+
+    def insert(self, calendarId, body):
+        def run():
+            self._count("insert")
+            event = dict(body, id=body.get("id", f"evt{len(self.events_by_id)}"))
+            self.events_by_id[event["id"]] = event
+            return event
+        return _Call(run)
+
+    def get(self, calendarId, eventId):
+        def run():
+            self._count("get")
+            if eventId not in self.events_by_id:
+                raise HttpError(httplib2.Response({"status": 404}), b"Not Found")
+            return self.events_by_id[eventId]
+        return _Call(run)
+
+
+def _authenticate(service):
+    service.service = FakeCalendarAPI()
+
+
+async def _aquery_free_busy(service, start_time, end_time, generation=None):
+    return service._query_free_busy(start_time, end_time, AVAILABILITY, generation)
+
+
+# Tests never reach Google: every client (including the ones app.agent.tools
+# builds at import) answers from a FakeCalendarAPI
+GoogleCalendarService._authenticate = _authenticate
+GoogleCalendarService._aquery_free_busy = _aquery_free_busy
+
+
+@pytest.fixture
+def calendar():
+    """A fresh calendar client with no cache, rate limiter or busy time"""
+    return GoogleCalendarService("", "", calendar_id="primary", cache_ttl=300)
+
+
+@pytest.fixture
+def default_calendar(calendar, monkeypatch):
+    """``calendar`` installed as the tools' default (no-tenant) calendar"""
+    from app.agent import tools
+    monkeypatch.setattr(tools.calendar_pool, "default", calendar)
+    return calendar
@@ -0,0 +1,70 @@
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+DAY = {"start_date": "2030-01-15", "end_date": "2030-01-15", "duration_minutes": 60}
+
+
+@pytest.fixture
+def client(default_calendar):
+    return TestClient(app)
+
+
+def _pages(client, **params):
+    pages, cursor = [], None
+    while True:
+        body = client.get("/availability", params=dict(DAY, cursor=cursor, **params)).json()
+        pages.append([slot["start"] for slot in body["slots"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_the_range_once(client):
+    pages = _pages(client, limit=5)
+    starts = [start for page in pages for start in page]
+    assert [len(page) for page in pages] == [5, 5, 5]
+    assert len(set(starts)) == 15
+    assert starts[0] == "2030-01-15T09:00:00+00:00"
+    assert starts[-1] == "2030-01-15T16:00:00+00:00"
+
+
+def test_paging_skips_busy_time_in_the_requested_timezone(client, default_calendar):
+    default_calendar.service.busy = [{"start": "2030-01-15T04:30:00+00:00", "end": "2030-01-15T06:30:00+00:00"}]
+    starts = [s for page in _pages(client, limit=4, timezone="Asia/Kolkata") for s in page]
+    assert starts[0] == "2030-01-15T09:00:00+05:30"
+    assert "2030-01-15T10:00:00+05:30" not in starts
+    assert "2030-01-15T12:00:00+05:30" in starts
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/availability", params=dict(DAY, cursor="not-a-cursor"))
+    assert response.status_code == 400
+
+
+def test_naive_cursor_is_rejected(client):
+    naive = base64.urlsafe_b64encode(b"2030-01-15T10:00:00").decode().rstrip("=")
+    response = client.get("/availability", params=dict(DAY, cursor=naive))
+    assert response.status_code == 400
+
+
+def test_cursor_before_the_range_starts_at_the_range(client):
+    first = client.get("/availability", params=dict(DAY, start_date="2030-01-14", end_date="2030-01-14", limit=1))
+    stale = client.get("/availability", params=dict(DAY, limit=2, cursor=first.json()["next_cursor"])).json()
+    assert [slot["start"] for slot in stale["slots"]] == ["2030-01-15T09:00:00+00:00", "2030-01-15T09:30:00+00:00"]
+
+
+def test_cursor_at_the_end_of_the_range_gives_an_empty_last_page(client, default_calendar):
+    last = base64.urlsafe_b64encode(b"2030-01-15T23:30:00+00:00").decode().rstrip("=")
+    body = client.get("/availability", params=dict(DAY, cursor=last)).json()
+    assert body == {"slots": [], "timezone": "UTC", "next_cursor": None}
+    assert default_calendar.service.calls["freebusy"] == 0
+
+
+def test_unchanged_page_answers_304(client):
+    first = client.get("/availability", params=DAY)
+    again = client.get("/availability", params=DAY, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
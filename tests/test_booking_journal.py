@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import wait
+
+import pytest
+
+import app.main as main
+from app.booking_journal import BookingJournal
+from app.calendar_service import event_id_for_booking
+
+FUTURE_SLOT = {"start": "2030-01-15T09:00:00+00:00", "end": "2030-01-15T10:00:00+00:00"}
+PAST_SLOT = {"start": "2020-01-15T09:00:00+00:00", "end": "2020-01-15T10:00:00+00:00"}
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "bookings.db")
+
+
+def test_intents_without_an_outcome_survive_a_restart(journal_path):
+    journal = BookingJournal(journal_path)
+    journal.start()
+    journal.record_intent("done", "s1", FUTURE_SLOT).result(5)
+    journal.record_outcome("done", "confirmed").result(5)
+    journal.record_intent("interrupted", "s2", FUTURE_SLOT, tenant_id="acme").result(5)
+    journal.close()
+
+    reopened = BookingJournal(journal_path)
+    try:
+        unresolved = reopened.unresolved()
+    finally:
+        reopened.close()
+    assert [(i["booking_id"], i["session_id"], i["tenant_id"], i["slot"]) for i in unresolved] == [
+        ("interrupted", "s2", "acme", FUTURE_SLOT)
+    ]
+
+
+def test_concurrent_appends_are_all_made_durable(journal_path):
+    journal = BookingJournal(journal_path, commit_interval=0.01)
+    journal.start()
+    futures = [journal.record_intent(f"b{i}", None, FUTURE_SLOT) for i in range(200)]
+    done, not_done = wait(futures, timeout=5)
+    journal.close()
+
+    assert not not_done and all(f.result() for f in done)
+    reopened = BookingJournal(journal_path)
+    try:
+        assert len(reopened.unresolved()) == 200
+    finally:
+        reopened.close()
+
+
+class _RecordingQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, slot, session_id=None, booking_id=None, tenant_id=None):
+        self.submitted.append((booking_id, session_id, tenant_id))
+
+
+def test_reconcile_settles_interrupted_bookings(journal_path, default_calendar, monkeypatch):
+    default_calendar.service.events_by_id[event_id_for_booking("created")] = {"id": "evt-created"}
+    journal = BookingJournal(journal_path)
+    journal.start()
+    for booking_id, slot in (("created", FUTURE_SLOT), ("expired", PAST_SLOT), ("pending", FUTURE_SLOT)):
+        journal.record_intent(booking_id, "s1", slot).result(5)
+
+    queue = _RecordingQueue()
+    monkeypatch.setattr(main, "booking_journal", journal)
+    monkeypatch.setattr(main, "booking_queue", queue)
+    asyncio.run(main._reconcile_bookings())
+    journal.close()
+
+    # The resumed booking settles once the queue runs it; the other two are done
+    assert queue.submitted == [("pending", "s1", None)]
+    reopened = BookingJournal(journal_path)
+    try:
+        assert [i["booking_id"] for i in reopened.unresolved()] == ["pending"]
+        outcomes = dict(reopened._conn.execute(
+            "SELECT booking_id, json_extract(payload, '$.status') FROM journal WHERE kind = 'outcome'"
+        ).fetchall())
+    finally:
+        reopened.close()
+    assert outcomes == {"created": "confirmed", "expired": "failed"}
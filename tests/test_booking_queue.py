@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.booking_queue import CONFIRMED, FAILED, BookingJob, BookingQueue
+from app.models import BookingJobStatus
+
+
+def _result(confirmed=False, retryable=False, retry_after=None):
+    return {"booking_confirmed": confirmed, "response": "done" if confirmed else "failed",
+            "booking_result": {"success": confirmed, "retryable": retryable, "retry_after": retry_after}}
+
+
+def _run(handler, **kwargs):
+    """Submit one job, wait for it to settle and return it with the completed jobs"""
+    completed = []
+
+    async def main():
+        queue = BookingQueue(handler, workers=2, base_delay=0.01, max_delay=0.02,
+                             on_complete=completed.append, **kwargs)
+        await queue.start()
+        job = queue.submit({"start": "2030-01-15T09:00:00+00:00"}, session_id="s1")
+        for _ in range(200):
+            if job.done:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    return asyncio.run(main()), completed
+
+
+def test_transient_failure_is_retried_until_it_succeeds():
+    answers = [_result(retryable=True), _result(retryable=True), _result(confirmed=True)]
+    job, completed = _run(lambda *args: answers.pop(0), max_attempts=3)
+    assert (job.status, job.attempts) == (CONFIRMED, 3)
+    assert completed == [job]
+
+
+def test_permanent_failure_is_not_retried():
+    job, completed = _run(lambda *args: _result(retryable=False), max_attempts=3)
+    assert (job.status, job.attempts) == (FAILED, 1)
+    assert completed == [job]
+
+
+def test_transient_failure_gives_up_after_max_attempts():
+    calls = []
+
+    def handler(*args):
+        calls.append(args)
+        return _result(retryable=True)
+
+    job, completed = _run(handler, max_attempts=3)
+    assert (job.status, job.attempts, len(calls)) == (FAILED, 3, 3)
+    assert completed == [job]
+
+
+def test_handler_exception_is_retried():
+    answers = [RuntimeError("connection reset"), _result(confirmed=True)]
+
+    def handler(*args):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    job, _ = _run(handler, max_attempts=3)
+    assert (job.status, job.attempts) == (CONFIRMED, 2)
+
+
+def test_retry_waits_at_least_retry_after():
+    seen = []
+
+    def handler(*args):
+        seen.append(time.monotonic())
+        return _result(retryable=True, retry_after=0.2) if len(seen) == 1 else _result(confirmed=True)
+
+    job, _ = _run(handler, max_attempts=2)
+    assert job.status == CONFIRMED
+    assert seen[1] - seen[0] >= 0.2
+
+
+def test_handler_receives_the_job_identity():
+    seen = []
+
+    def handler(slot, session_id, booking_id, tenant_id):
+        seen.append((slot["start"], session_id, booking_id, tenant_id))
+        return _result(confirmed=True)
+
+    job, _ = _run(handler)
+    assert seen == [("2030-01-15T09:00:00+00:00", "s1", job.booking_id, None)]
+    assert job.to_dict()["booking_confirmed"]
+
+
+def test_status_endpoint_returns_the_job(monkeypatch):
+    queue = BookingQueue(lambda *args: _result(confirmed=True))
+    job = BookingJob({"start": "2030-01-15T09:00:00+00:00"}, session_id="s1", booking_id="b1")
+    queue.jobs[job.booking_id] = job
+    monkeypatch.setattr(main, "booking_queue", queue)
+    client = TestClient(main.app)
+
+    body = client.get("/bookings/b1").json()
+    assert body == job.to_dict()
+    assert BookingJobStatus(**body).status == "pending"
+    assert client.get("/bookings/missing").status_code == 404
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from app.calendar_pool import CalendarServicePool, UnknownTenantError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    for tenant_id in ("acme", "globex"):
+        (tmp_path / tenant_id).mkdir()
+        (tmp_path / tenant_id / "token.json").write_text("{}")
+    return CalendarServicePool(str(tmp_path), max_size=1)
+
+
+def test_concurrent_requests_build_one_client(pool, monkeypatch):
+    builds = []
+    build = pool._build
+
+    def slow_build(tenant_id):
+        builds.append(tenant_id)
+        time.sleep(0.05)
+        return build(tenant_id)
+
+    monkeypatch.setattr(pool, "_build", slow_build)
+    services = []
+    threads = [threading.Thread(target=lambda: services.append(pool.get("acme"))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert builds == ["acme"]
+    assert len({id(service) for service in services}) == 1
+    assert pool.stats["misses"] == 1 and pool._building == {}
+
+
+def test_failed_build_releases_the_build_lock(pool):
+    with pytest.raises(UnknownTenantError):
+        pool.get("initech")
+    assert pool._building == {}
+
+
+def test_least_recently_used_client_is_evicted(pool):
+    acme = pool.get("acme")
+    pool.get("globex")
+    assert pool.stats["evictions"] == 1
+    assert pool.get("acme") is not acme
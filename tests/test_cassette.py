@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agent import booking_agent as agent_module
+from app.agent.booking_agent import BookingAgent
+from app.calendar_service import GoogleCalendarService
+from app.cassette import CALENDAR_METHODS, CassetteRecorder, load
+from benchmarks.load_harness import default_intents, fake_llm
+
+
+@pytest.fixture
+def recorded_agent(default_calendar, tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_module.GroqLLMWrapper, "invoke", fake_llm(0, default_intents()[:1]))
+    # The recorder wraps these on the class; put the originals back afterwards
+    for name in CALENDAR_METHODS:
+        monkeypatch.setattr(GoogleCalendarService, name, getattr(GoogleCalendarService, name))
+    agent = BookingAgent()
+    path = str(tmp_path / "cassette.jsonl")
+    CassetteRecorder(path).install(agent)
+    monkeypatch.setattr(main, "booking_agent", agent)
+    return agent, path
+
+
+def test_health_probes_are_not_recorded(recorded_agent):
+    agent, path = recorded_agent
+    body = TestClient(main.app).get("/health").json()
+    assert body["agent_status"] == "healthy"
+    assert load(path) == []
+
+    agent.process_message("Any time tomorrow?", "s1")
+    turns = load(path)
+    assert [turn["input"]["message"] for turn in turns] == ["Any time tomorrow?"]
+    assert {call["kind"] for call in turns[0]["calls"]} == {"llm", "calendar"}
@@ -0,0 +1,38 @@
+import json
+from datetime import datetime, timedelta
+
+from google.oauth2.credentials import Credentials
+
+from app.credentials import CredentialManager
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+
+def _token(token, refresh_token, expires_in):
+    return Credentials(token, refresh_token=refresh_token, token_uri="https://oauth2.googleapis.com/token",
+                       client_id="client", client_secret="secret", scopes=SCOPES,
+                       expiry=datetime.utcnow() + timedelta(seconds=expires_in))
+
+
+def test_token_refreshed_by_another_process_is_adopted_with_its_refresh_token(tmp_path):
+    token_file = tmp_path / "token.json"
+    manager = CredentialManager("", str(token_file), SCOPES, refresh_margin=900, interactive=False)
+    token_file.write_text(_token("old", "r1", 600).to_json())
+    in_use = manager.load()
+
+    # Another worker refreshed and the provider rotated the refresh token
+    token_file.write_text(_token("new", "r2", 3600).to_json())
+    assert manager.refresh_if_due()
+
+    assert manager.credentials is in_use
+    assert (in_use.token, in_use.refresh_token) == ("new", "r2")
+    assert json.loads(token_file.read_text())["refresh_token"] == "r2"
+
+
+def test_token_with_time_left_is_not_refreshed(tmp_path):
+    token_file = tmp_path / "token.json"
+    token_file.write_text(_token("current", "r1", 3600).to_json())
+    manager = CredentialManager("", str(token_file), SCOPES, refresh_margin=300, interactive=False)
+    manager.load()
+    assert not manager.refresh_if_due()
+    assert manager.credentials.token == "current"
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from app.metrics import metrics
+
+START = pytz.utc.localize(datetime(2030, 1, 15))
+END = START + timedelta(days=7)
+BUSY = {"start": "2030-01-16T10:00:00+00:00", "end": "2030-01-16T11:00:00+00:00"}
+
+
+def _in_flight(calendar, start=START, end=END):
+    """Start a free/busy query on a thread and hold it at the API until the gate opens"""
+    api = calendar.service
+    api.gate, api.started = threading.Event(), threading.Event()
+    results = []
+    leader = threading.Thread(target=lambda: results.append(calendar.get_free_busy(start, end)))
+    leader.start()
+    assert api.started.wait(5)
+    return leader, results
+
+
+def _join_all(threads):
+    for thread in threads:
+        thread.join(5)
+
+
+def test_covered_range_is_answered_from_the_cache(calendar):
+    calendar.service.busy = [BUSY]
+    assert calendar.get_free_busy(START, END) == [BUSY]
+    assert calendar.get_free_busy(START + timedelta(days=1), START + timedelta(days=2)) == [BUSY]
+    assert calendar.get_free_busy(START + timedelta(days=3), START + timedelta(days=4)) == []
+    assert calendar.service.calls["freebusy"] == 1
+
+
+def test_invalidate_forces_a_fresh_query(calendar):
+    calendar.get_free_busy(START, END)
+    calendar.service.busy = [BUSY]
+    calendar.invalidate_cache()
+    assert calendar.get_free_busy(START, END) == [BUSY]
+    assert calendar.service.calls["freebusy"] == 2
+
+
+def test_booking_refetches_the_window(calendar):
+    calendar.get_free_busy(START, END)
+    calendar.create_event("Intro", START + timedelta(hours=9), START + timedelta(hours=10))
+    calendar.get_free_busy(START, END)
+    assert calendar.service.calls["freebusy"] == 2
+
+
+def test_concurrent_queries_for_a_covered_range_share_one_call(calendar):
+    calendar.service.busy = [BUSY]
+    coalesced = metrics.get("calendar.freebusy.coalesced")
+    leader, leader_result = _in_flight(calendar)
+
+    results = []
+    followers = [
+        threading.Thread(target=lambda day=day: results.append(
+            calendar.get_free_busy(START + timedelta(days=day), START + timedelta(days=day + 1))))
+        for day in range(5)
+    ]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.1)
+    calendar.service.gate.set()
+    _join_all([leader] + followers)
+
+    assert calendar.service.calls["freebusy"] == 1
+    assert leader_result == [[BUSY]]
+    assert sorted(map(len, results)) == [0, 0, 0, 0, 1]
+    assert metrics.get("calendar.freebusy.coalesced") - coalesced == 5
+
+
+def test_async_callers_join_a_query_in_flight_on_a_thread(calendar):
+    leader, _ = _in_flight(calendar)
+
+    async def main():
+        waiting = asyncio.gather(*(calendar.aget_free_busy(START, START + timedelta(days=1)) for _ in range(3)))
+        await asyncio.sleep(0.1)
+        calendar.service.gate.set()
+        return await waiting
+
+    assert asyncio.run(main()) == [[], [], []]
+    leader.join(5)
+    assert calendar.service.calls["freebusy"] == 1
+
+
+def test_query_started_before_an_invalidation_is_not_joined_or_cached(calendar):
+    stale_puts = metrics.get("calendar.freebusy.stale_puts")
+    leader, leader_result = _in_flight(calendar)
+
+    calendar.invalidate_cache()
+    calendar.service.busy = [BUSY]
+    results = []
+    after = threading.Thread(target=lambda: results.append(calendar.get_free_busy(START, END)))
+    after.start()
+    time.sleep(0.1)
+    calendar.service.gate.set()
+    _join_all([leader, after])
+
+    # The caller after the invalidation sent its own query and saw the new busy time
+    assert calendar.service.calls["freebusy"] == 2
+    assert results == [[BUSY]]
+    assert metrics.get("calendar.freebusy.stale_puts") - stale_puts == 1
+    calendar.service.gate = None
+    assert calendar.get_free_busy(START, END) == [BUSY]
+    assert calendar.service.calls["freebusy"] == 2
+
+
+def test_coalescing_can_be_turned_off(calendar):
+    calendar.coalesce = False
+    leader, _ = _in_flight(calendar)
+    other = threading.Thread(target=calendar.get_free_busy, args=(START, START + timedelta(days=1)))
+    other.start()
+    time.sleep(0.1)
+    calendar.service.gate.set()
+    _join_all([leader, other])
+    assert calendar.service.calls["freebusy"] == 2
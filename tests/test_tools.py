@@ -0,0 +1,38 @@
+from app.agent.tools import book_appointment, check_availability, turn_calendar
+from app.calendar_service import GoogleCalendarService
+
+
+def _check(tenant_id=""):
+    return check_availability.invoke({"start_date": "2030-01-15", "end_date": "2030-01-15",
+                                      "limit": 3, "tenant_id": tenant_id})
+
+
+def _book():
+    return book_appointment.invoke({"title": "Intro", "start_time": "2030-01-15T09:00:00+00:00",
+                                    "end_time": "2030-01-15T10:00:00+00:00", "booking_id": "b1"})
+
+
+def test_tools_use_the_default_calendar_without_an_override(default_calendar):
+    slots = _check()
+    assert [s["start"] for s in slots] == ["2030-01-15T09:00:00+00:00", "2030-01-15T09:30:00+00:00",
+                                          "2030-01-15T10:00:00+00:00"]
+    assert _book()["success"]
+    assert default_calendar.service.calls["freebusy"] == 1
+    assert default_calendar.service.calls["insert"] == 1
+
+
+def test_turn_calendar_redirects_every_tool_call(default_calendar):
+    stub = GoogleCalendarService("", "", calendar_id="stub")
+    stub.service.busy = [{"start": "2030-01-15T09:00:00+00:00", "end": "2030-01-15T12:00:00+00:00"}]
+
+    with turn_calendar(stub):
+        slots = _check(tenant_id="someone")
+        assert _book()["success"]
+
+    assert slots[0]["start"] == "2030-01-15T12:00:00+00:00"
+    assert stub.service.calls == {"freebusy": 1, "insert": 1, "get": 0}
+    assert default_calendar.service.calls == {"freebusy": 0, "insert": 0, "get": 0}
+
+    # The override ends with the block
+    assert _check()[0]["start"] == "2030-01-15T09:00:00+00:00"
+    assert default_calendar.service.calls["freebusy"] == 1